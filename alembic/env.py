@@ -0,0 +1,64 @@
+from logging.config import fileConfig
+from alembic import context
+from sqlalchemy import engine_from_config, pool
+from app.db import Base, DATABASE_URL
+import app.models #registers model metadata with Base
+
+config = context.config
+config.set_main_option("sqlalchemy.url", DATABASE_URL.replace("%", "%%"))
+
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    #the full-text indexes (app/search.py, 0004, 0010) aren't part of the models: keep autogenerate away from them
+    if type_ == "table" and name.startswith(("transactions_fts", "transactions_archive_fts")):
+        return False
+    if type_ == "index" and name in ("ix_transactions_description_fts", "ix_transactions_archive_description_fts"):
+        return False
+    #SQLite's own AUTOINCREMENT bookkeeping (0007)
+    if type_ == "table" and name == "sqlite_sequence":
+        return False
+    return True
+
+
+def run_migrations_offline():
+    context.configure(
+        url=DATABASE_URL,
+        target_metadata=target_metadata,
+        include_object=include_object,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+        render_as_batch=True, # SQLite can't ALTER most things in place
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online():
+    connectable = engine_from_config(
+        config.get_section(config.config_ini_section),
+        prefix="sqlalchemy.",
+        poolclass=pool.NullPool,
+    )
+
+    with connectable.connect() as connection:
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            include_object=include_object,
+            render_as_batch=True,
+        )
+
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
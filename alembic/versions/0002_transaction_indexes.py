@@ -0,0 +1,32 @@
+"""composite indexes for the transaction query paths
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index("ix_transactions_user_id_date", "transactions", ["user_id", "date"])
+    op.create_index(
+        "ix_transactions_user_id_category_id_date",
+        "transactions",
+        ["user_id", "category_id", "date"],
+    )
+    op.create_index("ix_transactions_category_id", "transactions", ["category_id"])
+    op.create_index("ix_categories_user_id", "categories", ["user_id"])
+
+
+def downgrade():
+    op.drop_index("ix_categories_user_id", table_name="categories")
+    op.drop_index("ix_transactions_category_id", table_name="transactions")
+    op.drop_index("ix_transactions_user_id_category_id_date", table_name="transactions")
+    op.drop_index("ix_transactions_user_id_date", table_name="transactions")
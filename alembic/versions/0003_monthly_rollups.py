@@ -0,0 +1,91 @@
+"""monthly rollup table
+
+Creates monthly_rollups (unless app startup already did) and backfills it
+from the existing transactions.
+`python rebuild_rollups.py --verify` checks it against the raw rows afterwards.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # App startup (create_all) may already have created an empty table
+    if not sa.inspect(op.get_bind()).has_table("monthly_rollups"):
+        create_table()
+
+    backfill()
+
+
+def create_table():
+    op.create_table(
+        "monthly_rollups",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("year", sa.Integer(), nullable=False),
+        sa.Column("month", sa.Integer(), nullable=False),
+        sa.Column("category_id", sa.Integer(), nullable=True),
+        sa.Column("total", sa.Numeric(14, 2), nullable=False),
+        sa.Column("tx_count", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["category_id"], ["categories.id"]),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_monthly_rollups_id", "monthly_rollups", ["id"])
+    op.create_index(
+        "ix_monthly_rollups_user_id_year_month_category_id",
+        "monthly_rollups",
+        ["user_id", "year", "month", "category_id"],
+    )
+    op.create_index("ix_monthly_rollups_category_id", "monthly_rollups", ["category_id"])
+
+
+def backfill():
+    transactions = sa.table(
+        "transactions",
+        sa.column("id", sa.Integer),
+        sa.column("user_id", sa.Integer),
+        sa.column("category_id", sa.Integer),
+        sa.column("amount", sa.Numeric(12, 2)),
+        sa.column("date", sa.Date),
+    )
+    rollups = sa.table(
+        "monthly_rollups",
+        sa.column("user_id", sa.Integer),
+        sa.column("year", sa.Integer),
+        sa.column("month", sa.Integer),
+        sa.column("category_id", sa.Integer),
+        sa.column("total", sa.Numeric(14, 2)),
+        sa.column("tx_count", sa.Integer),
+    )
+    op.execute(rollups.delete())
+
+    year = sa.extract("year", transactions.c.date)
+    month = sa.extract("month", transactions.c.date)
+    op.execute(
+        rollups.insert().from_select(
+            ["user_id", "year", "month", "category_id", "total", "tx_count"],
+            sa.select(
+                transactions.c.user_id,
+                year,
+                month,
+                transactions.c.category_id,
+                sa.func.sum(transactions.c.amount),
+                sa.func.count(transactions.c.id),
+            ).group_by(transactions.c.user_id, year, month, transactions.c.category_id),
+        )
+    )
+
+
+def downgrade():
+    op.drop_table("monthly_rollups")
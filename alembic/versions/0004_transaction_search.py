@@ -0,0 +1,63 @@
+"""full-text index on transaction descriptions
+
+SQLite: contentless FTS5 table transactions_fts plus the triggers that keep it in
+sync with transactions.description, filled from the existing rows.
+Postgres: GIN index on to_tsvector('simple', description).
+Everything is IF NOT EXISTS, app startup (create_all) may have created it already.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+SQLITE_UPGRADE = [
+    # contentless FTS5 table, rowid = (user_id << 32) + transaction id (see app/search.py)
+    """CREATE VIRTUAL TABLE IF NOT EXISTS transactions_fts USING fts5(
+        description, content='', tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS transactions_fts_insert AFTER INSERT ON transactions BEGIN
+        INSERT INTO transactions_fts(rowid, description) VALUES ((new.user_id << 32) + new.id, new.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS transactions_fts_delete AFTER DELETE ON transactions BEGIN
+        INSERT INTO transactions_fts(transactions_fts, rowid, description)
+        VALUES ('delete', (old.user_id << 32) + old.id, old.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS transactions_fts_update AFTER UPDATE OF description, user_id ON transactions BEGIN
+        INSERT INTO transactions_fts(transactions_fts, rowid, description)
+        VALUES ('delete', (old.user_id << 32) + old.id, old.description);
+        INSERT INTO transactions_fts(rowid, description) VALUES ((new.user_id << 32) + new.id, new.description);
+    END""",
+    # index every existing row (contentless tables can't 'rebuild')
+    "INSERT INTO transactions_fts(transactions_fts) VALUES ('delete-all')",
+    "INSERT INTO transactions_fts(rowid, description) SELECT (user_id << 32) + id, description FROM transactions",
+]
+
+POSTGRES_UPGRADE = [
+    "CREATE INDEX IF NOT EXISTS ix_transactions_description_fts ON transactions "
+    "USING gin (to_tsvector('simple', coalesce(transactions.description, '')))",
+]
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+    statements = SQLITE_UPGRADE if dialect == "sqlite" else POSTGRES_UPGRADE if dialect == "postgresql" else []
+    for statement in statements:
+        op.execute(statement)
+
+
+def downgrade():
+    if op.get_bind().dialect.name == "sqlite":
+        for trigger in ("transactions_fts_insert", "transactions_fts_delete", "transactions_fts_update"):
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        op.execute("DROP TABLE IF EXISTS transactions_fts")
+    elif op.get_bind().dialect.name == "postgresql":
+        op.execute("DROP INDEX IF EXISTS ix_transactions_description_fts")
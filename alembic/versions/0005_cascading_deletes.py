@@ -0,0 +1,77 @@
+"""ON DELETE CASCADE on the user / category foreign keys
+
+Deleting a category or a user no longer loads the child rows through the ORM
+(passive_deletes): the routes issue set-based DELETEs, and the foreign keys
+cascade as well where the database enforces them (PostgreSQL; SQLite only with
+PRAGMA foreign_keys=ON).
+SQLite can't alter a constraint, so categories, transactions and monthly_rollups
+are rebuilt (batch mode copies every row) and the full-text triggers that went
+away with the old transactions table are created again.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+# table -> [(column, referenced table)]
+FOREIGN_KEYS = {
+    "categories": [("user_id", "users")],
+    "transactions": [("user_id", "users"), ("category_id", "categories")],
+    "monthly_rollups": [("user_id", "users"), ("category_id", "categories")],
+}
+
+# SQLite's foreign keys are unnamed: batch mode names the reflected ones with this convention so they can be dropped
+SQLITE_NAMING = {"fk": "fk_%(table_name)s_%(column_0_name)s_%(referred_table_name)s"}
+
+# same as 0004, dropped with the old transactions table
+SQLITE_TRIGGERS = [
+    """CREATE TRIGGER IF NOT EXISTS transactions_fts_insert AFTER INSERT ON transactions BEGIN
+        INSERT INTO transactions_fts(rowid, description) VALUES ((new.user_id << 32) + new.id, new.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS transactions_fts_delete AFTER DELETE ON transactions BEGIN
+        INSERT INTO transactions_fts(transactions_fts, rowid, description)
+        VALUES ('delete', (old.user_id << 32) + old.id, old.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS transactions_fts_update AFTER UPDATE OF description, user_id ON transactions BEGIN
+        INSERT INTO transactions_fts(transactions_fts, rowid, description)
+        VALUES ('delete', (old.user_id << 32) + old.id, old.description);
+        INSERT INTO transactions_fts(rowid, description) VALUES ((new.user_id << 32) + new.id, new.description);
+    END""",
+]
+
+
+def replace_foreign_keys(ondelete):
+    dialect = op.get_bind().dialect.name
+    for table, keys in FOREIGN_KEYS.items():
+        if dialect == "sqlite":
+            with op.batch_alter_table(table, recreate="always", naming_convention=SQLITE_NAMING) as batch:
+                for column, referenced in keys:
+                    name = f"fk_{table}_{column}_{referenced}"
+                    batch.drop_constraint(name, type_="foreignkey")
+                    batch.create_foreign_key(name, referenced, [column], ["id"], ondelete=ondelete)
+        else:
+            for column, referenced in keys:
+                name = f"{table}_{column}_fkey" #PostgreSQL's default name
+                op.drop_constraint(name, table, type_="foreignkey")
+                op.create_foreign_key(name, table, referenced, [column], ["id"], ondelete=ondelete)
+
+    if dialect == "sqlite":
+        for statement in SQLITE_TRIGGERS:
+            op.execute(statement)
+
+
+def upgrade():
+    replace_foreign_keys("CASCADE")
+
+
+def downgrade():
+    replace_foreign_keys(None)
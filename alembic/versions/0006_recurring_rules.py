@@ -0,0 +1,92 @@
+"""recurring transaction rules
+
+Creates recurring_rules (unless app startup already did) and adds
+transactions.recurring_rule_id with the unique (recurring_rule_id, date) index
+the scheduler in app/recurring.py uses as idempotency key.
+On SQLite the foreign key needs a rebuild of transactions (batch mode), which
+drops the full-text triggers: they are created again, as in 0005.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+
+    # App startup (create_all) may already have created the table
+    if not inspector.has_table("recurring_rules"):
+        op.create_table(
+            "recurring_rules",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("user_id", sa.Integer(), nullable=False),
+            sa.Column("category_id", sa.Integer(), nullable=True),
+            sa.Column("amount", sa.Numeric(12, 2), nullable=False),
+            sa.Column("description", sa.String(200), nullable=True),
+            sa.Column("frequency", sa.String(10), nullable=False),
+            sa.Column("interval", sa.Integer(), nullable=False),
+            sa.Column("start_date", sa.Date(), nullable=False),
+            sa.Column("end_date", sa.Date(), nullable=True),
+            sa.Column("next_date", sa.Date(), nullable=True),
+            sa.Column("created_at", sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+            sa.ForeignKeyConstraint(["category_id"], ["categories.id"], ondelete="CASCADE"),
+            sa.PrimaryKeyConstraint("id"),
+        )
+        op.create_index("ix_recurring_rules_id", "recurring_rules", ["id"])
+        op.create_index("ix_recurring_rules_user_id", "recurring_rules", ["user_id"])
+        op.create_index("ix_recurring_rules_next_date", "recurring_rules", ["next_date"])
+
+    if "recurring_rule_id" not in {column["name"] for column in inspector.get_columns("transactions")}:
+        with op.batch_alter_table("transactions") as batch:
+            batch.add_column(sa.Column("recurring_rule_id", sa.Integer(), nullable=True))
+            batch.create_foreign_key(
+                "fk_transactions_recurring_rule_id_recurring_rules", "recurring_rules",
+                ["recurring_rule_id"], ["id"], ondelete="SET NULL",
+            )
+            batch.create_index(
+                "ux_transactions_recurring_rule_id_date", ["recurring_rule_id", "date"], unique=True
+            )
+        recreate_sqlite_triggers()
+
+
+def downgrade():
+    with op.batch_alter_table("transactions") as batch:
+        batch.drop_index("ux_transactions_recurring_rule_id_date")
+        batch.drop_constraint("fk_transactions_recurring_rule_id_recurring_rules", type_="foreignkey")
+        batch.drop_column("recurring_rule_id")
+    recreate_sqlite_triggers()
+    op.drop_table("recurring_rules")
+
+
+# same as 0004 / 0005
+SQLITE_TRIGGERS = [
+    """CREATE TRIGGER IF NOT EXISTS transactions_fts_insert AFTER INSERT ON transactions BEGIN
+        INSERT INTO transactions_fts(rowid, description) VALUES ((new.user_id << 32) + new.id, new.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS transactions_fts_delete AFTER DELETE ON transactions BEGIN
+        INSERT INTO transactions_fts(transactions_fts, rowid, description)
+        VALUES ('delete', (old.user_id << 32) + old.id, old.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS transactions_fts_update AFTER UPDATE OF description, user_id ON transactions BEGIN
+        INSERT INTO transactions_fts(transactions_fts, rowid, description)
+        VALUES ('delete', (old.user_id << 32) + old.id, old.description);
+        INSERT INTO transactions_fts(rowid, description) VALUES ((new.user_id << 32) + new.id, new.description);
+    END""",
+]
+
+
+def recreate_sqlite_triggers():
+    if op.get_bind().dialect.name == "sqlite":
+        for statement in SQLITE_TRIGGERS:
+            op.execute(statement)
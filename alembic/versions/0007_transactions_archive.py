@@ -0,0 +1,88 @@
+"""transactions archive
+
+Creates transactions_archive (unless app startup already did), where
+archive_transactions.py moves transactions older than the archive horizon.
+Archived rows keep their ids, so on SQLite transactions is rebuilt (batch mode)
+with AUTOINCREMENT: without it SQLite may hand out the id of a row that was
+moved. The rebuild drops the full-text triggers, which are created again as in
+0005. Downgrading moves the archived rows back into transactions.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+COLUMNS = "id, user_id, category_id, amount, description, date, created_at"
+
+
+def upgrade():
+    # App startup (create_all) may already have created the table
+    if not sa.inspect(op.get_bind()).has_table("transactions_archive"):
+        op.create_table(
+            "transactions_archive",
+            sa.Column("id", sa.Integer(), autoincrement=False, nullable=False),
+            sa.Column("user_id", sa.Integer(), nullable=False),
+            sa.Column("category_id", sa.Integer(), nullable=True),
+            sa.Column("amount", sa.Numeric(12, 2), nullable=False),
+            sa.Column("description", sa.String(200), nullable=True),
+            sa.Column("date", sa.Date(), nullable=False),
+            sa.Column("created_at", sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+            sa.ForeignKeyConstraint(["category_id"], ["categories.id"], ondelete="CASCADE"),
+            sa.PrimaryKeyConstraint("id"),
+        )
+        op.create_index("ix_transactions_archive_user_id_date", "transactions_archive", ["user_id", "date"])
+        op.create_index(
+            "ix_transactions_archive_user_id_category_id_date", "transactions_archive",
+            ["user_id", "category_id", "date"],
+        )
+        op.create_index("ix_transactions_archive_category_id", "transactions_archive", ["category_id"])
+
+    if op.get_bind().dialect.name == "sqlite":
+        # the copy keeps every id, sqlite_sequence starts after the highest one
+        with op.batch_alter_table(
+            "transactions", recreate="always", table_kwargs={"sqlite_autoincrement": True}
+        ):
+            pass
+        recreate_sqlite_triggers()
+
+
+def downgrade():
+    op.execute(f"INSERT INTO transactions ({COLUMNS}) SELECT {COLUMNS} FROM transactions_archive")
+    op.drop_table("transactions_archive")
+    if op.get_bind().dialect.name == "sqlite":
+        with op.batch_alter_table("transactions", recreate="always"):
+            pass
+        recreate_sqlite_triggers()
+
+
+# same as 0004 / 0005 / 0006
+SQLITE_TRIGGERS = [
+    """CREATE TRIGGER IF NOT EXISTS transactions_fts_insert AFTER INSERT ON transactions BEGIN
+        INSERT INTO transactions_fts(rowid, description) VALUES ((new.user_id << 32) + new.id, new.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS transactions_fts_delete AFTER DELETE ON transactions BEGIN
+        INSERT INTO transactions_fts(transactions_fts, rowid, description)
+        VALUES ('delete', (old.user_id << 32) + old.id, old.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS transactions_fts_update AFTER UPDATE OF description, user_id ON transactions BEGIN
+        INSERT INTO transactions_fts(transactions_fts, rowid, description)
+        VALUES ('delete', (old.user_id << 32) + old.id, old.description);
+        INSERT INTO transactions_fts(rowid, description) VALUES ((new.user_id << 32) + new.id, new.description);
+    END""",
+]
+
+
+def recreate_sqlite_triggers():
+    if op.get_bind().dialect.name == "sqlite":
+        for statement in SQLITE_TRIGGERS:
+            op.execute(statement)
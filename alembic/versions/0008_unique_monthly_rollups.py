@@ -0,0 +1,86 @@
+"""unique monthly rollup keys
+
+Replaces the (user_id, year, month, category_id) index of monthly_rollups with a
+unique one on (user_id, year, month, coalesce(category_id, 0)), the conflict
+target of the upsert in app/rollups.py. Two concurrent first writes to a month
+could each insert a row for the same key before (Postgres); the users with such
+duplicates get their rollups recomputed from the raw transactions first.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+KEY = "user_id, year, month, coalesce(category_id, 0)"
+
+
+def upgrade():
+    rebuild_duplicated_users()
+    op.drop_index("ix_monthly_rollups_user_id_year_month_category_id", table_name="monthly_rollups")
+    op.create_index(
+        "ux_monthly_rollups_user_id_year_month_category_id",
+        "monthly_rollups",
+        ["user_id", "year", "month", sa.text("coalesce(category_id, 0)")],
+        unique=True,
+    )
+
+
+def downgrade():
+    op.drop_index("ux_monthly_rollups_user_id_year_month_category_id", table_name="monthly_rollups")
+    op.create_index(
+        "ix_monthly_rollups_user_id_year_month_category_id",
+        "monthly_rollups",
+        ["user_id", "year", "month", "category_id"],
+    )
+
+
+def rebuild_duplicated_users():
+    bind = op.get_bind()
+    user_ids = [
+        user_id for (user_id,) in bind.execute(sa.text(
+            f"SELECT DISTINCT user_id FROM monthly_rollups GROUP BY {KEY} HAVING count(*) > 1"
+        ))
+    ]
+    if not user_ids:
+        return
+
+    rollups = sa.table(
+        "monthly_rollups",
+        sa.column("user_id", sa.Integer),
+        sa.column("year", sa.Integer),
+        sa.column("month", sa.Integer),
+        sa.column("category_id", sa.Integer),
+        sa.column("total", sa.Numeric(14, 2)),
+        sa.column("tx_count", sa.Integer),
+    )
+    # hot and archived rows (0007), like rollups._raw_rollups_query
+    raw = sa.union_all(*[
+        sa.select(table.c.user_id, table.c.category_id, table.c.amount, table.c.date)
+        .where(table.c.user_id.in_(user_ids))
+        for table in (
+            sa.table(name, sa.column("user_id", sa.Integer), sa.column("category_id", sa.Integer),
+                     sa.column("amount", sa.Numeric(12, 2)), sa.column("date", sa.Date))
+            for name in ("transactions", "transactions_archive")
+        )
+    ]).subquery()
+
+    op.execute(rollups.delete().where(rollups.c.user_id.in_(user_ids)))
+    year = sa.extract("year", raw.c.date)
+    month = sa.extract("month", raw.c.date)
+    op.execute(
+        rollups.insert().from_select(
+            ["user_id", "year", "month", "category_id", "total", "tx_count"],
+            sa.select(
+                raw.c.user_id, year, month, raw.c.category_id, sa.func.sum(raw.c.amount), sa.func.count(),
+            ).group_by(raw.c.user_id, year, month, raw.c.category_id),
+        )
+    )
@@ -0,0 +1,40 @@
+"""archived recurring occurrences
+
+Adds transactions_archive.recurring_rule_id (unless app startup already did), so
+archived occurrences keep their rule like the rows in transactions (0006). Rows
+archived before this revision stay without one.
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0009"
+down_revision = "0008"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    # App startup (create_all) may already have created the table with the column
+    if "recurring_rule_id" in {column["name"] for column in inspector.get_columns("transactions_archive")}:
+        return
+    with op.batch_alter_table("transactions_archive") as batch:
+        batch.add_column(sa.Column("recurring_rule_id", sa.Integer(), nullable=True))
+        batch.create_foreign_key(
+            "fk_transactions_archive_recurring_rule_id_recurring_rules", "recurring_rules",
+            ["recurring_rule_id"], ["id"], ondelete="SET NULL",
+        )
+        batch.create_index("ix_transactions_archive_recurring_rule_id", ["recurring_rule_id"])
+
+
+def downgrade():
+    with op.batch_alter_table("transactions_archive") as batch:
+        batch.drop_index("ix_transactions_archive_recurring_rule_id")
+        batch.drop_constraint("fk_transactions_archive_recurring_rule_id_recurring_rules", type_="foreignkey")
+        batch.drop_column("recurring_rule_id")
@@ -0,0 +1,63 @@
+"""full-text index on archived transaction descriptions
+
+The archive gets the same index as transactions (0004), so searches reach archived
+rows. SQLite: contentless FTS5 table transactions_archive_fts plus its triggers,
+filled from the archived rows. Postgres: GIN index on to_tsvector('simple', description).
+Everything is IF NOT EXISTS, app startup (create_all) may have created it already.
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+
+
+revision = "0010"
+down_revision = "0009"
+branch_labels = None
+depends_on = None
+
+
+SQLITE_UPGRADE = [
+    # contentless FTS5 table, rowid = (user_id << 32) + transaction id (see app/search.py)
+    """CREATE VIRTUAL TABLE IF NOT EXISTS transactions_archive_fts USING fts5(
+        description, content='', tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS transactions_archive_fts_insert AFTER INSERT ON transactions_archive BEGIN
+        INSERT INTO transactions_archive_fts(rowid, description) VALUES ((new.user_id << 32) + new.id, new.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS transactions_archive_fts_delete AFTER DELETE ON transactions_archive BEGIN
+        INSERT INTO transactions_archive_fts(transactions_archive_fts, rowid, description)
+        VALUES ('delete', (old.user_id << 32) + old.id, old.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS transactions_archive_fts_update AFTER UPDATE OF description, user_id ON transactions_archive BEGIN
+        INSERT INTO transactions_archive_fts(transactions_archive_fts, rowid, description)
+        VALUES ('delete', (old.user_id << 32) + old.id, old.description);
+        INSERT INTO transactions_archive_fts(rowid, description) VALUES ((new.user_id << 32) + new.id, new.description);
+    END""",
+    # index every archived row (contentless tables can't 'rebuild')
+    "INSERT INTO transactions_archive_fts(transactions_archive_fts) VALUES ('delete-all')",
+    "INSERT INTO transactions_archive_fts(rowid, description) SELECT (user_id << 32) + id, description FROM transactions_archive",
+]
+
+POSTGRES_UPGRADE = [
+    "CREATE INDEX IF NOT EXISTS ix_transactions_archive_description_fts ON transactions_archive "
+    "USING gin (to_tsvector('simple', coalesce(transactions_archive.description, '')))",
+]
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+    statements = SQLITE_UPGRADE if dialect == "sqlite" else POSTGRES_UPGRADE if dialect == "postgresql" else []
+    for statement in statements:
+        op.execute(statement)
+
+
+def downgrade():
+    if op.get_bind().dialect.name == "sqlite":
+        for trigger in ("transactions_archive_fts_insert", "transactions_archive_fts_delete", "transactions_archive_fts_update"):
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        op.execute("DROP TABLE IF EXISTS transactions_archive_fts")
+    elif op.get_bind().dialect.name == "postgresql":
+        op.execute("DROP INDEX IF EXISTS ix_transactions_archive_description_fts")
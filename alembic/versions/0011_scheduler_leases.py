@@ -0,0 +1,34 @@
+"""scheduler lease
+
+Creates scheduler_leases: one row per background job naming the process that
+runs it until expires_at, so only one worker runs the recurring scheduler
+(app/recurring.py). App startup (create_all) may have created it already.
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0011"
+down_revision = "0010"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if not sa.inspect(op.get_bind()).has_table("scheduler_leases"):
+        op.create_table(
+            "scheduler_leases",
+            sa.Column("name", sa.String(64), nullable=False),
+            sa.Column("holder", sa.String(128), nullable=False),
+            sa.Column("expires_at", sa.DateTime(), nullable=False),
+            sa.PrimaryKeyConstraint("name"),
+        )
+
+
+def downgrade():
+    op.drop_table("scheduler_leases")
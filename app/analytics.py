@@ -0,0 +1,298 @@
+import os
+from datetime import date
+from typing import Iterable, Optional
+
+import numpy as np
+from sqlalchemy import Integer, String, cast, func, literal_column, select, union_all
+from sqlalchemy.orm import Session
+
+from app import archive
+from app.cache import TTLCache
+from app.http_cache import data_version
+from app.models import Category
+
+# In-memory analytics
+# -------------------------
+# A user's whole history is loaded once as parallel NumPy arrays (sorted by date)
+# and every query is a date-range slice plus vectorized reductions. Stores are
+# cached per user and tagged with the user's data version (bumped on every write),
+# so the next query after a change reloads instead of answering from stale arrays.
+# Amounts are kept in integer cents to stay exact.
+
+INCOME, EXPENSE, UNCATEGORIZED = 1, -1, 0
+
+#sort key for percentiles: category in the high bits, amount in cents (Numeric(12, 2),
+#so |cents| < 10**12 < 2**40) shifted to be non-negative in the low bits
+AMOUNT_BITS = 41
+AMOUNT_OFFSET = 1 << 40
+AMOUNT_MASK = (1 << AMOUNT_BITS) - 1
+
+store_cache = TTLCache(
+    max_size=int(os.getenv("ANALYTICS_CACHE_USERS", "8")),
+    ttl=float(os.getenv("ANALYTICS_CACHE_TTL_SECONDS", "600")),
+)
+
+
+class ColumnStore:
+    """One user's transactions as column arrays, sorted by date.
+
+    Category k (== len(category_ids)) stands for "no category".
+    """
+
+    def __init__(self, days, cents, category_index, category_ids, category_names, category_kinds):
+        self.days = days # datetime64[D]
+        self.months = days.astype("datetime64[M]").astype(np.int64) # months since 1970-01
+        self.cents = cents # int64
+        self.category_index = category_index # int64, 0..k
+        self.category_ids = category_ids # list, position = category index
+        self.category_names = category_names + ["Uncategorized"]
+        self.category_kinds = np.array(category_kinds + [UNCATEGORIZED], dtype=np.int8) # by category position
+        self.kinds = self.category_kinds[category_index]
+
+        #prefix sums: income/expense of any row range [a, b) is cumsum[b] - cumsum[a]
+        self.income_cumsum = np.concatenate(([0], np.cumsum(np.where(self.kinds == INCOME, cents, 0))))
+        self.expense_cumsum = np.concatenate(([0], np.cumsum(np.where(self.kinds == EXPENSE, cents, 0))))
+
+        #first row of every month present, so monthly totals need no pass over the rows
+        self.month_starts = np.flatnonzero(np.diff(self.months, prepend=-1))
+
+        #per-category running totals at every month boundary: whole months of a window
+        #come from two rows of this table, only the partial edge months touch the rows
+        width = len(self.category_names)
+        boundaries = np.append(self.month_starts, len(cents))
+        month_rank = np.repeat(np.arange(len(self.month_starts)), np.diff(boundaries))
+        keys = month_rank * width + category_index
+        shape = (len(self.month_starts), width)
+        self.boundaries = boundaries
+        self.category_cumsum = np.vstack((np.zeros(width, dtype=np.int64), np.cumsum(
+            np.bincount(keys, weights=cents, minlength=shape[0] * width).astype(np.int64).reshape(shape), axis=0)))
+        self.category_count_cumsum = np.vstack((np.zeros(width, dtype=np.int64), np.cumsum(
+            np.bincount(keys, minlength=shape[0] * width).reshape(shape), axis=0)))
+
+    def __len__(self):
+        return len(self.cents)
+
+    @property
+    def nbytes(self) -> int:
+        arrays = (self.days, self.months, self.cents, self.category_index, self.kinds,
+                  self.income_cumsum, self.expense_cumsum, self.month_starts, self.boundaries,
+                  self.category_cumsum, self.category_count_cumsum)
+        return sum(array.nbytes for array in arrays)
+
+    def window(self, start_date: Optional[date] = None, end_date: Optional[date] = None) -> slice:
+        #rows are sorted by date, so an inclusive date range is one contiguous slice
+        start = 0 if start_date is None else np.searchsorted(self.days, np.datetime64(start_date, "D"), side="left")
+        end = len(self) if end_date is None else np.searchsorted(self.days, np.datetime64(end_date, "D"), side="right")
+        return slice(int(start), int(max(start, end)))
+
+    def category_totals(self, rows: slice):
+        """(cents, counts) per category position over a row slice."""
+        width = len(self.category_names)
+
+        def scan(start, stop):
+            index = self.category_index[start:stop]
+            return (np.bincount(index, weights=self.cents[start:stop], minlength=width).astype(np.int64),
+                    np.bincount(index, minlength=width))
+
+        first = int(np.searchsorted(self.boundaries, rows.start, side="left"))
+        last = int(np.searchsorted(self.boundaries, rows.stop, side="right")) - 1
+        if first >= last:
+            return scan(rows.start, rows.stop)
+        head_totals, head_counts = scan(rows.start, self.boundaries[first])
+        tail_totals, tail_counts = scan(self.boundaries[last], rows.stop)
+        totals = self.category_cumsum[last] - self.category_cumsum[first] + head_totals + tail_totals
+        counts = self.category_count_cumsum[last] - self.category_count_cumsum[first] + head_counts + tail_counts
+        return totals, counts
+
+    def category_position(self, category_id: Optional[int]) -> Optional[int]:
+        if category_id is None:
+            return len(self.category_ids)
+        try:
+            return self.category_ids.index(category_id)
+        except ValueError:
+            return None
+
+
+def load_store(db: Session, user_id: int) -> ColumnStore:
+    categories = (
+        db.query(Category.id, Category.name, Category.type)
+        .filter(Category.user_id == user_id)
+        .order_by(Category.id)
+        .all()
+    )
+    category_ids = [row.id for row in categories]
+    kinds = [INCOME if row.type == "income" else EXPENSE if row.type == "expense" else UNCATEGORIZED for row in categories]
+
+    #dates as ISO strings (NumPy parses them in C) and amounts as integer cents: no date/Decimal
+    #objects per row. Plain tuples are read from the DBAPI cursor, building a Row per
+    #transaction would cost more than the fetch itself.
+    #hot and archived rows, merged in date order by the database
+    history = union_all(*archive.selects(lambda model: (
+        select(
+            cast(model.date, String).label("day"),
+            cast(func.round(model.amount * 100), Integer),
+            func.coalesce(model.category_id, -1),
+            model.id.label("id"),
+        )
+        .where(model.user_id == user_id)
+    )))
+    result = db.connection().execute(history.order_by(literal_column("day"), literal_column("id")))
+    rows = result.cursor.fetchall()
+    result.close()
+
+    if rows:
+        day_strings, cents, raw_category_ids, _ = zip(*rows)
+    else:
+        day_strings, cents, raw_category_ids = (), (), ()
+
+    #map category ids onto 0..k-1 (ids are sorted), NULL (-1) -> k
+    id_array = np.array(category_ids, dtype=np.int64)
+    raw = np.array(raw_category_ids, dtype=np.int64)
+    category_index = np.searchsorted(id_array, raw)
+    known = np.zeros(len(raw), dtype=bool)
+    if len(category_ids):
+        known = id_array[np.minimum(category_index, len(category_ids) - 1)] == raw
+    category_index[~known] = len(category_ids) #NULL or a category that no longer exists
+
+    return ColumnStore(
+        days=np.array(day_strings, dtype="datetime64[D]"),
+        cents=np.array(cents, dtype=np.int64),
+        category_index=category_index.astype(np.int64),
+        category_ids=category_ids,
+        category_names=[row.name for row in categories],
+        category_kinds=kinds,
+    )
+
+
+def get_store(db: Session, user_id: int) -> ColumnStore:
+    version = data_version(user_id)
+    cached = store_cache.get(user_id)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    store = load_store(db, user_id)
+    store_cache.set(user_id, (version, store))
+    return store
+
+
+def to_amount(cents) -> float:
+    return round(float(cents) / 100, 2)
+
+
+# Queries
+# -------------------------
+# Same semantics as the SQL summaries: uncategorized transactions count towards
+# neither income nor expense.
+
+def summary(store: ColumnStore, start_date=None, end_date=None) -> dict:
+    rows = store.window(start_date, end_date)
+    income = int(store.income_cumsum[rows.stop] - store.income_cumsum[rows.start])
+    expense = int(store.expense_cumsum[rows.stop] - store.expense_cumsum[rows.start])
+    return {"total_income": to_amount(income), "total_expense": to_amount(expense), "balance": to_amount(income - expense)}
+
+
+def monthly(store: ColumnStore, start_date=None, end_date=None) -> list[dict]:
+    rows = store.window(start_date, end_date)
+    if rows.start == rows.stop:
+        return []
+
+    #month boundaries inside the window, clipped to it at both ends
+    first = np.searchsorted(store.month_starts, rows.start, side="right")
+    last = np.searchsorted(store.month_starts, rows.stop, side="left")
+    bounds = np.concatenate(([rows.start], store.month_starts[first:last], [rows.stop]))
+    month_values = store.months[bounds[:-1]]
+    income = np.diff(store.income_cumsum[bounds])
+    expense = np.diff(store.expense_cumsum[bounds])
+
+    return [
+        {
+            "year": int(month // 12 + 1970),
+            "month": int(month % 12 + 1),
+            "total_income": to_amount(month_income),
+            "total_expense": to_amount(month_expense),
+            "balance": to_amount(month_income - month_expense),
+        }
+        for month, month_income, month_expense in zip(month_values, income, expense)
+    ]
+
+
+def breakdown(store: ColumnStore, start_date=None, end_date=None, type: Optional[str] = None) -> list[dict]:
+    totals, counts = store.category_totals(store.window(start_date, end_date))
+
+    wanted = {"income": INCOME, "expense": EXPENSE}.get(type)
+    return [
+        {
+            "category": store.category_names[position],
+            "category_id": store.category_ids[position] if position < len(store.category_ids) else None,
+            "total": to_amount(totals[position]),
+        }
+        for position in np.argsort(-totals, kind="stable")
+        if counts[position] and (wanted is None or store.category_kinds[position] == wanted)
+    ]
+
+
+def percentiles(store: ColumnStore, quantiles: Iterable[float], start_date=None, end_date=None,
+                type: Optional[str] = None) -> list[dict]:
+    """Per-category percentiles of single transaction amounts (linear interpolation, like numpy.percentile)."""
+    rows = store.window(start_date, end_date)
+    category_index, cents, kinds = store.category_index[rows], store.cents[rows], store.kinds[rows]
+    wanted = {"income": INCOME, "expense": EXPENSE}.get(type)
+    if wanted is not None:
+        keep = kinds == wanted
+        category_index, cents = category_index[keep], cents[keep]
+    if not len(cents):
+        return []
+
+    #sort by (category, amount) once; then every category is a sorted run and all
+    #percentiles of all categories are gathered with one fancy-indexing step.
+    #Both are packed into one int64 key, a plain sort is much cheaper than lexsort.
+    keys = np.sort((category_index << AMOUNT_BITS) + (cents + AMOUNT_OFFSET))
+    sorted_cents = ((keys & AMOUNT_MASK) - AMOUNT_OFFSET).astype(np.float64)
+    positions, starts, counts = np.unique(keys >> AMOUNT_BITS, return_index=True, return_counts=True)
+
+    q = np.asarray(list(quantiles), dtype=np.float64) / 100
+    rank = starts[:, None] + (counts[:, None] - 1) * q[None, :]
+    low = np.floor(rank).astype(np.int64)
+    high = np.ceil(rank).astype(np.int64)
+    values = sorted_cents[low] + (sorted_cents[high] - sorted_cents[low]) * (rank - low)
+
+    return [
+        {
+            "category": store.category_names[position],
+            "category_id": store.category_ids[position] if position < len(store.category_ids) else None,
+            "count": int(count),
+            "percentiles": {f"p{quantile:g}": to_amount(value) for quantile, value in zip(q * 100, row)},
+        }
+        for position, count, row in zip(positions, counts, values)
+    ]
+
+
+def budget_vs_actual(store: ColumnStore, budgets: dict, start_date: date, end_date: date) -> list[dict]:
+    """One line per (month, budgeted category): monthly budget, amount spent/received, remaining."""
+    rows = store.window(start_date, end_date)
+    months, category_index, cents = store.months[rows], store.category_index[rows], store.cents[rows]
+
+    first_month = (start_date.year - 1970) * 12 + start_date.month - 1
+    last_month = (end_date.year - 1970) * 12 + end_date.month - 1
+    month_count = last_month - first_month + 1
+    width = len(store.category_names)
+
+    #actual[month, category] via a single bincount over a combined key
+    keys = (months - first_month) * width + category_index
+    actual = np.bincount(keys, weights=cents, minlength=month_count * width).reshape(month_count, width)
+
+    lines = []
+    for offset in range(month_count):
+        month = first_month + offset
+        for category_id, budget in budgets.items():
+            position = store.category_position(category_id)
+            spent = to_amount(actual[offset, position])
+            lines.append({
+                "category": store.category_names[position],
+                "category_id": category_id,
+                "year": month // 12 + 1970,
+                "month": month % 12 + 1,
+                "budget": float(budget),
+                "actual": spent,
+                "remaining": round(float(budget) - spent, 2),
+            })
+    return lines
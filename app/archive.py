@@ -0,0 +1,104 @@
+import os
+from datetime import date, timedelta
+from typing import Optional
+from sqlalchemy import func, insert, select
+from sqlalchemy.orm import Session
+from app.db import SessionLocal
+from app.http_cache import bump_data_version
+from app.models import Transaction, TransactionArchive, User
+
+# Transaction archive
+# -------------------------
+# Transactions older than ARCHIVE_AFTER_DAYS move from `transactions` to
+# `transactions_archive` (same ids, same columns). The hot table, its indexes and its
+# full-text index then only hold recent history, which is what almost every request
+# reads; the archive has a full-text index of its own (app/search.py). Rollups aren't touched: the archived months keep their rows there, so the
+# summaries stay complete without reading the archive.
+#
+# Readers that need raw rows of any age build their SELECT once per table with
+# selects() and UNION ALL the two; list_transactions only reaches into the archive
+# when its page can contain archived rows (see archived_through). Archived rows are
+# read-only through the API; deleting a category or a user still removes them.
+
+ARCHIVE_AFTER_DAYS = int(os.getenv("ARCHIVE_AFTER_DAYS", "365")) #default horizon of archive_transactions.py
+ARCHIVE_CHUNK_SIZE = 500 #rows moved per DB transaction
+
+COLUMNS = ("id", "user_id", "category_id", "amount", "description", "date", "created_at", "recurring_rule_id")
+
+
+def selects(build) -> list:
+    """[build(Transaction), build(TransactionArchive)]: the same SELECT over both tables, for union_all()."""
+    return [build(Transaction), build(TransactionArchive)]
+
+
+def archived_through(db: Session, user_id: int) -> Optional[date]:
+    """Date of the user's newest archived transaction (None = nothing archived). One index seek."""
+    return (
+        db.query(func.max(TransactionArchive.date))
+        .filter(TransactionArchive.user_id == user_id)
+        .scalar()
+    )
+
+
+def horizon(days: int = ARCHIVE_AFTER_DAYS, today: Optional[date] = None) -> date:
+    return (today or date.today()) - timedelta(days=days)
+
+
+# Archiving
+# -------------------------
+
+def archive_user(db: Session, user_id: int, before: date) -> int:
+    """Move the user's transactions dated before `before` to the archive; commits per chunk."""
+    moved = 0
+    while True:
+        #FOR UPDATE (Postgres): an edit can't land between the copy and the delete and get lost
+        ids = [
+            tx_id for (tx_id,) in db.query(Transaction.id)
+            .filter(Transaction.user_id == user_id, Transaction.date < before)
+            .limit(ARCHIVE_CHUNK_SIZE)
+            .with_for_update()
+        ]
+        if not ids:
+            return moved
+
+        #the date condition again: a row moved forward since the SELECT (SQLite has no FOR UPDATE) stays hot
+        chunk = [Transaction.id.in_(ids), Transaction.date < before]
+        db.execute(insert(TransactionArchive).from_select(
+            COLUMNS,
+            select(*[getattr(Transaction, column) for column in COLUMNS]).where(*chunk),
+        ))
+        moved += db.query(Transaction).filter(*chunk).delete(synchronize_session=False)
+        db.commit()
+
+
+def archive_all(before: date, user_id: Optional[int] = None) -> int:
+    """archive_user() for one user or everyone, one session per user."""
+    db = SessionLocal()
+    try:
+        if user_id is not None:
+            user_ids = [user_id]
+        else:
+            user_ids = [uid for (uid,) in db.query(User.id).order_by(User.id)]
+    finally:
+        db.close()
+
+    moved = 0
+    for uid in user_ids:
+        db = SessionLocal()
+        try:
+            moved_now = archive_user(db, uid, before)
+        finally:
+            db.close()
+        if moved_now:
+            #the rows now come from the archive (searches rank them through its own index):
+            #the user's cached responses shouldn't outlive the move
+            bump_data_version(uid)
+        moved += moved_now
+    return moved
+
+
+def count_archivable(db: Session, before: date, user_id: Optional[int] = None) -> int:
+    query = db.query(func.count(Transaction.id)).filter(Transaction.date < before)
+    if user_id is not None:
+        query = query.filter(Transaction.user_id == user_id)
+    return query.scalar()
@@ -0,0 +1,398 @@
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from app.resp import RespConnection, RespError, parse_url
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+class TTLCache:
+    """Small thread-safe LRU cache whose entries also expire after `ttl` seconds.
+
+    max_size=0 or ttl=0 disables caching (every get is a miss).
+    """
+
+    def __init__(self, max_size: int = 1024, ttl: float = 60.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data = OrderedDict() # key -> (expires_at, value), least recently used first
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0 and self.ttl > 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is not _MISSING:
+                expires_at, value = entry
+                if expires_at > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return default
+
+    def set(self, key, value):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+# Response cache backends
+# -------------------------
+# Entries are opaque bytes keyed by a string that already contains the user's data
+# version, so a write never has to find and delete entries: bump() moves the version
+# on and old entries simply stop matching (and age out of the LRU / TTL).
+
+class CacheUnavailable(Exception):
+    pass
+
+
+class LocalCache:
+    """In-process backend: an LRU of entries plus per-user versions. Not shared between workers."""
+
+    name = "local"
+    shared = False # True when get_remote/version/set may do network I/O
+
+    def __init__(self, max_size: int = 5000, ttl: float = 300.0, write_window: float = 0.0, on_remote_write=None):
+        self.entries = TTLCache(max_size=max_size, ttl=ttl)
+        self.boot_id = uuid.uuid4().hex[:12] #keeps versions from colliding across restarts
+        self._versions = {}
+        self._lock = threading.Lock()
+        #read-your-writes with replicas: how long a write is announced to the other workers,
+        #and the callback marking a user another worker wrote for (see RedisCache)
+        self.write_window = write_window
+        self.on_remote_write = on_remote_write
+
+    def get_local(self, key: str):
+        return self.entries.get(key)
+
+    def get_remote(self, key: str):
+        return None
+
+    def set(self, key: str, value: bytes):
+        self.entries.set(key, value)
+
+    def known_version(self, user_id: int):
+        """Current version if it is known without a network round trip, else None."""
+        return self.version(user_id)
+
+    def version(self, user_id: int) -> str:
+        return f"{self.boot_id}.{self._versions.get(user_id, 0)}"
+
+    def bump(self, user_id: int):
+        with self._lock:
+            self._versions[user_id] = self._versions.get(user_id, 0) + 1
+
+    def stats(self) -> dict:
+        return {"backend": self.name, "local": self.entries.stats()}
+
+    def warm(self):
+        """Startup pre-warming (STARTUP_PREWARM): nothing to connect to."""
+
+    def close(self):
+        pass
+
+
+class RedisCache(LocalCache):
+    """Entries and versions shared by every worker through a Redis-protocol server.
+
+    The LocalCache stays in front as a first level and takes over while the server
+    is unreachable. bump() INCRs the user's shared version and PUBLISHes it on
+    INVALIDATION_CHANNEL; a subscriber thread in each worker applies it, so entries
+    cached by the other workers stop matching immediately.
+
+    With a write_window (read replicas), bump() also sets a "wrote" key expiring after
+    it. A worker learning the new version, from the channel or from the server, learns
+    about the write first and calls on_remote_write: it then reads that user from the
+    primary too, and never caches replica data under the new version.
+    """
+
+    name = "redis"
+    shared = True
+    INVALIDATION_CHANNEL = "invalidate"
+
+    def __init__(self, url: str, max_size: int = 5000, ttl: float = 300.0, write_window: float = 0.0,
+                 on_remote_write=None, prefix: str = "finance-tracker", timeout: float = 0.5,
+                 retry_interval: float = 5.0):
+        super().__init__(max_size=max_size, ttl=ttl, write_window=write_window, on_remote_write=on_remote_write)
+        self.address = parse_url(url)
+        self.prefix = prefix
+        self.timeout = timeout
+        self.retry_interval = retry_interval
+        self.channel = self._key(self.INVALIDATION_CHANNEL)
+
+        self._connections = threading.local() #one connection per thread, no locking needed
+        self._down_until = 0.0
+        self._reconnected = False
+        self._pending_bumps = set() #users written while the server was unreachable
+        self._shared_versions = {} #user_id -> int, kept current by the subscriber
+        self._subscribed = threading.Event()
+        self._subscriber = None
+        self._subscriber_conn = None
+        self._closed = False
+
+        self.remote_hits = 0
+        self.remote_misses = 0
+        self.errors = 0
+
+    def _key(self, *parts) -> str:
+        return ":".join([self.prefix, *map(str, parts)])
+
+    # Connections / fallback
+    # -------------------------
+
+    def _command(self, *args):
+        conn = getattr(self._connections, "conn", None)
+        try:
+            if conn is None:
+                conn = self._connections.conn = RespConnection(**self.address, timeout=self.timeout)
+            return conn.command(*args)
+        except (OSError, RespError) as exc:
+            if conn is not None:
+                conn.close()
+            self._connections.conn = None
+            self.errors += 1
+            if time.monotonic() >= self._down_until:
+                logger.warning("Cache server %s:%s unavailable (%s), using the local cache",
+                               self.address["host"], self.address["port"], exc)
+            self._down_until = time.monotonic() + self.retry_interval
+            self._reconnected = True
+            raise CacheUnavailable() from exc
+
+    def available(self) -> bool:
+        if time.monotonic() < self._down_until:
+            return False
+        if self._reconnected:
+            #the server may have restarted empty and counters start over: drop what we cached
+            self._reconnected = False
+            self._forget()
+        if self._pending_bumps:
+            try:
+                for user_id in list(self._pending_bumps):
+                    self._publish_bump(user_id)
+                    self._pending_bumps.discard(user_id)
+            except CacheUnavailable:
+                return False
+        return True
+
+    # Entries
+    # -------------------------
+
+    def get_remote(self, key: str):
+        if not self.entries.enabled or not self.available():
+            return None
+        try:
+            value = self._command("GET", self._key("response", key))
+        except CacheUnavailable:
+            return None
+        if value is None:
+            self.remote_misses += 1
+            return None
+        self.remote_hits += 1
+        self.entries.set(key, value)
+        return value
+
+    def set(self, key: str, value: bytes):
+        self.entries.set(key, value)
+        if self.entries.enabled and self.available():
+            try:
+                self._command("SET", self._key("response", key), value, "PX", int(self.entries.ttl * 1000))
+            except CacheUnavailable:
+                pass
+
+    # Versions
+    # -------------------------
+    # While the server is down versions come from LocalCache (boot id + local counter),
+    # so this worker still never serves its own stale data; the missed shared bumps are
+    # replayed as soon as the server answers again.
+
+    def known_version(self, user_id: int):
+        if time.monotonic() < self._down_until:
+            return super().version(user_id)
+        self._start_subscriber()
+        if self._subscribed.is_set():
+            shared = self._shared_versions.get(user_id)
+            if shared is not None:
+                return f"r{shared}"
+        return None
+
+    def version(self, user_id: int) -> str:
+        known = self.known_version(user_id)
+        if known is not None:
+            return known
+        if not self.available():
+            return super().version(user_id)
+        try:
+            if self.write_window:
+                shared, wrote = self._command("MGET", self._key("version", user_id), self._key("wrote", user_id))
+                if wrote is not None:
+                    self._note_remote_write(user_id)
+            else:
+                shared = self._command("GET", self._key("version", user_id))
+            shared = int(shared or 0)
+        except CacheUnavailable:
+            return super().version(user_id)
+        if self._subscribed.is_set(): #without a subscription we can't tell when it changes
+            self._remember_version(user_id, shared)
+        return f"r{shared}"
+
+    def bump(self, user_id: int):
+        super().bump(user_id)
+        if self.available():
+            try:
+                self._publish_bump(user_id)
+                return
+            except CacheUnavailable:
+                pass
+        self._pending_bumps.add(user_id)
+
+    def _publish_bump(self, user_id: int):
+        if self.write_window: #before the version: whoever sees the new version sees the write
+            self._command("SET", self._key("wrote", user_id), 1, "PX", int(self.write_window * 1000))
+        shared = self._command("INCR", self._key("version", user_id))
+        self._remember_version(user_id, shared)
+        self._command("PUBLISH", self.channel, f"{user_id}:{shared}")
+
+    def _note_remote_write(self, user_id: int):
+        if self.on_remote_write is not None:
+            self.on_remote_write(user_id)
+
+    def _remember_version(self, user_id: int, shared: int):
+        with self._lock:
+            if shared > self._shared_versions.get(user_id, -1):
+                self._shared_versions[user_id] = shared
+
+    def _forget(self):
+        with self._lock:
+            self._shared_versions.clear()
+        self.entries.clear()
+
+    # Invalidation channel
+    # -------------------------
+
+    def _start_subscriber(self):
+        if self._subscriber is not None:
+            return
+        with self._lock:
+            if self._subscriber is None:
+                self._subscriber = threading.Thread(target=self._listen, name="cache-invalidation", daemon=True)
+                self._subscriber.start()
+
+    def _listen(self):
+        while not self._closed:
+            conn = None
+            try:
+                conn = self._subscriber_conn = RespConnection(**self.address, timeout=self.timeout)
+                conn.command("SUBSCRIBE", self.channel)
+                conn.sock.settimeout(None) #wait for messages indefinitely
+                #bumps may have been missed while we weren't listening: forget what we knew
+                self._forget()
+                self._subscribed.set()
+                while True:
+                    kind, _, data = conn.read_reply()
+                    if kind == b"message":
+                        user_id, _, shared = data.decode().partition(":")
+                        if self.write_window: #every bump is a write
+                            self._note_remote_write(int(user_id))
+                        self._remember_version(int(user_id), int(shared))
+            except (OSError, RespError, ValueError):
+                pass
+            finally:
+                self._subscribed.clear()
+                if conn is not None:
+                    conn.close()
+            if not self._closed:
+                time.sleep(self.retry_interval)
+
+    def stats(self) -> dict:
+        lookups = self.remote_hits + self.remote_misses
+        return {
+            **super().stats(),
+            "remote": {
+                "url": f"redis://{self.address['host']}:{self.address['port']}/{self.address['db']}",
+                "available": time.monotonic() >= self._down_until,
+                "subscribed": self._subscribed.is_set(),
+                "hits": self.remote_hits,
+                "misses": self.remote_misses,
+                "hit_ratio": round(self.remote_hits / lookups, 4) if lookups else 0.0,
+                "errors": self.errors,
+                "pending_invalidations": len(self._pending_bumps),
+            },
+        }
+
+    def warm(self):
+        #reach the server and subscribe now: until the subscription is up every request
+        #pays a round trip for the user's version
+        if not self.available():
+            return
+        try:
+            self._command("PING")
+        except CacheUnavailable:
+            return
+        self._start_subscriber()
+
+    def close(self):
+        self._closed = True
+        if self._subscriber_conn is not None:
+            self._subscriber_conn.close()
+
+
+# Deployment
+# -------------------------
+# uvicorn --workers and gunicorn take their default worker count from WEB_CONCURRENCY.
+# Caches of the local backend live in one worker and never hear about the others'
+# writes (UNSHARED_WORKERS).
+
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "local")
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", "1"))
+UNSHARED_WORKERS = CACHE_BACKEND == "local" and WEB_CONCURRENCY > 1
+
+
+def make_cache(backend: str = "local", url: str = "", max_size: int = 5000, ttl: float = 300.0,
+               write_window: float = 0.0, on_remote_write=None) -> LocalCache:
+    options = dict(max_size=max_size, ttl=ttl, write_window=write_window, on_remote_write=on_remote_write)
+    if backend == "local":
+        return LocalCache(**options)
+    if backend == "redis":
+        return RedisCache(url or "redis://localhost:6379/0", **options)
+    raise ValueError(f"Unknown CACHE_BACKEND '{backend}' (expected local or redis)")
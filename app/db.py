@@ -1,8 +1,14 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker, declarative_base, Session
+from sqlalchemy.pool import QueuePool
+import itertools
 import os
+import threading
+import time
 from pathlib import Path
 from dotenv import load_dotenv
+from app import metrics
+from app.cache import TTLCache
 
 load_dotenv() #load .env file 
 
@@ -12,10 +18,141 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 # Use DB from .env if provided, otherwise fallback to dev.db in project root
 DATABASE_URL = os.getenv("DATABASE_URL", f"sqlite:///{BASE_DIR / 'dev.db'}")
 
+IS_SQLITE = DATABASE_URL.startswith("sqlite")
+IS_SQLITE_MEMORY = IS_SQLITE and (DATABASE_URL in ("sqlite://", "sqlite:///:memory:") or "mode=memory" in DATABASE_URL)
+
+def env_bool(name: str, default: str) -> bool:
+    return os.getenv(name, default).lower() in ("1", "true", "yes")
+
+# Connection pool (QueuePool for Postgres and SQLite files)
+# -------------------------
+POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+POOL_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30")) #seconds to wait for a free connection
+POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800")) #seconds before a connection is replaced (-1 = never)
+POOL_PRE_PING = env_bool("DB_POOL_PRE_PING", "true") #test connections on checkout, drops dead ones
+
+# SQLite tuning profile: "tuned" (WAL etc., below) or "default" (SQLite's own settings)
+SQLITE_PROFILE = os.getenv("SQLITE_PROFILE", "tuned")
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+SQLITE_CACHE_SIZE_KB = int(os.getenv("SQLITE_CACHE_SIZE_KB", "65536"))
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+
+
+class PoolStats:
+    """Counters for connection checkouts, including how long callers waited for one."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.connections_created = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def record_wait(self, seconds: float, timed_out: bool = False):
+        with self._lock:
+            self.checkouts += not timed_out
+            self.timeouts += timed_out
+            self.wait_seconds_total += seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+
+    def as_dict(self, pool) -> dict:
+        stats = {
+            "checkouts": self.checkouts,
+            "connections_created": self.connections_created,
+            "timeouts": self.timeouts,
+            "wait_seconds_total": round(self.wait_seconds_total, 6),
+            "wait_seconds_max": round(self.wait_seconds_max, 6),
+        }
+        stats.update(pool_usage(pool))
+        return stats
+
+def pool_usage(pool) -> dict:
+    if not isinstance(pool, QueuePool):
+        return {}
+    return {
+        "pool_size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "idle": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+    }
+
+pool_stats = PoolStats()
+
+
+class TimedQueuePool(QueuePool):
+    #QueuePool that reports how long each checkout waited (the time spent blocked on a full pool)
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except Exception:
+            pool_stats.record_wait(time.perf_counter() - started, timed_out=True)
+            raise
+        pool_stats.record_wait(time.perf_counter() - started)
+        return connection
+
+
+def engine_options() -> dict:
+    if IS_SQLITE_MEMORY:
+        return {"connect_args": {"check_same_thread": False}}
+
+    options = {
+        "poolclass": TimedQueuePool,
+        "pool_size": POOL_SIZE,
+        "max_overflow": POOL_MAX_OVERFLOW,
+        "pool_timeout": POOL_TIMEOUT,
+        "pool_recycle": POOL_RECYCLE,
+        "pool_pre_ping": POOL_PRE_PING,
+    }
+    if IS_SQLITE:
+        options["connect_args"] = {"check_same_thread": False}
+    return options
+
 #create sqlAlchemy engine
-engine = create_engine(
-    DATABASE_URL, connect_args={"check_same_thread": False}
-)
+engine = create_engine(DATABASE_URL, **engine_options())
+
+def enable_foreign_keys(dbapi_connection, connection_record):
+    #SQLite ignores foreign keys (ON DELETE CASCADE / SET NULL included) unless each connection asks
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+
+def on_connect(dbapi_connection, connection_record):
+    pool_stats.connections_created += 1
+
+    if IS_SQLITE:
+        enable_foreign_keys(dbapi_connection, connection_record)
+    if not IS_SQLITE or SQLITE_PROFILE != "tuned":
+        return
+
+    #WAL lets readers keep going while a writer commits, NORMAL sync is safe with WAL
+    cursor = dbapi_connection.cursor()
+    if not IS_SQLITE_MEMORY:
+        cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.execute(f"PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KB}")
+    cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.close()
+
+event.listen(engine, "connect", on_connect)
+
+# Statement timing (app/metrics.py)
+# -------------------------
+def instrument(sync_engine):
+    #time every cursor execute (one statement at a time per connection, so one start time in conn.info)
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info["query_started"] = time.perf_counter()
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        metrics.record_statement(statement, parameters, time.perf_counter() - conn.info["query_started"], executemany)
+
+instrument(engine)
 
 #session factory for DB sessions
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -23,3 +160,134 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 #base class for models
 Base = declarative_base()
 
+# Async mode
+# -------------------------
+# DB_ASYNC=true serves the read/write JSON endpoints from async routes on an async
+# engine (app/routes/async_*.py). Needs an async driver: pip install aiosqlite / asyncpg.
+DB_ASYNC = os.getenv("DB_ASYNC", "false").lower() in ("1", "true", "yes")
+
+ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg", "postgres": "postgresql+asyncpg"}
+
+def to_async_url(url: str) -> str:
+    scheme, rest = url.split("://", 1)
+    return f"{ASYNC_DRIVERS.get(scheme.split('+')[0], scheme)}://{rest}"
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or to_async_url(DATABASE_URL)
+
+_async_sessionmaker = None
+
+def get_async_sessionmaker():
+    #created on first use so sync-only deployments never import the async driver
+    global _async_sessionmaker
+    if _async_sessionmaker is None:
+        from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+        connect_args = {"check_same_thread": False} if ASYNC_DATABASE_URL.startswith("sqlite") else {}
+        async_engine = create_async_engine(ASYNC_DATABASE_URL, connect_args=connect_args)
+        if ASYNC_DATABASE_URL.startswith("sqlite"):
+            event.listen(async_engine.sync_engine, "connect", enable_foreign_keys)
+        instrument(async_engine.sync_engine)
+        _async_sessionmaker = sessionmaker(
+            async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+        )
+    return _async_sessionmaker
+
+async def get_async_db():
+    async with get_async_sessionmaker()() as db:
+        yield db
+
+# Read replicas
+# -------------------------
+# DATABASE_REPLICA_URLS (comma-separated) adds engines for the read-only routes (lists,
+# summaries, export, categories; see app/dependencies/db.py), handed out round-robin.
+# Writes always go to DATABASE_URL. A user who wrote in the last READ_YOUR_WRITES_SECONDS
+# reads from the primary too, so their own change shows up while the replicas catch up.
+# bump_data_version() marks the write. With CACHE_BACKEND=redis the mark reaches the
+# other workers along with the new data version (app/cache.py), so no worker reads the
+# user from a replica, or caches what it read there, under that version.
+REPLICA_URLS = [url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()]
+READ_YOUR_WRITES_SECONDS = float(os.getenv("READ_YOUR_WRITES_SECONDS", "5"))
+
+replica_engines = []
+for url in REPLICA_URLS:
+    replica_engine = create_engine(url, **engine_options())
+    event.listen(replica_engine, "connect", on_connect)
+    instrument(replica_engine)
+    replica_engines.append(replica_engine)
+
+ReplicaSessions = [
+    sessionmaker(autocommit=False, autoflush=False, bind=e, info={"replica": True}) for e in replica_engines
+]
+_next_replica = itertools.count()
+
+recent_writers = TTLCache(max_size=100000, ttl=READ_YOUR_WRITES_SECONDS) #user id -> True while sticky
+
+def note_write(user_id: int):
+    if ReplicaSessions:
+        recent_writers.set(user_id, True)
+
+def wrote_recently(user_id: int) -> bool:
+    return recent_writers.get(user_id) is not None
+
+def reads_from_primary(user_id: int) -> bool:
+    return not ReplicaSessions or wrote_recently(user_id)
+
+def read_session(user_id: int) -> Session:
+    """Session for a read-only request: a replica, or the primary if the user wrote recently."""
+    if reads_from_primary(user_id):
+        return SessionLocal()
+    return ReplicaSessions[next(_next_replica) % len(ReplicaSessions)]()
+
+_async_replica_sessionmakers = None
+
+def get_async_read_sessionmaker(user_id: int):
+    #async counterpart of read_session, engines created on first use like the primary's
+    global _async_replica_sessionmakers
+    if reads_from_primary(user_id):
+        return get_async_sessionmaker()
+    if _async_replica_sessionmakers is None:
+        from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+        _async_replica_sessionmakers = []
+        for url in REPLICA_URLS:
+            async_url = to_async_url(url)
+            connect_args = {"check_same_thread": False} if async_url.startswith("sqlite") else {}
+            async_replica = create_async_engine(async_url, connect_args=connect_args)
+            instrument(async_replica.sync_engine)
+            _async_replica_sessionmakers.append(sessionmaker(
+                async_replica, class_=AsyncSession, autoflush=False, expire_on_commit=False, info={"replica": True}
+            ))
+    return _async_replica_sessionmakers[next(_next_replica) % len(_async_replica_sessionmakers)]
+
+
+# Startup pre-warming
+# -------------------------
+# STARTUP_PREWARM=true opens the pools' connections during lifespan startup (connect,
+# PRAGMAs, one round trip each) instead of on the first requests after a cold start.
+STARTUP_PREWARM = env_bool("STARTUP_PREWARM", "false")
+
+def prewarm_pool(target_engine, size: int = POOL_SIZE) -> int:
+    """Check out `size` connections at once, then return them all to the pool."""
+    if not isinstance(target_engine.pool, QueuePool):
+        return 0
+    connections = []
+    try:
+        for _ in range(size):
+            connections.append(target_engine.connect())
+            connections[-1].exec_driver_sql("SELECT 1")
+    finally:
+        for connection in connections:
+            connection.close()
+    return len(connections)
+
+async def prewarm_async_pool(size: int = POOL_SIZE) -> int:
+    async_engine = get_async_sessionmaker().kw["bind"]
+    connections = []
+    try:
+        for _ in range(size):
+            connections.append(await async_engine.connect())
+            await connections[-1].exec_driver_sql("SELECT 1")
+    finally:
+        for connection in connections:
+            await connection.close()
+    return len(connections)
@@ -1,13 +1,42 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, make_transient_to_detached
 from jose import JWTError, jwt
-from app.db import SessionLocal
+import os
+from app.db import SessionLocal, get_async_db
 from app.models import User
 from app.security import SECRET_KEY, ALGORITHM
+from app.cache import TTLCache, UNSHARED_WORKERS
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login") #reads the Authorization header
 
+# Authenticated-user cache
+# -------------------------
+# user id -> (column values of the User row, data version), so a valid token doesn't
+# cost a SELECT on every request. AUTH_CACHE_TTL_SECONDS=0 turns it off.
+#
+# An entry only counts while the user's data version (app.http_cache) is the one it was
+# stored under: deleting the account or changing the password bumps it, and with
+# CACHE_BACKEND=redis that reaches every worker. The local backend's versions stay in
+# their worker, so with several workers entries live AUTH_CACHE_UNSHARED_TTL_SECONDS at most.
+AUTH_CACHE_UNSHARED_TTL_SECONDS = 5.0
+
+user_cache = TTLCache(
+    max_size=int(os.getenv("AUTH_CACHE_MAX_SIZE", "10000")),
+    ttl=float(os.getenv("AUTH_CACHE_TTL_SECONDS", "60")),
+)
+if UNSHARED_WORKERS:
+    user_cache.ttl = min(user_cache.ttl, AUTH_CACHE_UNSHARED_TTL_SECONDS)
+
+USER_COLUMNS = [column.key for column in User.__table__.columns]
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_cached_user(mapper, connection, target):
+    user_cache.invalidate(target.id)
+
 def get_db():
     db = SessionLocal()
     try:
@@ -16,26 +45,91 @@ def get_db():
         db.close()
     
 
-def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db),
-):
-    credentials_exception = HTTPException(
+def credentials_exception():
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
 
+def decode_user_id(token: str) -> int:
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM]) #validates sign + expiration
         user_id: str | None = payload.get("sub")
         if user_id is None:
-            raise credentials_exception
-    except JWTError:
-        raise credentials_exception
+            raise credentials_exception()
+        return int(user_id)
+    except (JWTError, ValueError):
+        raise credentials_exception()
+
+def user_version(user_id: int) -> str:
+    from app.http_cache import response_cache #app.http_cache imports this module
+
+    version = response_cache.known_version(user_id)
+    return version if version is not None else response_cache.version(user_id)
+
+def cached_user(user_id: int, version: str, db) -> User | None:
+    cached = user_cache.get(user_id)
+    if cached is None or cached[1] != version:
+        return None
+    #rebuild the row and attach it to this request's session without a query
+    user = User(**cached[0])
+    make_transient_to_detached(user)
+    db.add(user)
+    return user
+
+def remember_user(user: User, version: str):
+    #version read before the user was loaded: a change landing in between makes the entry stale, never wrong
+    user_cache.set(user.id, ({key: getattr(user, key) for key in USER_COLUMNS}, version))
+
+def user_is_cached(user_id: int, version: str) -> bool:
+    cached = user_cache.get(user_id)
+    return cached is not None and cached[1] == version
+
+def load_user(user_id: int, version: str) -> bool:
+    """Whether the user still exists (one query); found users are remembered for the next request."""
+    with SessionLocal() as db:
+        user = db.query(User).filter(User.id == user_id).first()
+        if user is None:
+            return False
+        remember_user(user, version)
+        return True
+
+def get_current_user(
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db),
+):
+    user_id = decode_user_id(token)
+    version = user_version(user_id)
+
+    user = cached_user(user_id, version, db)
+    if user is not None:
+        return user
     
-    user = db.query(User).filter(User.id == int(user_id)).first()
+    user = db.query(User).filter(User.id == user_id).first()
+    if user is None:
+        raise credentials_exception()
+
+    remember_user(user, version)
+    return user
+
+async def get_current_user_async(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_async_db),
+):
+    #same as get_current_user, for routes running on the async engine
+    from app.http_cache import call_cache
+
+    user_id = decode_user_id(token)
+    version = await call_cache(user_version, user_id)
+
+    user = cached_user(user_id, version, db)
+    if user is not None:
+        return user
+
+    user = (await db.execute(select(User).where(User.id == user_id))).scalar_one_or_none()
     if user is None:
-        raise credentials_exception
+        raise credentials_exception()
 
+    remember_user(user, version)
     return user
\ No newline at end of file
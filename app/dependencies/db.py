@@ -0,0 +1,23 @@
+from fastapi import Depends, Request
+from app.db import read_session, get_async_read_sessionmaker
+from app.dependencies.auth import get_current_user, get_current_user_async
+from app.models import User
+
+# Read-only sessions
+# -------------------------
+# For routes that never write: a replica session when DATABASE_REPLICA_URLS is set,
+# the primary otherwise or right after the user's own write (app/db.py). A replica
+# read is flagged on the request for HTTPCacheMiddleware.
+
+def get_read_db(request: Request, current_user: User = Depends(get_current_user)):
+    db = read_session(current_user.id)
+    request.state.read_replica = db.info.get("replica", False)
+    try:
+        yield db
+    finally:
+        db.close()
+
+async def get_async_read_db(request: Request, current_user: User = Depends(get_current_user_async)):
+    async with get_async_read_sessionmaker(current_user.id)() as db:
+        request.state.read_replica = db.info.get("replica", False)
+        yield db
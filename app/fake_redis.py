@@ -0,0 +1,184 @@
+"""Small in-process server speaking the Redis protocol, for trying the shared cache
+without installing Redis (development, benchmarks, multi-worker checks).
+
+    python -m app.fake_redis --port 6379
+
+Supports the commands app.cache uses: PING, AUTH, SELECT, GET, MGET, SET (EX/PX), DEL,
+INCR, FLUSHALL, PUBLISH and SUBSCRIBE. Data lives in memory and is shared by all
+databases; it is not a Redis replacement.
+"""
+import argparse
+import socketserver
+import threading
+import time
+from app.resp import encode_command
+
+
+def simple(text: str) -> bytes:
+    return b"+" + text.encode() + b"\r\n"
+
+
+def error(text: str) -> bytes:
+    return b"-ERR " + text.encode() + b"\r\n"
+
+
+def integer(value: int) -> bytes:
+    return b":%d\r\n" % value
+
+
+def bulk(value) -> bytes:
+    return b"$-1\r\n" if value is None else b"$%d\r\n%s\r\n" % (len(value), value)
+
+
+class FakeRedisHandler(socketserver.StreamRequestHandler):
+    def setup(self):
+        super().setup()
+        self.server.connections.add(self.request)
+
+    def finish(self):
+        self.server.connections.discard(self.request)
+        self.server.unsubscribe(self)
+        super().finish()
+
+    def read_command(self):
+        line = self.rfile.readline()
+        if not line:
+            return None
+        if not line.startswith(b"*"):
+            return line.split() #inline command, e.g. "PING" typed into telnet
+        args = []
+        for _ in range(int(line[1:])):
+            length = int(self.rfile.readline()[1:])
+            args.append(self.rfile.read(length + 2)[:-2])
+        return args
+
+    def reply(self, data: bytes):
+        with self.server.lock: #PUBLISH from other connections writes to this socket too
+            self.wfile.write(data)
+
+    def handle(self):
+        while True:
+            try:
+                args = self.read_command()
+            except (OSError, ValueError):
+                return
+            if args is None:
+                return
+            if not args:
+                continue
+            try:
+                self.reply(self.server.execute(self, args[0].upper().decode(), args[1:]))
+            except OSError:
+                return
+
+
+class FakeRedisServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        super().__init__((host, port), FakeRedisHandler)
+        self.data = {} # key -> (value, expires_at or None)
+        self.channels = {} # channel -> set of subscribed handlers
+        self.connections = set()
+        self.lock = threading.RLock()
+        self.thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"redis://{host}:{port}/0"
+
+    def start(self) -> "FakeRedisServer":
+        self.thread = threading.Thread(target=self.serve_forever, name="fake-redis", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        """Shut down and drop every client connection (simulates the server going away)."""
+        self.shutdown()
+        self.server_close()
+        for sock in list(self.connections):
+            try:
+                sock.shutdown(2)
+                sock.close()
+            except OSError:
+                pass
+
+    def unsubscribe(self, handler):
+        with self.lock:
+            for subscribers in self.channels.values():
+                subscribers.discard(handler)
+
+    def lookup(self, key):
+        entry = self.data.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self.data[key]
+            return None
+        return value
+
+    def execute(self, handler, command: str, args: list) -> bytes:
+        with self.lock:
+            if command == "PING":
+                return simple("PONG")
+            if command in ("AUTH", "SELECT"):
+                return simple("OK")
+            if command == "GET":
+                return bulk(self.lookup(args[0]))
+            if command == "MGET":
+                return b"*%d\r\n" % len(args) + b"".join(bulk(self.lookup(key)) for key in args)
+            if command == "SET":
+                expires_at = None
+                options = [arg.upper() for arg in args[2:]]
+                if b"PX" in options:
+                    expires_at = time.monotonic() + int(args[2 + options.index(b"PX") + 1]) / 1000
+                elif b"EX" in options:
+                    expires_at = time.monotonic() + int(args[2 + options.index(b"EX") + 1])
+                self.data[args[0]] = (args[1], expires_at)
+                return simple("OK")
+            if command == "DEL":
+                return integer(sum(self.data.pop(key, None) is not None for key in args))
+            if command == "INCR":
+                try:
+                    value = int(self.lookup(args[0]) or 0) + 1
+                except ValueError:
+                    return error("value is not an integer or out of range")
+                self.data[args[0]] = (str(value).encode(), None)
+                return integer(value)
+            if command == "FLUSHALL":
+                self.data.clear()
+                return simple("OK")
+            if command == "PUBLISH":
+                subscribers = list(self.channels.get(args[0], ()))
+                message = encode_command([b"message", args[0], args[1]])
+                for subscriber in subscribers:
+                    try:
+                        subscriber.wfile.write(message)
+                    except OSError:
+                        self.channels[args[0]].discard(subscriber)
+                return integer(len(subscribers))
+            if command == "SUBSCRIBE":
+                replies = []
+                for channel in args:
+                    self.channels.setdefault(channel, set()).add(handler)
+                    count = sum(handler in subscribers for subscribers in self.channels.values())
+                    replies.append(b"*3\r\n" + bulk(b"subscribe") + bulk(channel) + integer(count))
+                return b"".join(replies)
+            return error(f"unknown command '{command}'")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6379)
+    args = parser.parse_args()
+
+    server = FakeRedisServer(args.host, args.port)
+    print(f"Fake Redis listening on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,170 @@
+import hashlib
+import os
+from urllib.parse import parse_qsl, urlencode
+from fastapi import HTTPException
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+from starlette.responses import Response
+from app.cache import CACHE_BACKEND, UNSHARED_WORKERS, make_cache
+from app.db import READ_YOUR_WRITES_SECONDS, ReplicaSessions, note_write, wrote_recently
+from app.dependencies.auth import decode_user_id, load_user, user_is_cached
+
+# HTTP response cache
+# -------------------------
+# Every write to a user's transactions/categories bumps that user's data version.
+# GET responses of the read endpoints are keyed by (user, path, query, version):
+# the key doubles as a strong ETag (If-None-Match -> 304) and as the key of an
+# in-process cache of the serialized body, so repeat loads skip the route and the
+# database. The token's user is still checked on every hit, through the user cache.
+#
+# CACHE_BACKEND=redis shares entries and versions between workers (see app.cache);
+# the default "local" backend keeps both in the worker process. A worker would then
+# keep answering 304 / cached bodies after another worker's write, so with several
+# workers (WEB_CONCURRENCY > 1) and the local backend the middleware steps aside.
+
+RESPONSE_CACHE_ENABLED = not UNSHARED_WORKERS
+
+CACHEABLE_PATHS = {
+    "/transaction",
+    "/transaction/summary",
+    "/transaction/summary/monthly",
+    "/transaction/summary/timeseries",
+    "/transaction/summary/categories",
+    "/categories",
+    "/analytics/summary",
+    "/analytics/monthly",
+    "/analytics/breakdown",
+    "/analytics/percentiles",
+}
+
+CACHE_CONTROL = "private, no-cache" #browsers keep it but always revalidate with If-None-Match
+
+response_cache = make_cache(
+    backend=CACHE_BACKEND,
+    url=os.getenv("CACHE_URL", "redis://localhost:6379/0"),
+    max_size=int(os.getenv("HTTP_CACHE_MAX_ENTRIES", "5000")),
+    ttl=float(os.getenv("HTTP_CACHE_TTL_SECONDS", "300")),
+    #with replicas, writes are announced to the other workers for the read-your-writes window
+    write_window=READ_YOUR_WRITES_SECONDS if ReplicaSessions else 0.0,
+    on_remote_write=note_write,
+)
+
+
+def bump_data_version(user_id: int):
+    """Call after committing any change to the user's transactions or categories."""
+    #read-your-writes: the user's next reads skip the replicas for a moment. Marked before
+    #the version changes, so no request sees the new version and still reads a replica.
+    note_write(user_id)
+    response_cache.bump(user_id)
+
+
+def data_version(user_id: int) -> str:
+    """Changes whenever bump_data_version(user_id) is called (in any worker with a shared backend)."""
+    return response_cache.version(user_id)
+
+
+async def call_cache(fn, *args):
+    #a shared backend may do network I/O: keep it off the event loop
+    if response_cache.shared:
+        return await run_in_threadpool(fn, *args)
+    return fn(*args)
+
+
+def user_id_from_authorization(authorization: str | None) -> int | None:
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        return decode_user_id(token)
+    except HTTPException:
+        return None #let the route produce the usual 401
+
+
+def make_etag(user_id: int, path: str, query_string: bytes, version: str) -> str:
+    query = urlencode(sorted(parse_qsl(query_string.decode("latin-1"), keep_blank_values=True)))
+    digest = hashlib.sha256(f"{user_id}|{path}|{query}|{version}".encode()).hexdigest()[:32]
+    return f'"{digest}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    return if_none_match.strip() == "*" or etag in [tag.strip() for tag in if_none_match.split(",")]
+
+
+# cache entries are bytes (they may go to Redis): header lines, blank line, body
+def encode_entry(raw_headers: list, body: bytes) -> bytes:
+    return b"".join(name + b": " + value + b"\r\n" for name, value in raw_headers) + b"\r\n" + body
+
+
+def decode_entry(entry: bytes):
+    head, _, body = entry.partition(b"\r\n\r\n")
+    raw_headers = [tuple(line.split(b": ", 1)) for line in head.split(b"\r\n")]
+    return raw_headers, body
+
+
+class HTTPCacheMiddleware:
+    """ETag / If-None-Match handling plus a response cache for CACHEABLE_PATHS (authenticated GETs)."""
+
+    def __init__(self, app, paths=CACHEABLE_PATHS):
+        self.app = app
+        self.paths = paths
+
+    async def __call__(self, scope, receive, send):
+        if not RESPONSE_CACHE_ENABLED:
+            return await self.app(scope, receive, send)
+        if scope["type"] != "http" or scope["method"] != "GET" or scope["path"] not in self.paths:
+            return await self.app(scope, receive, send)
+
+        headers = Headers(scope=scope)
+        user_id = user_id_from_authorization(headers.get("authorization"))
+        if user_id is None:
+            return await self.app(scope, receive, send)
+
+        #version is read before the route runs: a write landing meanwhile just changes the next ETag
+        version = response_cache.known_version(user_id)
+        if version is None:
+            version = await call_cache(response_cache.version, user_id)
+        #a valid token of a deleted account must not reach cached data
+        if not user_is_cached(user_id, version) and not await run_in_threadpool(load_user, user_id, version):
+            return await self.app(scope, receive, send) #the route answers 401
+        etag = make_etag(user_id, scope["path"], scope["query_string"], version)
+        cache_headers = [(b"etag", etag.encode()), (b"cache-control", CACHE_CONTROL.encode())]
+
+        if etag_matches(headers.get("if-none-match"), etag):
+            response = Response(status_code=304, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
+            return await response(scope, receive, send)
+
+        cached = response_cache.get_local(etag)
+        if cached is None and response_cache.shared:
+            cached = await call_cache(response_cache.get_remote, etag)
+        if cached is not None:
+            raw_headers, body = decode_entry(cached)
+            await send({"type": "http.response.start", "status": 200, "headers": raw_headers})
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        status = None
+        raw_headers = []
+        body_parts = []
+
+        def stale_replica_read():
+            #read from a replica while a write of the user is in flight (learned mid-request):
+            #may predate the write, so it isn't cached under this version
+            return scope.get("state", {}).get("read_replica", False) and wrote_recently(user_id)
+
+        async def send_and_capture(message):
+            nonlocal status, raw_headers
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if status == 200:
+                    raw_headers = list(message.get("headers", [])) + cache_headers
+                    message = {**message, "headers": raw_headers}
+            elif message["type"] == "http.response.body" and status == 200:
+                body_parts.append(message.get("body", b""))
+                if not message.get("more_body", False) and not stale_replica_read():
+                    #store before the last chunk goes out so the client's next request can hit it
+                    await call_cache(response_cache.set, etag, encode_entry(raw_headers, b"".join(body_parts)))
+            await send(message)
+
+        await self.app(scope, receive, send_and_capture)
@@ -0,0 +1,190 @@
+import csv
+import re
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+from typing import Iterable, Iterator, Optional
+
+# Bulk import pipeline
+# -------------------------
+# parse_* turn a text stream into (line_no, raw_record) pairs one record at a time,
+# RowValidator turns those into insertable dicts (or an error), chunked() groups them
+# for executemany. Nothing holds more than one chunk of rows in memory.
+#
+# Amounts are stored as magnitudes whatever the format: the category decides income vs
+# expense, so a bank's "-42.50" debit (OFX, QIF or CSV) is imported as 42.50.
+
+FORMATS = ("csv", "ofx", "qif")
+MAX_AMOUNT = Decimal("9999999999.99") # Numeric(12, 2)
+CENT = Decimal("0.01")
+
+
+class RowError(ValueError):
+    pass
+
+
+def detect_format(filename: Optional[str]) -> Optional[str]:
+    if filename and "." in filename:
+        ext = filename.rsplit(".", 1)[1].lower()
+        if ext in FORMATS:
+            return ext
+    return None
+
+
+def parse(fmt: str, stream: Iterable[str]) -> Iterator[tuple[int, dict]]:
+    return {"csv": parse_csv, "ofx": parse_ofx, "qif": parse_qif}[fmt](stream)
+
+
+# CSV: header row with date, amount and optionally description, category (name) or category_id
+def parse_csv(stream: Iterable[str]) -> Iterator[tuple[int, dict]]:
+    reader = csv.DictReader(stream)
+    for record in reader:
+        normalized = {
+            key.strip().lower(): value.strip()
+            for key, value in record.items()
+            if key is not None and isinstance(value, str) #extra/missing cells come back as None/lists
+        }
+        yield reader.line_num, normalized
+
+
+# OFX (SGML or XML flavour): one record per <STMTTRN> block
+OFX_TAG = re.compile(r"<(/?)(\w+)>([^<\r\n]*)")
+
+def parse_ofx(stream: Iterable[str]) -> Iterator[tuple[int, dict]]:
+    record, start_line = None, 0
+    for line_no, line in enumerate(stream, start=1):
+        for closing, tag, value in OFX_TAG.findall(line):
+            tag = tag.upper()
+            if tag == "STMTTRN":
+                if closing and record is not None:
+                    yield start_line, record
+                    record = None
+                elif not closing:
+                    record, start_line = {}, line_no
+            elif record is not None and not closing and value.strip():
+                record[tag] = value.strip()
+
+
+def ofx_to_record(record: dict) -> dict:
+    posted = record.get("DTPOSTED", "")[:8]
+    return {
+        "date": f"{posted[:4]}-{posted[4:6]}-{posted[6:8]}" if len(posted) == 8 else posted,
+        "amount": record.get("TRNAMT", ""),
+        "description": record.get("NAME") or record.get("MEMO") or "",
+    }
+
+
+# QIF: "D" date, "T" amount, "P" payee, "M" memo, "L" category, "^" ends a record
+def parse_qif(stream: Iterable[str]) -> Iterator[tuple[int, dict]]:
+    record, start_line = {}, None
+    for line_no, line in enumerate(stream, start=1):
+        line = line.strip()
+        if not line or line.startswith("!"):
+            continue
+        if line == "^":
+            if record:
+                yield start_line, record
+            record, start_line = {}, None
+            continue
+        if start_line is None:
+            start_line = line_no
+        code, value = line[0], line[1:].strip()
+        if code == "D":
+            record["date"] = value
+        elif code in ("T", "U"):
+            record["amount"] = value
+        elif code == "P":
+            record["description"] = value
+        elif code == "M":
+            record.setdefault("description", value)
+        elif code == "L":
+            record["category"] = value
+    if record:
+        yield start_line, record
+
+
+def parse_date(value: str) -> date:
+    value = value.strip()
+    for fmt in ("%Y-%m-%d", "%m/%d/%Y", "%m/%d'%y", "%m/%d/%y", "%d.%m.%Y"):
+        try:
+            return datetime.strptime(value.replace(" ", ""), fmt).date()
+        except ValueError:
+            continue
+    raise RowError(f"Invalid date '{value}'")
+
+
+def parse_amount(value: str) -> Decimal:
+    try:
+        amount = Decimal(value.replace(",", ""))
+    except InvalidOperation:
+        raise RowError(f"Invalid amount '{value}'")
+    if not amount.is_finite(): #Infinity / NaN parse fine but can't be stored
+        raise RowError(f"Invalid amount '{value}'")
+    #size first: quantize() raises InvalidOperation on values like 1e400
+    if abs(amount) > MAX_AMOUNT:
+        raise RowError("Amount too large")
+    if amount != amount.quantize(CENT):
+        raise RowError("Amount has more than 2 decimal places")
+    return amount.quantize(CENT)
+
+
+class RowValidator:
+    """Turns raw records into Transaction insert dicts using categories loaded once up front."""
+
+    def __init__(self, user_id: int, categories: Iterable, default_category_id: Optional[int] = None):
+        self.user_id = user_id
+        self.default_category_id = default_category_id
+        self.category_ids = set()
+        self.category_names = {}
+        for category in categories:
+            self.category_ids.add(category.id)
+            self.category_names[category.name.strip().lower()] = category.id
+
+    def resolve_category(self, record: dict) -> Optional[int]:
+        if record.get("category_id"):
+            try:
+                category_id = int(record["category_id"])
+            except ValueError:
+                raise RowError(f"Invalid category_id '{record['category_id']}'")
+            if category_id not in self.category_ids:
+                raise RowError("Invalid category")
+            return category_id
+        if record.get("category"):
+            category_id = self.category_names.get(record["category"].strip().lower())
+            if category_id is None:
+                raise RowError(f"Unknown category '{record['category']}'")
+            return category_id
+        return self.default_category_id
+
+    def to_row(self, record: dict) -> dict:
+        if "DTPOSTED" in record or "TRNAMT" in record:
+            record = ofx_to_record(record)
+        if not record.get("date"):
+            raise RowError("Missing date")
+        if not record.get("amount"):
+            raise RowError("Missing amount")
+
+        description = record.get("description") or None
+        if description and len(description) > 200:
+            raise RowError("Description longer than 200 characters")
+
+        return {
+            "user_id": self.user_id,
+            "amount": abs(parse_amount(record["amount"])), #the sign rule above
+            "date": parse_date(record["date"]),
+            "description": description,
+            "category_id": self.resolve_category(record),
+        }
+
+    def validate(self, records: Iterable[tuple[int, dict]]) -> Iterator[tuple[int, Optional[dict], Optional[str]]]:
+        for line_no, record in records:
+            try:
+                yield line_no, self.to_row(record), None
+            except RowError as exc:
+                yield line_no, None, str(exc)
+
+
+def chunked(iterable: Iterable, size: int) -> Iterator[list]:
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
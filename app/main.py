@@ -1,15 +1,63 @@
-from fastapi import FastAPI
-from dotenv import load_dotenv
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute
+import logging
 import os
+import time
 from pathlib import Path
 from fastapi.staticfiles import StaticFiles
-from app import models
-from app.db import engine, Base
+from sqlalchemy import select
+from sqlalchemy.orm import configure_mappers
+from app import metrics, recurring
+from app.db import (
+    engine, SessionLocal, DB_ASYNC, STARTUP_PREWARM, pool_stats, pool_usage, replica_engines,
+    prewarm_pool, prewarm_async_pool,
+)
+from app.http_cache import HTTPCacheMiddleware, response_cache
+from app.dependencies.auth import user_cache
+from app.models import User
 from fastapi.middleware.cors import CORSMiddleware
 
-load_dotenv()
+logger = logging.getLogger(__name__)
+
+# Startup / shutdown
+# -------------------------
+# Importing this module never touches the database: the schema comes from
+# `alembic upgrade head` (or create_tables.py for a throwaway database), and
+# everything that needs a connection or a thread runs in the lifespan below.
+
+def prewarm():
+    #STARTUP_PREWARM: pay the first-request costs before the worker reports ready
+    started = time.perf_counter()
+    configure_mappers()
+    connections = prewarm_pool(engine) + sum(prewarm_pool(replica) for replica in replica_engines)
+    response_cache.warm()
+    from app import analytics #NumPy, otherwise loaded by the first /analytics request
+    logger.info("pre-warmed %d connections in %.0f ms", connections, (time.perf_counter() - started) * 1000)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if STARTUP_PREWARM:
+        await run_in_threadpool(prewarm)
+        if DB_ASYNC:
+            await prewarm_async_pool()
+    #first recurring pass runs right away and catches up on occurrences missed while the app was down
+    if recurring.RECURRING_SCHEDULER:
+        recurring.scheduler.start()
+    app.state.started = True
+    yield
+    app.state.started = False
+    recurring.scheduler.stop()
+    response_cache.close()
+
+app = FastAPI(title="Finance Tracker", lifespan=lifespan)
+app.state.started = False
+
+# ETag / 304 + response cache for the polled read endpoints (added first so CORS wraps it)
+app.add_middleware(HTTPCacheMiddleware)
 
-app = FastAPI(title="Finance Tracker")
 # Allow overriding CORS origins via environment (comma-separated)
 cors_origins = os.getenv("CORS_ORIGINS", "http://localhost:5173")
 allow_origins = [o.strip() for o in cors_origins.split(",") if o.strip()]
@@ -19,21 +67,97 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag", "Server-Timing"],
 )
 
-#create models for tables
-Base.metadata.create_all(bind=engine)
+# Per-route latency / SQL statement metrics and Server-Timing (added last so it times everything, cache hits included)
+app.add_middleware(metrics.MetricsMiddleware, router_app=app)
 
 #import and include routers
 from app.routes import auth as auth_router 
 app.include_router(auth_router.router)
 
+# DB_ASYNC: async routes are registered first so they shadow the sync ones on the same paths
+if DB_ASYNC:
+    from app.routes import async_categories as async_categories_router
+    app.include_router(async_categories_router.router)
+
+    from app.routes import async_transactions as async_transactions_router
+    app.include_router(async_transactions_router.router)
+
 from app.routes import categories as categories_router
 app.include_router(categories_router.router)
 
 from app.routes import transactions as transactions_router
 app.include_router(transactions_router.router)
 
+from app.routes import analytics as analytics_router
+app.include_router(analytics_router.router)
+
+from app.routes import recurring as recurring_router
+app.include_router(recurring_router.router)
+
+if DB_ASYNC:
+    #the shadowed sync duplicates never receive requests, keep them out of the docs
+    seen_routes = set()
+    for route in app.routes:
+        if isinstance(route, APIRoute):
+            key = (route.path, frozenset(route.methods))
+            if key in seen_routes:
+                route.include_in_schema = False
+            seen_routes.add(key)
+
+@app.get("/healthz", tags=["ops"])
+def healthz():
+    #liveness: the process serves requests, no dependency is checked
+    return {"status": "ok"}
+
+@app.get("/readyz", tags=["ops"])
+def readyz():
+    #readiness: startup finished and the database answers a query against the schema
+    checks = {"startup": "ok" if app.state.started else "starting"}
+    db = SessionLocal()
+    try:
+        db.execute(select(User.id).limit(1))
+        checks["database"] = "ok"
+    except Exception as exc:
+        checks["database"] = f"error: {type(exc).__name__}"
+    finally:
+        db.close()
+    ready = all(value == "ok" for value in checks.values())
+    return JSONResponse({"status": "ready" if ready else "not ready", "checks": checks}, status_code=200 if ready else 503)
+
+@app.get("/db/pool-stats", tags=["ops"])
+def db_pool_stats():
+    #connection pool usage of this worker: checkouts, waits, current checked-out count
+    #(checkout/wait counters include the replica pools)
+    stats = pool_stats.as_dict(engine.pool)
+    if replica_engines:
+        stats["replicas"] = [pool_usage(replica.pool) for replica in replica_engines]
+    return stats
+
+@app.get("/cache/stats", tags=["ops"])
+def cache_stats():
+    #response cache of this worker, plus the shared backend's counters when CACHE_BACKEND=redis
+    return response_cache.stats()
+
+def numeric_gauges(prefix: str, stats: dict, help: str) -> dict:
+    return {
+        f"{prefix}_{key}": (help, value) for key, value in stats.items()
+        if isinstance(value, (int, float)) and not isinstance(value, bool)
+    }
+
+@app.get("/metrics", tags=["ops"], include_in_schema=False)
+def prometheus_metrics():
+    #Prometheus text format: per-route request/SQL histograms plus the pool and cache counters of this worker
+    gauges = {
+        **numeric_gauges("db_pool", pool_stats.as_dict(engine.pool), "Connection pool (see /db/pool-stats)"),
+        **numeric_gauges("response_cache", response_cache.stats().get("local", {}), "Response cache (see /cache/stats)"),
+        **numeric_gauges("user_cache", user_cache.stats(), "Authenticated user cache"),
+    }
+    #set as a header: a text/* media_type would get a second charset appended
+    return Response(metrics.render(gauges), headers={"Content-Type": metrics.CONTENT_TYPE})
+
 # Mount static files LAST (so API routes take precedence)
 FRONTEND_BUILD_DIR = os.getenv("FRONTEND_BUILD_DIR", str(Path(__file__).resolve().parent.parent / "frontend" / "dist"))
 if Path(FRONTEND_BUILD_DIR).exists():
@@ -0,0 +1,219 @@
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+from contextvars import ContextVar
+from typing import Optional
+
+from starlette.datastructures import MutableHeaders
+from starlette.routing import Match
+
+# Request metrics
+# -------------------------
+# MetricsMiddleware times every request and puts a RequestStats in a context
+# variable; the engine hooks in app/db.py add each SQL statement to it (sync routes
+# run in the threadpool with a copy of the context, so they see the same object).
+# At the end the request is added to per-route histograms, a Server-Timing header
+# reports app/db time, and a route repeating one SELECT N_PLUS_ONE_THRESHOLD times
+# is logged as a likely N+1. GET /metrics renders everything in the Prometheus
+# text format. All counters are per worker process.
+
+logger = logging.getLogger(__name__)
+
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "200")) #log statements slower than this
+N_PLUS_ONE_THRESHOLD = int(os.getenv("N_PLUS_ONE_THRESHOLD", "5")) #same SELECT this often in one request
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 10, 25, 50, 100)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def format_labels(names, values, extra: str = "") -> str:
+    pairs = [f'{name}="{escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Histogram:
+    """Prometheus histogram keyed by label values; buckets are made cumulative when rendered."""
+
+    def __init__(self, name: str, help: str, labels: tuple, buckets: tuple):
+        self.name, self.help, self.labels, self.buckets = name, help, labels, buckets
+        self._lock = threading.Lock()
+        self._series = {} #label values -> [count per bucket..., count above the last bound, sum]
+
+    def observe(self, label_values: tuple, value: float):
+        index = bisect_left(self.buckets, value) #first bucket with value <= bound
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [0] * (len(self.buckets) + 2)
+            series[index] += 1
+            series[-1] += value
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((values, list(series)) for values, series in self._series.items())
+        bounds = [f'le="{bound:g}"' for bound in self.buckets] + ['le="+Inf"']
+        for values, series in items:
+            cumulative = 0
+            for bound, count in zip(bounds, series):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{format_labels(self.labels, values, bound)} {cumulative}")
+            lines.append(f"{self.name}_sum{format_labels(self.labels, values)} {series[-1]:.6f}")
+            lines.append(f"{self.name}_count{format_labels(self.labels, values)} {cumulative}")
+        return lines
+
+
+class CounterMetric:
+    def __init__(self, name: str, help: str, labels: tuple = ()):
+        self.name, self.help, self.labels = name, help, labels
+        self._lock = threading.Lock()
+        self._values = Counter()
+
+    def inc(self, label_values: tuple = (), amount: float = 1):
+        with self._lock:
+            self._values[label_values] += amount
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        lines += [f"{self.name}{format_labels(self.labels, values)} {value:g}" for values, value in items]
+        return lines
+
+
+REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "Request latency", ("method", "route"), LATENCY_BUCKETS)
+REQUESTS = CounterMetric("http_requests_total", "Requests by status", ("method", "route", "status"))
+REQUEST_STATEMENTS = Histogram(
+    "http_request_db_statements", "SQL statements per request", ("method", "route"), STATEMENT_BUCKETS)
+REQUEST_DB_SECONDS = Histogram(
+    "http_request_db_duration_seconds", "Time spent in SQL statements per request", ("method", "route"), LATENCY_BUCKETS)
+SLOW_QUERIES = CounterMetric("db_slow_queries_total", f"SQL statements slower than {SLOW_QUERY_MS:g} ms")
+N_PLUS_ONE = CounterMetric("db_n_plus_one_total", "Requests that repeated one SELECT N_PLUS_ONE_THRESHOLD+ times", ("route",))
+STATEMENTS_OUTSIDE_REQUESTS = CounterMetric("db_statements_outside_requests_total", "SQL statements run outside a request")
+
+METRICS = (REQUEST_SECONDS, REQUESTS, REQUEST_STATEMENTS, REQUEST_DB_SECONDS, SLOW_QUERIES, N_PLUS_ONE,
+           STATEMENTS_OUTSIDE_REQUESTS)
+
+
+class RequestStats:
+    __slots__ = ("statements", "db_seconds", "selects")
+
+    def __init__(self):
+        self.statements = 0
+        self.db_seconds = 0.0
+        self.selects = Counter() #SELECT text -> executions, for N+1 detection
+
+
+current_request: ContextVar[Optional[RequestStats]] = ContextVar("current_request", default=None)
+
+
+def redact(parameters, executemany: bool) -> str:
+    #only the shape of the parameters reaches the log, never their values
+    if executemany:
+        return f"<{len(parameters)} parameter sets>"
+    if isinstance(parameters, dict):
+        return "{" + ", ".join(f"{key}: {type(value).__name__}" for key, value in parameters.items()) + "}"
+    return "(" + ", ".join(type(value).__name__ for value in parameters or ()) + ")"
+
+
+def record_statement(statement: str, parameters, seconds: float, executemany: bool):
+    """Called by the engine hooks after every cursor execute."""
+    if seconds * 1000 >= SLOW_QUERY_MS:
+        SLOW_QUERIES.inc()
+        logger.warning("slow query (%.1f ms): %s params=%s", seconds * 1000, " ".join(statement.split()),
+                       redact(parameters, executemany))
+
+    stats = current_request.get()
+    if stats is None:
+        STATEMENTS_OUTSIDE_REQUESTS.inc()
+        return
+    stats.statements += 1
+    stats.db_seconds += seconds
+    if not executemany and statement.lstrip()[:6].upper() == "SELECT":
+        stats.selects[statement] += 1
+
+
+def route_name(app, scope) -> str:
+    #route template, not the raw path: one series per endpoint whatever the ids
+    route = scope.get("route")
+    if route is None:
+        for candidate in getattr(app, "routes", ()):
+            match, _ = candidate.matches(scope)
+            if match == Match.FULL:
+                route = candidate
+                break
+    if route is None:
+        return "unmatched"
+    return getattr(route, "path", "") or "/"
+
+
+class MetricsMiddleware:
+    """Latency / SQL statement histograms per route, Server-Timing headers, N+1 warnings."""
+
+    def __init__(self, app, router_app=None):
+        self.app = app
+        self.router_app = router_app #the FastAPI app whose routes name the series
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        stats = RequestStats()
+        token = current_request.set(stats)
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                elapsed_ms = (time.perf_counter() - started) * 1000
+                statements = f"{stats.statements} statement{'' if stats.statements == 1 else 's'}"
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", (
+                    f'app;dur={elapsed_ms:.2f}, db;dur={stats.db_seconds * 1000:.2f};desc="{statements}"'
+                ))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            current_request.reset(token)
+            self.observe(scope, status, time.perf_counter() - started, stats)
+
+    def observe(self, scope, status: int, seconds: float, stats: RequestStats):
+        method = scope["method"]
+        route = route_name(self.router_app, scope)
+        REQUEST_SECONDS.observe((method, route), seconds)
+        REQUESTS.inc((method, route, str(status)))
+        REQUEST_STATEMENTS.observe((method, route), stats.statements)
+        REQUEST_DB_SECONDS.observe((method, route), stats.db_seconds)
+
+        repeated = [(statement, count) for statement, count in stats.selects.items() if count >= N_PLUS_ONE_THRESHOLD]
+        if repeated:
+            N_PLUS_ONE.inc((route,))
+            statement, count = max(repeated, key=lambda item: item[1])
+            logger.warning("possible N+1 in %s %s: same SELECT ran %d times: %s", method, route, count,
+                           " ".join(statement.split())[:300])
+
+
+def render(gauges: Optional[dict] = None) -> str:
+    """Prometheus text format: the request metrics plus point-in-time gauges {name: (help, value)}."""
+    lines = []
+    for metric in METRICS:
+        lines += metric.render()
+    for name, (help, value) in (gauges or {}).items():
+        lines += [f"# HELP {name} {help}", f"# TYPE {name} gauge", f"{name} {float(value):g}"]
+    return "\n".join(lines) + "\n"
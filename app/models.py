@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Date, Numeric, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Date, Numeric, DateTime, ForeignKey, Index, func, literal_column
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.db import Base
@@ -12,32 +12,134 @@ class User(Base):
     password_hash = Column(String(128), nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
 
-    categories = relationship("Category",back_populates="owner", cascade="all, delete-orphan")
-    transactions = relationship("Transaction", back_populates="owner", cascade="all, delete-orphan")
+    # passive_deletes: deleting a user/category never loads the children, the DB (ON DELETE CASCADE)
+    # or the set-based DELETEs in the routes remove them
+    categories = relationship("Category",back_populates="owner", cascade="all, delete-orphan", passive_deletes=True)
+    transactions = relationship("Transaction", back_populates="owner", cascade="all, delete-orphan", passive_deletes=True)
+    rollups = relationship("MonthlyRollup", back_populates="owner", cascade="all, delete-orphan", passive_deletes=True)
+    archived_transactions = relationship("TransactionArchive", cascade="all, delete-orphan", passive_deletes=True)
+    recurring_rules = relationship("RecurringRule", back_populates="owner", cascade="all, delete-orphan", passive_deletes=True)
 
 class Category(Base):
     __tablename__ = "categories"
 
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
     name = Column(String(64), nullable=False)
     type = Column(String(10), nullable=False)  # 'income' or 'expense'
 
     owner = relationship("User", back_populates="categories")
-    transactions = relationship("Transaction", back_populates="category", cascade="all, delete-orphan")
+    transactions = relationship("Transaction", back_populates="category", cascade="all, delete-orphan", passive_deletes=True)
+    rollups = relationship("MonthlyRollup", back_populates="category", cascade="all, delete-orphan", passive_deletes=True)
 
 
 class Transaction(Base):
     __tablename__ = "transactions"
 
     id = Column(Integer, primary_key=True, index=True) #Primary Key
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False) # Owner (user)
-    category_id = Column(Integer, ForeignKey("categories.id"), nullable=True) # Optional category (can be NULL)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False) # Owner (user)
+    category_id = Column(Integer, ForeignKey("categories.id", ondelete="CASCADE"), nullable=True) # Optional category (can be NULL)
     amount = Column(Numeric(12, 2), nullable=False) #Money amount (supports decimals safely)
     description = Column(String(200)) #Optional description
     date = Column(Date, nullable=False) #Transaction date (not creation date)
     created_at = Column(DateTime, default=datetime.utcnow) #When the record was created
+    recurring_rule_id = Column(Integer, ForeignKey("recurring_rules.id", ondelete="SET NULL"), nullable=True) #Set on rows materialized from a rule
 
     #Relationships
     owner = relationship("User", back_populates="transactions")
-    category = relationship("Category", back_populates="transactions")
\ No newline at end of file
+    category = relationship("Category", back_populates="transactions")
+
+    __table_args__ = (
+        # Every route filters by owner and ranges/sorts over date
+        Index("ix_transactions_user_id_date", "user_id", "date"),
+        # Category filter on the list endpoint + per-category aggregates
+        Index("ix_transactions_user_id_category_id_date", "user_id", "category_id", "date"),
+        # FK lookups when a category is deleted
+        Index("ix_transactions_category_id", "category_id"),
+        # Idempotency key of materialized occurrences: one row per (rule, date), NULLs don't collide
+        Index("ux_transactions_recurring_rule_id_date", "recurring_rule_id", "date", unique=True),
+        # SQLite: never hand out an id again, archived rows keep theirs
+        {"sqlite_autoincrement": True},
+    )
+
+
+class TransactionArchive(Base):
+    """Transactions older than the archive horizon, moved out of the hot table by app/archive.py. Read-only."""
+    __tablename__ = "transactions_archive"
+
+    id = Column(Integer, primary_key=True, autoincrement=False) #same id as in transactions
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    category_id = Column(Integer, ForeignKey("categories.id", ondelete="CASCADE"), nullable=True)
+    amount = Column(Numeric(12, 2), nullable=False)
+    description = Column(String(200))
+    date = Column(Date, nullable=False)
+    created_at = Column(DateTime)
+    recurring_rule_id = Column(Integer, ForeignKey("recurring_rules.id", ondelete="SET NULL"), nullable=True)
+
+    __table_args__ = (
+        # Same read paths as transactions: per-user date ranges, with or without a category
+        Index("ix_transactions_archive_user_id_date", "user_id", "date"),
+        Index("ix_transactions_archive_user_id_category_id_date", "user_id", "category_id", "date"),
+        Index("ix_transactions_archive_category_id", "category_id"),
+        # Detaching occurrences when their rule is deleted
+        Index("ix_transactions_archive_recurring_rule_id", "recurring_rule_id"),
+    )
+
+
+class MonthlyRollup(Base):
+    """Per-user totals for one (year, month, category), kept in sync by app/rollups.py."""
+    __tablename__ = "monthly_rollups"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    year = Column(Integer, nullable=False)
+    month = Column(Integer, nullable=False)
+    category_id = Column(Integer, ForeignKey("categories.id", ondelete="CASCADE"), nullable=True) # NULL = uncategorized
+    total = Column(Numeric(14, 2), nullable=False, default=0) #SUM(amount) of the month's transactions
+    tx_count = Column(Integer, nullable=False, default=0) #row goes away when this hits 0
+
+    owner = relationship("User", back_populates="rollups")
+    category = relationship("Category", back_populates="rollups")
+
+    __table_args__ = (
+        # One row per key, the conflict target of the upsert in rollups.apply_deltas (NULL category counts as 0)
+        Index(
+            "ux_monthly_rollups_user_id_year_month_category_id",
+            user_id, year, month, func.coalesce(category_id, literal_column("0")),
+            unique=True,
+        ),
+        Index("ix_monthly_rollups_category_id", "category_id"),
+    )
+
+
+class RecurringRule(Base):
+    """A repeating transaction (FREQ/INTERVAL/DTSTART/UNTIL, like an RRULE), materialized by app/recurring.py."""
+    __tablename__ = "recurring_rules"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    category_id = Column(Integer, ForeignKey("categories.id", ondelete="CASCADE"), nullable=True)
+    amount = Column(Numeric(12, 2), nullable=False)
+    description = Column(String(200))
+    frequency = Column(String(10), nullable=False) # 'daily', 'weekly', 'monthly' or 'yearly'
+    interval = Column(Integer, nullable=False, default=1) # every N periods
+    start_date = Column(Date, nullable=False) # first occurrence, also fixes the weekday / day of month
+    end_date = Column(Date, nullable=True) # last possible occurrence (NULL = no end)
+    next_date = Column(Date, nullable=True) # first occurrence not materialized yet (NULL = finished)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    owner = relationship("User", back_populates="recurring_rules")
+
+    __table_args__ = (
+        # The scheduler's scan for due rules
+        Index("ix_recurring_rules_next_date", "next_date"),
+    )
+
+
+class SchedulerLease(Base):
+    """Which process runs a background job (app/recurring.py): held until expires_at, renewed by its holder."""
+    __tablename__ = "scheduler_leases"
+
+    name = Column(String(64), primary_key=True) # the job, e.g. 'recurring'
+    holder = Column(String(128), nullable=False) # host:pid:random of the process holding it
+    expires_at = Column(DateTime, nullable=False)
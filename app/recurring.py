@@ -0,0 +1,274 @@
+import logging
+import os
+import socket
+import threading
+import uuid
+from calendar import monthrange
+from datetime import date, datetime, timedelta
+from typing import Optional
+from sqlalchemy import bindparam, insert, or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app import rollups
+from app.db import SessionLocal, env_bool
+from app.http_cache import bump_data_version
+from app.models import RecurringRule, SchedulerLease, Transaction
+
+logger = logging.getLogger(__name__)
+
+# Recurring transactions
+# -------------------------
+# A rule repeats every `interval` days/weeks/months/years from start_date (monthly and
+# yearly keep start_date's day, clamped in short months: the 31st becomes the 30th or
+# Feb 28/29 and goes back to the 31st afterwards) until end_date. next_date is the first
+# occurrence that isn't a transaction yet.
+#
+# Requests never materialize anything: a background thread picks the due rules of all
+# users RECURRING_BATCH_SIZE at a time, bulk-inserts their occurrences up to today and
+# advances next_date, one DB transaction per batch. (recurring_rule_id, date) is unique,
+# inserts skip rows that exist, so a pass repeated after a crash never books an
+# occurrence twice. After downtime the passes catch up the missed occurrences,
+# at most RECURRING_MAX_CATCH_UP per rule and pass.
+#
+# Every worker starts the thread, but a pass only runs in the worker holding the
+# 'recurring' lease (scheduler_leases row), renewed before each pass and taken over
+# once it has expired. Other workers only book the rules created through them right
+# away (wake), which the unique index makes safe.
+
+RECURRING_SCHEDULER = env_bool("RECURRING_SCHEDULER", "true") #start the thread in this process
+RECURRING_INTERVAL_SECONDS = float(os.getenv("RECURRING_INTERVAL_SECONDS", "300")) #pause between passes
+RECURRING_BATCH_SIZE = int(os.getenv("RECURRING_BATCH_SIZE", "500")) #rules per DB transaction
+RECURRING_MAX_CATCH_UP = 1000 #occurrences per rule per pass
+RECURRING_MAX_PAST_DAYS = 366 #how far back a new rule may start
+INSERT_CHUNK_SIZE = 1000 #rows per executemany
+LEASE_NAME = "recurring"
+
+
+# Occurrences
+# -------------------------
+
+def occurrence(rule: RecurringRule, index: int) -> date:
+    """The rule's index-th occurrence (0 = start_date)."""
+    start, step = rule.start_date, index * rule.interval
+    if rule.frequency == "daily":
+        return start + timedelta(days=step)
+    if rule.frequency == "weekly":
+        return start + timedelta(weeks=step)
+    if rule.frequency == "monthly":
+        year, month = divmod(start.year * 12 + start.month - 1 + step, 12)
+        month += 1
+    else:
+        year, month = start.year + step, start.month
+    return date(year, month, min(start.day, monthrange(year, month)[1]))
+
+
+def occurrence_index(rule: RecurringRule, day: date) -> int:
+    """Inverse of occurrence() for one of the rule's dates."""
+    if rule.frequency == "daily":
+        periods = (day - rule.start_date).days
+    elif rule.frequency == "weekly":
+        periods = (day - rule.start_date).days // 7
+    elif rule.frequency == "monthly":
+        periods = (day.year * 12 + day.month) - (rule.start_date.year * 12 + rule.start_date.month)
+    else:
+        periods = day.year - rule.start_date.year
+    return periods // rule.interval
+
+
+def due_occurrences(rule: RecurringRule, today: date, limit: int = RECURRING_MAX_CATCH_UP):
+    """(dates from next_date up to today, at most limit of them; the new next_date or None when the rule ended)."""
+    last = min(today, rule.end_date) if rule.end_date else today
+    index = occurrence_index(rule, rule.next_date)
+    day, dates = rule.next_date, []
+    while day <= last and len(dates) < limit:
+        dates.append(day)
+        index += 1
+        day = occurrence(rule, index)
+    return dates, (day if rule.end_date is None or day <= rule.end_date else None)
+
+
+# Materialization
+# -------------------------
+
+def insert_ignoring_duplicates(db: Session, rows: list):
+    """Bulk insert transactions, skipping (recurring_rule_id, date) pairs that already exist."""
+    dialect = db.get_bind().dialect.name
+    if dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    elif dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    else:
+        dialect_insert = None
+
+    statement = insert(Transaction) if dialect_insert is None else (
+        dialect_insert(Transaction).on_conflict_do_nothing(index_elements=["recurring_rule_id", "date"])
+    )
+    for i in range(0, len(rows), INSERT_CHUNK_SIZE):
+        db.execute(statement, rows[i:i + INSERT_CHUNK_SIZE])
+
+
+advance_rule = (
+    RecurringRule.__table__.update()
+    .where(RecurringRule.__table__.c.id == bindparam("rule_id"))
+    .values(next_date=bindparam("new_next_date"))
+)
+
+
+def due_rules(db: Session, today: date, batch_size: int, skip=(), only=None):
+    #served by ix_recurring_rules_next_date: the scan stops after batch_size rows
+    query = db.query(RecurringRule).filter(RecurringRule.next_date <= today)
+    if skip:
+        query = query.filter(RecurringRule.id.notin_(skip))
+    if only is not None:
+        query = query.filter(RecurringRule.id.in_(only))
+    return query.order_by(RecurringRule.next_date, RecurringRule.id).limit(batch_size).all()
+
+
+def materialize_batch(db: Session, today: date, batch_size: int, skip=(), only=None):
+    """One batch of due rules (any users, or the `only` ids), leaving out the `skip` ids; commits.
+
+    Returns (rows, user ids, whether rules are left due, ids of the rules cut off at RECURRING_MAX_CATCH_UP).
+    """
+    rules = due_rules(db, today, batch_size, skip, only)
+    if not rules:
+        return 0, set(), False, set()
+
+    rows, advances, months, capped = [], [], set(), set()
+    for rule in rules:
+        dates, next_date = due_occurrences(rule, today, RECURRING_MAX_CATCH_UP)
+        if next_date is not None and next_date <= today:
+            capped.add(rule.id)
+        rows.extend({
+            "user_id": rule.user_id,
+            "category_id": rule.category_id,
+            "amount": rule.amount,
+            "description": rule.description,
+            "date": day,
+            "recurring_rule_id": rule.id,
+        } for day in dates)
+        months.update((rule.user_id, day.year, day.month) for day in dates)
+        advances.append({"rule_id": rule.id, "new_next_date": next_date})
+
+    insert_ignoring_duplicates(db, rows)
+    db.execute(advance_rule, advances)
+    #rows skipped as duplicates are unknown here, so the touched months are recomputed instead of adding deltas
+    rollups.refresh_months(db, months)
+    db.commit()
+    return len(rows), {rule.user_id for rule in rules}, len(rules) == batch_size, capped
+
+
+def materialize_due(today: Optional[date] = None, batch_size: int = RECURRING_BATCH_SIZE, only=None) -> int:
+    """Materialize the due occurrences of every rule (or the `only` rule ids), at most RECURRING_MAX_CATCH_UP
+    per rule: the rest is left to the next passes. Returns the number of rows attempted."""
+    today = today or date.today()
+    created, capped = 0, set()
+    while True:
+        db = SessionLocal()
+        try:
+            rows, user_ids, more, newly_capped = materialize_batch(db, today, batch_size, capped, only)
+        finally:
+            db.close()
+        for user_id in user_ids:
+            bump_data_version(user_id)
+        created += rows
+        capped |= newly_capped
+        #a full batch means more due rules; every rule either finishes or joins `capped`, so this ends
+        if not more:
+            return created
+
+
+# Lease
+# -------------------------
+
+def acquire_lease(holder: str, seconds: float, name: str = LEASE_NAME) -> bool:
+    """Take or renew the lease `name` for `seconds` unless another holder's lease is still running."""
+    now = datetime.utcnow()
+    db = SessionLocal()
+    try:
+        taken = (
+            db.query(SchedulerLease)
+            .filter(SchedulerLease.name == name, or_(SchedulerLease.holder == holder, SchedulerLease.expires_at < now))
+            .update({"holder": holder, "expires_at": now + timedelta(seconds=seconds)}, synchronize_session=False)
+        )
+        if not taken:
+            #first holder ever; a concurrent first holder makes this a duplicate key
+            db.add(SchedulerLease(name=name, holder=holder, expires_at=now + timedelta(seconds=seconds)))
+        db.commit()
+        return True
+    except IntegrityError:
+        db.rollback()
+        return False
+    finally:
+        db.close()
+
+
+def release_lease(holder: str, name: str = LEASE_NAME):
+    db = SessionLocal()
+    try:
+        db.query(SchedulerLease).filter(SchedulerLease.name == name, SchedulerLease.holder == holder).update(
+            {"expires_at": datetime.utcnow()}, synchronize_session=False
+        )
+        db.commit()
+    finally:
+        db.close()
+
+
+# Scheduler
+# -------------------------
+
+class RecurringScheduler:
+    """Daemon thread running materialize_due() every RECURRING_INTERVAL_SECONDS while it holds the lease
+    (and the rules passed to wake() in any case)."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        #outlives a missed pass or two; a holder that died is replaced within that time
+        self.lease_seconds = max(2 * interval, 60.0)
+        self.holder = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._woken_rules = set()
+        self._lock = threading.Lock()
+        self._thread = None
+        self.runs = 0
+        self.last_created = 0
+
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="recurring-scheduler", daemon=True)
+            self._thread.start()
+
+    def wake(self, rule_id: int):
+        #new rule due today: materialize it now instead of at the next tick, still off the request path
+        with self._lock:
+            self._woken_rules.add(rule_id)
+        self._wake.set()
+
+    def stop(self, timeout: float = 10):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+            release_lease(self.holder) #another worker takes over at its next tick
+
+    def _run(self):
+        while not self._stop.is_set():
+            with self._lock:
+                woken, self._woken_rules = self._woken_rules, set()
+            try:
+                if acquire_lease(self.holder, self.lease_seconds):
+                    self.last_created = materialize_due()
+                    self.runs += 1
+                    if self.last_created:
+                        logger.info("recurring transactions: %d occurrences materialized", self.last_created)
+                elif woken:
+                    materialize_due(only=woken)
+            except Exception:
+                logger.exception("recurring transactions: materialization failed, retrying next tick")
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+
+scheduler = RecurringScheduler(RECURRING_INTERVAL_SECONDS)
@@ -0,0 +1,89 @@
+import socket
+from typing import Optional
+from urllib.parse import urlsplit
+
+# Redis protocol (RESP2)
+# -------------------------
+# Just enough of a client for the shared cache: one blocking connection that sends
+# commands and reads replies. Works against Redis, Valkey, KeyDB or app.fake_redis.
+
+
+class RespError(Exception):
+    """Error reply (-ERR ...) or a malformed response from the server."""
+
+
+def parse_url(url: str) -> dict:
+    """redis://[:password@]host[:port][/db] -> RespConnection keyword arguments."""
+    parts = urlsplit(url)
+    if parts.scheme != "redis":
+        raise ValueError(f"Unsupported cache URL '{url}' (expected redis://host:port/db)")
+    return {
+        "host": parts.hostname or "localhost",
+        "port": parts.port or 6379,
+        "db": int(parts.path.lstrip("/") or 0),
+        "password": parts.password,
+    }
+
+
+def encode_command(args) -> bytes:
+    out = [b"*%d\r\n" % len(args)]
+    for arg in args:
+        if not isinstance(arg, bytes):
+            arg = str(arg).encode()
+        out.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+    return b"".join(out)
+
+
+class RespConnection:
+    def __init__(self, host: str = "localhost", port: int = 6379, db: int = 0,
+                 password: Optional[str] = None, timeout: Optional[float] = 1.0):
+        self.sock = socket.create_connection((host, port), timeout=timeout)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.reader = self.sock.makefile("rb")
+        try:
+            if password:
+                self.command("AUTH", password)
+            if db:
+                self.command("SELECT", db)
+        except Exception:
+            self.close()
+            raise
+
+    def command(self, *args):
+        self.sock.sendall(encode_command(args))
+        return self.read_reply()
+
+    def read_reply(self):
+        line = self.reader.readline()
+        if not line.endswith(b"\r\n"):
+            raise ConnectionError("Connection closed by the cache server")
+        kind, payload = line[:1], line[1:-2]
+        if kind == b"+":
+            return payload.decode()
+        if kind == b"-":
+            raise RespError(payload.decode())
+        if kind == b":":
+            return int(payload)
+        if kind == b"$":
+            length = int(payload)
+            if length < 0:
+                return None
+            data = self.reader.read(length + 2)
+            if len(data) != length + 2:
+                raise ConnectionError("Connection closed by the cache server")
+            return data[:-2]
+        if kind == b"*":
+            length = int(payload)
+            return None if length < 0 else [self.read_reply() for _ in range(length)]
+        raise RespError(f"Unexpected reply {line[:40]!r}")
+
+    def close(self):
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR) #also wakes a thread blocked reading it
+        except OSError:
+            pass
+        try:
+            self.reader.close()
+            self.sock.close()
+        except OSError:
+            pass
@@ -0,0 +1,271 @@
+from collections import defaultdict
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Optional
+from sqlalchemy import func, extract, insert, literal_column, select, union_all
+from sqlalchemy.orm import Session
+from app import archive
+from app.models import MonthlyRollup, Transaction
+
+# Monthly rollups
+# -------------------------
+# One row per (user, year, month, category) holding SUM(amount) and COUNT(*) of the
+# matching transactions. Writers call add_transaction/remove_transaction before they
+# commit, so the rollup always moves in the same DB transaction as the raw rows.
+
+
+def month_key(tx_date: date, category_id: Optional[int]):
+    return (tx_date.year, tx_date.month, category_id)
+
+
+ROLLUP_KEY = (
+    MonthlyRollup.user_id, MonthlyRollup.year, MonthlyRollup.month,
+    func.coalesce(MonthlyRollup.category_id, literal_column("0")), #same expression as the unique index
+)
+
+
+def upsert_statement(db: Session):
+    """INSERT ... ON CONFLICT DO UPDATE adding to the existing row (None on dialects without upsert)."""
+    dialect = db.get_bind().dialect.name
+    if dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    elif dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    else:
+        return None
+
+    statement = dialect_insert(MonthlyRollup)
+    return statement.on_conflict_do_update(
+        index_elements=ROLLUP_KEY,
+        set_={
+            "total": MonthlyRollup.total + statement.excluded.total,
+            "tx_count": MonthlyRollup.tx_count + statement.excluded.tx_count,
+        },
+    )
+
+
+def apply_deltas(db: Session, user_id: int, deltas: dict):
+    """Apply {(year, month, category_id): (amount, count)} to the user's rollups."""
+    rows = [
+        {"user_id": user_id, "year": year, "month": month, "category_id": category_id, "total": amount, "tx_count": count}
+        for (year, month, category_id), (amount, count) in deltas.items()
+        if amount or count
+    ]
+    if not rows:
+        return
+
+    #one atomic statement per key: concurrent first writes to a month can't both insert a row
+    statement = upsert_statement(db)
+    if statement is not None:
+        db.execute(statement, rows)
+    else:
+        for row in rows:
+            updated = (
+                db.query(MonthlyRollup)
+                .filter(*[column == value for column, value in zip(ROLLUP_KEY, rollup_key(row))])
+                .update(
+                    {
+                        MonthlyRollup.total: MonthlyRollup.total + row["total"],
+                        MonthlyRollup.tx_count: MonthlyRollup.tx_count + row["tx_count"],
+                    },
+                    synchronize_session=False,
+                )
+            )
+            if not updated:
+                db.add(MonthlyRollup(**row))
+
+    if any(row["tx_count"] < 0 for row in rows):
+        #last transaction of a month/category is gone -> drop the row
+        db.query(MonthlyRollup).filter(
+            MonthlyRollup.user_id == user_id, MonthlyRollup.tx_count <= 0
+        ).delete(synchronize_session=False)
+
+
+def rollup_key(row: dict):
+    return row["user_id"], row["year"], row["month"], row["category_id"] or 0
+
+
+def add_transaction(db: Session, transaction: Transaction):
+    apply_deltas(db, transaction.user_id, {
+        month_key(transaction.date, transaction.category_id): (Decimal(transaction.amount), 1)
+    })
+
+
+def remove_transaction(db: Session, transaction: Transaction):
+    apply_deltas(db, transaction.user_id, {
+        month_key(transaction.date, transaction.category_id): (-Decimal(transaction.amount), -1)
+    })
+
+
+def move_category(db: Session, user_id: int, category_id: int, new_category_id: Optional[int] = None):
+    """Fold a category's rollups into another category's (None = uncategorized), for set-based reassigns."""
+    rows = db.query(MonthlyRollup).filter(
+        MonthlyRollup.user_id == user_id, MonthlyRollup.category_id == category_id
+    ).all() #one row per month, not per transaction
+    deltas = defaultdict(lambda: (Decimal(0), 0))
+    for row in rows:
+        total, count = deltas[(row.year, row.month, new_category_id)]
+        deltas[(row.year, row.month, new_category_id)] = (total + Decimal(str(row.total)), count + row.tx_count)
+    db.query(MonthlyRollup).filter(
+        MonthlyRollup.user_id == user_id, MonthlyRollup.category_id == category_id
+    ).delete(synchronize_session=False)
+    apply_deltas(db, user_id, deltas)
+
+
+# Date ranges
+# -------------------------
+
+def next_month(d: date) -> date:
+    return date(d.year + d.month // 12, d.month % 12 + 1, 1)
+
+
+def split_range(start_date: Optional[date], end_date: Optional[date]):
+    """Split an inclusive date range into whole months and the partial months at its edges.
+
+    Returns (first_month, last_month, edges). Whole months [first_month, last_month]
+    can be answered from rollups (None = unbounded on that side, and
+    first_month > last_month means there are none); edges is a list of
+    (start, end) date ranges that have to be read from raw transactions.
+    """
+    if start_date and end_date and start_date > end_date:
+        return date.max, date.min, []
+
+    if start_date and end_date and (start_date.year, start_date.month) == (end_date.year, end_date.month):
+        if start_date.day == 1 and next_month(end_date) - timedelta(days=1) == end_date:
+            return start_date, start_date, []
+        return date.max, date.min, [(start_date, end_date)]
+
+    edges = []
+
+    first_month = None
+    if start_date:
+        first_month = start_date.replace(day=1)
+        if start_date.day != 1:
+            first_month = next_month(start_date)
+            edges.append((start_date, first_month - timedelta(days=1)))
+
+    last_month = None
+    if end_date:
+        last_month = end_date.replace(day=1)
+        if next_month(end_date) - timedelta(days=1) != end_date:
+            edges.append((last_month, end_date))
+            last_month = (last_month - timedelta(days=1)).replace(day=1)
+
+    return first_month, last_month, edges
+
+
+def month_range_filter(first_month: Optional[date], last_month: Optional[date]):
+    """Filter conditions limiting MonthlyRollup rows to [first_month, last_month]."""
+    period = MonthlyRollup.year * 12 + MonthlyRollup.month
+    conditions = []
+    if first_month:
+        conditions.append(period >= first_month.year * 12 + first_month.month)
+    if last_month:
+        conditions.append(period <= last_month.year * 12 + last_month.month)
+    return conditions
+
+
+# Rebuild / verify
+# -------------------------
+
+def _raw_rollups_query(db: Session, user_id: Optional[int] = None, user_ids=None, month: Optional[date] = None):
+    """Rollup rows computed from raw transactions, hot and archived, optionally for some users / one month."""
+    def raw_rows(model):
+        query = select(model.user_id, model.category_id, model.date, model.amount)
+        if user_id is not None:
+            query = query.where(model.user_id == user_id)
+        if user_ids is not None:
+            query = query.where(model.user_id.in_(user_ids))
+        if month is not None:
+            query = query.where(model.date >= month, model.date < next_month(month))
+        return query
+
+    source = union_all(*archive.selects(raw_rows)).subquery()
+    year = extract("year", source.c.date)
+    month_of = extract("month", source.c.date)
+    return db.query(
+        source.c.user_id,
+        year.label("year"),
+        month_of.label("month"),
+        source.c.category_id,
+        func.sum(source.c.amount).label("total"),
+        func.count().label("tx_count"),
+    ).group_by(source.c.user_id, year, month_of, source.c.category_id)
+
+
+def rebuild(db: Session, user_id: Optional[int] = None) -> int:
+    """Recompute rollups from raw transactions (for one user or everyone). Caller commits."""
+    deleted = db.query(MonthlyRollup)
+    if user_id is not None:
+        deleted = deleted.filter(MonthlyRollup.user_id == user_id)
+    deleted.delete(synchronize_session=False)
+
+    source = _raw_rollups_query(db, user_id).subquery()
+    result = db.execute(
+        insert(MonthlyRollup).from_select(
+            ["user_id", "year", "month", "category_id", "total", "tx_count"],
+            source.select(),
+        )
+    )
+    return result.rowcount
+
+
+REFRESH_USERS_PER_STATEMENT = 500 #IN-list size when refreshing many users' months
+
+
+def refresh_months(db: Session, keys) -> None:
+    """Recompute the rollups of the given (user_id, year, month) keys from raw transactions. Caller commits.
+
+    For bulk writers that can't tell which of their rows were actually inserted
+    (INSERT ... ON CONFLICT DO NOTHING): two statements per month and chunk of users.
+    """
+    users_by_month = defaultdict(set)
+    for user_id, year, month in keys:
+        users_by_month[(year, month)].add(user_id)
+
+    for (year, month), user_ids in sorted(users_by_month.items()):
+        first_day = date(year, month, 1)
+        user_ids = sorted(user_ids)
+        for i in range(0, len(user_ids), REFRESH_USERS_PER_STATEMENT):
+            chunk = user_ids[i:i + REFRESH_USERS_PER_STATEMENT]
+            db.query(MonthlyRollup).filter(
+                MonthlyRollup.user_id.in_(chunk), MonthlyRollup.year == year, MonthlyRollup.month == month,
+            ).delete(synchronize_session=False)
+            source = _raw_rollups_query(db, user_ids=chunk, month=first_day).subquery()
+            db.execute(
+                insert(MonthlyRollup).from_select(
+                    ["user_id", "year", "month", "category_id", "total", "tx_count"],
+                    source.select(),
+                )
+            )
+
+
+def verify(db: Session, user_id: Optional[int] = None) -> list[dict]:
+    """Compare stored rollups with raw transactions; returns one dict per drifting key."""
+    expected = {
+        (row.user_id, int(row.year), int(row.month), row.category_id): (Decimal(str(row.total)), row.tx_count)
+        for row in _raw_rollups_query(db, user_id)
+    }
+
+    stored_query = db.query(MonthlyRollup)
+    if user_id is not None:
+        stored_query = stored_query.filter(MonthlyRollup.user_id == user_id)
+
+    stored = defaultdict(lambda: (Decimal(0), 0))
+    for row in stored_query:
+        key = (row.user_id, row.year, row.month, row.category_id)
+        total, count = stored[key]
+        stored[key] = (total + Decimal(str(row.total)), count + row.tx_count)
+
+    drift = []
+    for key in sorted(set(expected) | set(stored), key=str):
+        exp_total, exp_count = expected.get(key, (Decimal(0), 0))
+        got_total, got_count = stored.get(key, (Decimal(0), 0))
+        if round(exp_total, 2) != round(got_total, 2) or exp_count != got_count:
+            user, year, month, category_id = key
+            drift.append({
+                "user_id": user, "year": year, "month": month, "category_id": category_id,
+                "expected_total": exp_total, "stored_total": got_total,
+                "expected_count": exp_count, "stored_count": got_count,
+            })
+    return drift
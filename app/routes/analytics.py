@@ -0,0 +1,108 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from app.models import User
+from app.schemas import TransactionSummary, MonthlySummaryOut, CategoryBreakdownOut, CategoryPercentilesOut, BudgetRequest, BudgetLineOut
+from app.dependencies.auth import get_current_user
+from app.routes.transactions import get_db
+from typing import Optional, List
+from datetime import date
+
+# Analytics (in-memory)
+# -------------------------
+# Answers from the user's cached NumPy column store (app/analytics.py). The first
+# call after a write reloads the history, later calls never touch the database.
+
+router = APIRouter(
+    prefix="/analytics",
+    tags=["analytics"]
+)
+
+BUDGET_MAX_MONTHS = 120
+
+
+def load_analytics():
+    #app.analytics imports NumPy (about 0.1 s): loaded by the first analytics request instead of
+    #with the app, or during startup with STARTUP_PREWARM
+    from app import analytics
+    return analytics
+
+
+def check_type(type: Optional[str]):
+    if type not in (None, "income", "expense"):
+        raise HTTPException(status_code=400, detail="Invalid type")
+
+
+@router.get("/summary", response_model=TransactionSummary, response_model_exclude_none=True)
+def analytics_summary(
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    analytics = load_analytics()
+    store = analytics.get_store(db, current_user.id)
+    return analytics.summary(store, start_date, end_date)
+
+
+@router.get("/monthly", response_model=list[MonthlySummaryOut])
+def analytics_monthly(
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    analytics = load_analytics()
+    store = analytics.get_store(db, current_user.id)
+    return analytics.monthly(store, start_date, end_date)
+
+
+@router.get("/breakdown", response_model=list[CategoryBreakdownOut])
+def analytics_breakdown(
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    type: Optional[str] = None, #income or expense; all categories (and "Uncategorized") if omitted
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    check_type(type)
+    analytics = load_analytics()
+    store = analytics.get_store(db, current_user.id)
+    return analytics.breakdown(store, start_date, end_date, type)
+
+
+@router.get("/percentiles", response_model=list[CategoryPercentilesOut])
+def analytics_percentiles(
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    type: Optional[str] = None,
+    q: List[float] = Query([50, 90, 99]), #percentiles to compute, 0-100
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    check_type(type)
+    if not q or any(not 0 <= value <= 100 for value in q):
+        raise HTTPException(status_code=400, detail="Percentiles must be between 0 and 100")
+    analytics = load_analytics()
+    store = analytics.get_store(db, current_user.id)
+    return analytics.percentiles(store, q, start_date, end_date, type)
+
+
+@router.post("/budget", response_model=list[BudgetLineOut])
+def analytics_budget(
+    budget_in: BudgetRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    end_date = budget_in.end_date or date.today()
+    start_date = budget_in.start_date or end_date.replace(day=1)
+    if start_date > end_date:
+        raise HTTPException(status_code=400, detail="start_date is after end_date")
+    if (end_date.year - start_date.year) * 12 + end_date.month - start_date.month >= BUDGET_MAX_MONTHS:
+        raise HTTPException(status_code=400, detail=f"At most {BUDGET_MAX_MONTHS} months")
+
+    analytics = load_analytics()
+    store = analytics.get_store(db, current_user.id)
+    if any(store.category_position(category_id) is None for category_id in budget_in.budgets):
+        raise HTTPException(status_code=400, detail="Invalid category")
+
+    return analytics.budget_vs_actual(store, budget_in.budgets, start_date, end_date)
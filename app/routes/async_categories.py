@@ -0,0 +1,48 @@
+from fastapi import APIRouter, Depends, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db import get_async_db
+from app.models import User
+from app.schemas import CategoryCreate, CategoryOut
+from app.dependencies.auth import get_current_user_async
+from app.dependencies.db import get_async_read_db
+from app.routes import categories
+
+# Async category routes (DB_ASYNC=true), see app/routes/async_transactions.py
+
+router = APIRouter(
+    prefix="/categories",
+    tags=["categories"]
+)
+
+
+@router.post("", response_model=CategoryOut, status_code=status.HTTP_201_CREATED)
+async def create_category(
+    category_in: CategoryCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
+):
+    return await db.run_sync(
+        lambda session: categories.create_category(category_in, db=session, current_user=current_user)
+    )
+
+
+@router.get("", response_model=list[CategoryOut])
+async def list_categories(
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: User = Depends(get_current_user_async)
+):
+    return await db.run_sync(
+        lambda session: categories.list_categories(db=session, current_user=current_user)
+    )
+
+
+@router.delete("/{category_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_category(
+    category_id: int,
+    reassign: bool = False,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
+):
+    await db.run_sync(
+        lambda session: categories.delete_category(category_id, reassign, db=session, current_user=current_user)
+    )
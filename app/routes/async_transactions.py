@@ -0,0 +1,149 @@
+from fastapi import APIRouter, Depends, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db import get_async_db
+from app.models import User
+from app.schemas import TransactionCreate, TransactionUpdate, TransactionOut, TransactionSummary, MonthlySummaryOut, BatchRequest, BatchResultOut, TimeSeriesOut, CategoryBreakdownOut
+from app.dependencies.auth import get_current_user_async
+from app.dependencies.db import get_async_read_db
+from app.routes import transactions
+from typing import Optional
+from datetime import date
+
+# Async transaction routes (DB_ASYNC=true)
+# -------------------------
+# Same paths and behaviour as app/routes/transactions.py, but the request never
+# occupies a threadpool worker: the sync route bodies run on the async engine's
+# connection through AsyncSession.run_sync, which awaits the driver instead of
+# blocking. Import and export keep using the sync router.
+
+router = APIRouter(
+    prefix="/transaction",
+    tags=["transactions"]
+)
+
+
+@router.post("", response_model=TransactionOut, status_code=status.HTTP_201_CREATED)
+async def create_transaction(
+    transaction_in: TransactionCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
+):
+    return await db.run_sync(
+        lambda session: transactions.create_transaction(transaction_in, db=session, current_user=current_user)
+    )
+
+
+@router.post("/batch", response_model=BatchResultOut)
+async def batch_transactions(
+    batch: BatchRequest,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
+):
+    return await db.run_sync(
+        lambda session: transactions.batch_transactions(batch, db=session, current_user=current_user)
+    )
+
+
+@router.get("", response_model=list[TransactionOut])
+async def list_transactions(
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    category_id: Optional[int] = None,
+    type: Optional[str] = None,
+
+    page: int = 1,
+    page_size: int = 20,
+    cursor: Optional[str] = None,
+    q: Optional[str] = None,
+
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: User = Depends(get_current_user_async)
+):
+    return await db.run_sync(
+        lambda session: transactions.list_transactions(
+            start_date, end_date, category_id, type, page, page_size, cursor, q,
+            db=session, current_user=current_user,
+        )
+    )
+
+
+@router.delete("/{transaction_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_transaction(
+    transaction_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
+):
+    await db.run_sync(
+        lambda session: transactions.delete_transaction(transaction_id, db=session, current_user=current_user)
+    )
+
+
+@router.put("/{transaction_id}", response_model=TransactionOut)
+async def update_transaction(
+    transaction_id: int,
+    transaction_in: TransactionUpdate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
+):
+    return await db.run_sync(
+        lambda session: transactions.update_transaction(
+            transaction_id, transaction_in, db=session, current_user=current_user
+        )
+    )
+
+
+@router.get("/summary", response_model=TransactionSummary, response_model_exclude_none=True)
+async def transaction_summary(
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    group_by: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: User = Depends(get_current_user_async)
+):
+    return await db.run_sync(
+        lambda session: transactions.transaction_summary(
+            start_date, end_date, group_by, db=session, current_user=current_user
+        )
+    )
+
+
+@router.get("/summary/categories", response_model=list[CategoryBreakdownOut])
+async def category_breakdown(
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    type: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: User = Depends(get_current_user_async)
+):
+    return await db.run_sync(
+        lambda session: transactions.category_breakdown(
+            start_date, end_date, type, db=session, current_user=current_user
+        )
+    )
+
+
+@router.get("/summary/monthly", response_model=list[MonthlySummaryOut])
+async def monthly_transaction_summary(
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: User = Depends(get_current_user_async)
+):
+    return await db.run_sync(
+        lambda session: transactions.monthly_transaction_summary(db=session, current_user=current_user)
+    )
+
+
+@router.get("/summary/timeseries", response_model=TimeSeriesOut)
+async def timeseries_summary(
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    bucket: str = "day",
+    category_id: Optional[int] = None,
+    window: int = 7,
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: User = Depends(get_current_user_async)
+):
+    return await db.run_sync(
+        lambda session: transactions.timeseries_summary(
+            start_date, end_date, bucket, category_id, window, db=session, current_user=current_user
+        )
+    )
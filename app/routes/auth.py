@@ -1,13 +1,15 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from app import models
 from app.db import SessionLocal
 from app.schemas import UserCreate, UserOut, UserLogin
-from app.security import hash_password, verify_password, create_access_token
+from app.security import hash_password_async, verify_and_update_password, create_access_token
 from datetime import timedelta
-from app.dependencies.auth import get_current_user
-from app.models import User
+from app.dependencies.auth import get_current_user, user_cache
+from app.http_cache import bump_data_version
+from app.models import Category, MonthlyRollup, RecurringRule, Transaction, TransactionArchive, User
 
 
 router = APIRouter(prefix="/auth", tags=["auth"])
@@ -20,8 +22,10 @@ def get_db():
     finally:
         db.close()
 
-@router.post("/register", response_model=UserOut, status_code=status.HTTP_201_CREATED)
-def register(user_in: UserCreate, db:Session = Depends(get_db)):
+# register/login are async: DB work goes through run_in_threadpool (short), bcrypt
+# through the dedicated hashing pool in app.security (long), so neither blocks the loop.
+
+def check_available(db: Session, user_in: UserCreate):
     # check if username exists
     if db.query(models.User).filter(models.User.username == user_in.username).first():
         raise HTTPException(status_code=400, detail="Username already taken")
@@ -31,11 +35,12 @@ def register(user_in: UserCreate, db:Session = Depends(get_db)):
         if db.query(models.User).filter(models.User.email == user_in.email).first():
             raise HTTPException(status_code=400, detail="Email already taken")
 
+def save_new_user(db: Session, user_in: UserCreate, password_hash: str):
     # create user
     user = models.User(
         username=user_in.username,
         email=user_in.email,
-        password_hash=hash_password(user_in.password),
+        password_hash=password_hash,
     )
 
     db.add(user)
@@ -44,21 +49,43 @@ def register(user_in: UserCreate, db:Session = Depends(get_db)):
 
     return user
 
+def find_user(db: Session, identifier: str):
+    return db.query(models.User).filter(
+        (models.User.username == identifier) 
+        | (models.User.email == identifier)
+    ).first()
+
+def save_password_hash(db: Session, user: User, password_hash: str):
+    user.password_hash = password_hash
+    db.commit()
+    bump_data_version(user.id) #drops the cached user in every worker (see app.dependencies.auth)
+
+@router.post("/register", response_model=UserOut, status_code=status.HTTP_201_CREATED)
+async def register(user_in: UserCreate, db:Session = Depends(get_db)):
+    await run_in_threadpool(check_available, db, user_in)
+    password_hash = await hash_password_async(user_in.password)
+    return await run_in_threadpool(save_new_user, db, user_in, password_hash)
+
 @router.post("/login")
-def login(
+async def login(
     form_data: OAuth2PasswordRequestForm = Depends(),
     db: Session = Depends(get_db),
 ):
-    user = db.query(models.User).filter(
-        (models.User.username == form_data.username) 
-        | (models.User.email == form_data.username)
-    ).first()
+    user = await run_in_threadpool(find_user, db, form_data.username)
+
+    valid, new_hash = (False, None)
+    if user:
+        valid, new_hash = await verify_and_update_password(form_data.password, user.password_hash)
 
-    if not user or not verify_password(form_data.password, user.password_hash):
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid credentials",
         )
+
+    # stored hash uses an old BCRYPT_ROUNDS: swap in the re-hashed password
+    if new_hash:
+        await run_in_threadpool(save_password_hash, db, user, new_hash)
     
     access_token = create_access_token(data={"sub": str(user.id)})
 
@@ -74,4 +101,24 @@ def read_me(current_user: User = Depends(get_current_user)):
         "username": current_user.username,
         "email": current_user.email,
         "created_at": current_user.created_at,
-    }
\ No newline at end of file
+    }
+
+def delete_user_rows(db: Session, user_id: int):
+    """Set-based delete of a user and everything they own, children first. Caller commits."""
+    for model in (Transaction, TransactionArchive, MonthlyRollup, RecurringRule, Category):
+        db.query(model).filter(model.user_id == user_id).delete(synchronize_session=False)
+    db.query(User).filter(User.id == user_id).delete(synchronize_session=False)
+
+@router.delete("/me", status_code=status.HTTP_204_NO_CONTENT)
+def delete_me(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    #deletes the account with all its categories and transactions; the token stops working right away
+    #(on other workers too with CACHE_BACKEND=redis, else after AUTH_CACHE_UNSHARED_TTL_SECONDS)
+    delete_user_rows(db, current_user.id)
+    db.commit()
+    user_cache.invalidate(current_user.id) #bulk deletes skip the mapper events that normally do this
+    bump_data_version(current_user.id)
+
+@router.get("/cache-stats")
+def auth_cache_stats(current_user: User = Depends(get_current_user)):
+    #hit/miss counters of the authenticated-user cache (per worker process)
+    return user_cache.stats()
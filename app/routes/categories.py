@@ -1,9 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
+from app import rollups
 from app.db import SessionLocal
-from app.models import Category
+from app.models import Category, MonthlyRollup, RecurringRule, Transaction, TransactionArchive
 from app.schemas import CategoryCreate, CategoryOut
 from app.dependencies.auth import get_current_user
+from app.dependencies.db import get_read_db
+from app.http_cache import bump_data_version
 from app.models import User
 
 router = APIRouter(
@@ -28,13 +31,14 @@ def create_category(
     category = Category(name=category_in.name, type=category_in.type, user_id=current_user.id)
     db.add(category)
     db.commit()
+    bump_data_version(current_user.id)
     db.refresh(category)
     return category
 
 
 @router.get("", response_model=list[CategoryOut])
 def list_categories(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     return (
@@ -44,14 +48,35 @@ def list_categories(
     )
 
 
+def delete_category_rows(db: Session, user_id: int, category_id: int, reassign: bool = False):
+    """Set-based delete: one statement per table, whatever the number of transactions. Caller commits."""
+    def rows(model):
+        return db.query(model).filter(model.user_id == user_id, model.category_id == category_id)
+
+    if reassign:
+        #keep the transactions (hot and archived) as uncategorized: a single UPDATE per table,
+        #rollups folded into the uncategorized rows
+        for model in (Transaction, TransactionArchive, RecurringRule):
+            rows(model).update({model.category_id: None}, synchronize_session=False)
+        rollups.move_category(db, user_id, category_id, None)
+    else:
+        for model in (Transaction, TransactionArchive, RecurringRule):
+            rows(model).delete(synchronize_session=False)
+        db.query(MonthlyRollup).filter(
+            MonthlyRollup.user_id == user_id, MonthlyRollup.category_id == category_id
+        ).delete(synchronize_session=False)
+    db.query(Category).filter(Category.id == category_id, Category.user_id == user_id).delete(synchronize_session=False)
+
+
 @router.delete("/{category_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_category(
     category_id: int,
+    reassign: bool = False, #true = keep its transactions as uncategorized instead of deleting them
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    category = (
-        db.query(Category)
+    exists = (
+        db.query(Category.id)
         .filter(
             Category.id == category_id,
             Category.user_id == current_user.id
@@ -59,8 +84,9 @@ def delete_category(
         .first()
     )
 
-    if not category:
+    if not exists:
         raise HTTPException(status_code=404, detail="Category not found")
     
-    db.delete(category)
-    db.commit()
\ No newline at end of file
+    delete_category_rows(db, current_user.id, category_id, reassign)
+    db.commit()
+    bump_data_version(current_user.id)
@@ -0,0 +1,103 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+from datetime import date, timedelta
+from app.db import SessionLocal
+from app.models import Category, RecurringRule, Transaction, TransactionArchive, User
+from app.schemas import RecurringRuleCreate, RecurringRuleOut
+from app.dependencies.auth import get_current_user
+from app.dependencies.db import get_read_db
+from app.recurring import RECURRING_MAX_PAST_DAYS, scheduler
+
+# Recurring rules
+# -------------------------
+# Only the rules are written here; the transactions are booked by the background
+# scheduler in app/recurring.py (right away for a rule that is already due).
+
+router = APIRouter(
+    prefix="/recurring",
+    tags=["recurring"]
+)
+
+def get_db():
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+@router.post("", response_model=RecurringRuleOut, status_code=status.HTTP_201_CREATED)
+def create_rule(
+    rule_in: RecurringRuleCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    if rule_in.end_date is not None and rule_in.end_date < rule_in.start_date:
+        raise HTTPException(status_code=400, detail="end_date is before start_date")
+
+    #every past occurrence is booked at once: keep the backlog of a new rule bounded
+    if rule_in.start_date < date.today() - timedelta(days=RECURRING_MAX_PAST_DAYS):
+        raise HTTPException(status_code=400, detail=f"start_date is more than {RECURRING_MAX_PAST_DAYS} days in the past")
+
+    if rule_in.category_id is not None:
+        category = (
+            db.query(Category.id)
+            .filter(Category.id == rule_in.category_id, Category.user_id == current_user.id)
+            .first()
+        )
+        if not category:
+            raise HTTPException(status_code=400, detail="Invalid category")
+
+    rule = RecurringRule(
+        user_id=current_user.id,
+        amount=rule_in.amount,
+        description=rule_in.description,
+        category_id=rule_in.category_id,
+        frequency=rule_in.frequency,
+        interval=rule_in.interval,
+        start_date=rule_in.start_date,
+        end_date=rule_in.end_date,
+        next_date=rule_in.start_date,
+    )
+    db.add(rule)
+    db.commit()
+    db.refresh(rule)
+
+    if rule.start_date <= date.today():
+        scheduler.wake(rule.id)
+    return rule
+
+
+@router.get("", response_model=list[RecurringRuleOut])
+def list_rules(
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    return (
+        db.query(RecurringRule)
+        .filter(RecurringRule.user_id == current_user.id)
+        .order_by(RecurringRule.id)
+        .all()
+    )
+
+
+@router.delete("/{rule_id}", status_code=status.HTTP_204_NO_CONTENT)
+def delete_rule(
+    rule_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    #stops future occurrences; transactions already booked stay, detached from the rule
+    deleted = (
+        db.query(RecurringRule)
+        .filter(RecurringRule.id == rule_id, RecurringRule.user_id == current_user.id)
+        .delete(synchronize_session=False)
+    )
+    if not deleted:
+        raise HTTPException(status_code=404, detail="Recurring rule not found")
+
+    for model in (Transaction, TransactionArchive):
+        db.query(model).filter(model.recurring_rule_id == rule_id).update(
+            {model.recurring_rule_id: None}, synchronize_session=False
+        )
+    db.commit()
@@ -1,18 +1,33 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, status
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import func, extract, case
-from app.db import SessionLocal
-from app.models import Transaction, Category, User
-from app.schemas import TransactionCreate, TransactionUpdate, TransactionOut, TransactionSummary, MonthlySummaryOut
+from sqlalchemy import func, case, or_, select, union_all, extract, cast, insert, literal, literal_column, Date, Interval
+from app.db import SessionLocal, read_session
+from app.models import Transaction, TransactionArchive, Category, User, MonthlyRollup
+from app.schemas import TransactionCreate, TransactionUpdate, TransactionOut, TransactionSummary, MonthlySummaryOut, ImportResultOut, BatchRequest, BatchResultOut, TimeSeriesOut, CategoryBreakdownOut
 from app.dependencies.auth import get_current_user
+from app.dependencies.db import get_read_db
+from app.http_cache import bump_data_version
+from app import archive, rollups, importers
+from app.search import search_words, search_page
 from typing import Optional
-from datetime import date
+from datetime import date, timedelta
+from decimal import Decimal
+from collections import defaultdict
+import base64
+import csv
+import io
+import json
 
 router = APIRouter(
     prefix="/transaction",
     tags=["transactions"]
 )
 
+IMPORT_CHUNK_SIZE = 1000 #rows per executemany
+IMPORT_MAX_ERRORS = 1000 #row errors echoed back to the client
+TIMESERIES_MAX_BUCKETS = 5000 #about 13 years of days
+
 # DB dependency
 # -------------------------
 def get_db():
@@ -23,6 +38,22 @@ def get_db():
         db.close()
 
 
+# Keyset cursor helpers
+# -------------------------
+def encode_cursor(tx_date: date, tx_id: int) -> str:
+    #opaque to clients: base64 of "<date>|<id>" of the last row on the page
+    raw = f"{tx_date.isoformat()}|{tx_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> tuple[date, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        tx_date, tx_id = base64.urlsafe_b64decode(padded).decode().split("|")
+        return date.fromisoformat(tx_date), int(tx_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
 # Create transaction
 # -------------------------
 @router.post("", response_model=TransactionOut, status_code=status.HTTP_201_CREATED)
@@ -53,13 +84,110 @@ def create_transaction(
     )
 
     db.add(transaction)
+    rollups.add_transaction(db, transaction) #same DB transaction as the insert
     db.commit()
+    bump_data_version(current_user.id)
     db.refresh(transaction)
 
     return transaction
 
+# Bulk import
+# -------------------------
+@router.post("/import", response_model=ImportResultOut)
+def import_transactions(
+    file: UploadFile = File(...),
+    format: Optional[str] = None, #csv, ofx or qif; guessed from the file name if omitted
+    category_id: Optional[int] = None, #used for rows that don't name a category
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    fmt = format or importers.detect_format(file.filename)
+    if fmt not in importers.FORMATS:
+        raise HTTPException(status_code=400, detail="Unsupported import format")
+
+    #Categories are resolved from one preloaded map instead of a SELECT per row
+    categories = db.query(Category).filter(Category.user_id == current_user.id).all()
+    if category_id is not None and category_id not in {c.id for c in categories}:
+        raise HTTPException(status_code=400, detail="Invalid category")
+    validator = importers.RowValidator(current_user.id, categories, category_id)
+
+    #upload -> records -> validated rows, all lazily, one line at a time
+    stream = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+    results = validator.validate(importers.parse(fmt, stream))
+
+    imported, failed, errors = 0, 0, []
+    deltas = defaultdict(lambda: [0, 0]) #rollup changes, applied once at the end
+
+    def valid_rows():
+        nonlocal failed
+        for line_no, row, error in results:
+            if error:
+                failed += 1
+                if len(errors) < IMPORT_MAX_ERRORS:
+                    errors.append({"line": line_no, "error": error})
+                continue
+            delta = deltas[rollups.month_key(row["date"], row["category_id"])]
+            delta[0] += row["amount"]
+            delta[1] += 1
+            yield row
+
+    try:
+        for chunk in importers.chunked(valid_rows(), IMPORT_CHUNK_SIZE):
+            db.execute(insert(Transaction), chunk) #executemany
+            imported += len(chunk)
+    except UnicodeDecodeError:
+        db.rollback()
+        raise HTTPException(status_code=400, detail="File is not UTF-8 text")
+
+    rollups.apply_deltas(db, current_user.id, {key: tuple(value) for key, value in deltas.items()})
+    db.commit()
+    bump_data_version(current_user.id)
+
+    return {"imported": imported, "failed": failed, "errors": errors}
+
+# List filters (shared by list and export)
+# -------------------------
+def filter_transactions(query, start_date: Optional[date], end_date: Optional[date], category_id: Optional[int], type: Optional[str],
+                        model=Transaction):
+    #model: Transaction or TransactionArchive
+    #Filter by date range
+    if start_date:
+        query = query.filter(model.date >= start_date)
+
+    if end_date:
+        query = query.filter(model.date <= end_date)
+
+    #Filter by category
+    if category_id:
+        query = query.filter(model.category_id == category_id)
+
+    #Filter by category type
+    if type:
+        query = query.join(Category, model.category_id == Category.id).filter(Category.type == type)
+
+    return query
+
+def reaches_archive(db: Session, user_id: int, start_date: Optional[date]) -> Optional[date]:
+    """The user's archive boundary if rows from start_date on may be archived, else None."""
+    boundary = archive.archived_through(db, user_id)
+    if boundary is None or (start_date and start_date > boundary):
+        return None
+    return boundary
+
 # List user transactions
 # -------------------------
+# Rows are selected as plain tuples and encoded straight to JSON with orjson:
+# building a TransactionOut per row and running it through jsonable_encoder took
+# most of the time on large pages. The output matches TransactionOut field for field.
+
+def transaction_out(amount, tx_date, description, tx_category_id, tx_id) -> dict:
+    return {
+        "amount": float(amount), #a JSON number, as pydantic encodes Decimal for the other endpoints
+        "date": tx_date, #orjson writes dates as YYYY-MM-DD
+        "description": description,
+        "category_id": tx_category_id,
+        "id": tx_id,
+    }
 
 @router.get("", response_model=list[TransactionOut])
 def list_transactions(
@@ -70,33 +198,291 @@ def list_transactions(
 
     page: int = 1,
     page_size: int = 20,
+    cursor: Optional[str] = None, #keyset mode: value of a previous X-Next-Cursor header
+    q: Optional[str] = None, #full-text search in descriptions, best match first
+
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    words = search_words(q) if q is not None else None
+    if q is not None and not words:
+        raise HTTPException(status_code=400, detail="Search needs at least one letter or digit")
+    if words and cursor:
+        #cursors follow date order, search results are in relevance order
+        raise HTTPException(status_code=400, detail="cursor can't be combined with q, use page")
+
+    position = decode_cursor(cursor) if cursor else None
+
+    def listing(model):
+        #Base query: only current user's transactions, only the columns TransactionOut needs
+        query = db.query(
+            model.amount, model.date, model.description, model.category_id, model.id,
+        ).filter(
+            model.user_id == current_user.id
+        )
+        query = filter_transactions(query, start_date, end_date, category_id, type, model)
+        if words:
+            return query
+
+        #id breaks ties between same-day rows so pages never overlap
+        query = query.order_by(model.date.desc(), model.id.desc())
+
+        if position:
+            #Keyset: seek past the last row seen, cost doesn't grow with depth.
+            #The plain "date <= x" bound lets the (user_id, date) index start the range there.
+            cursor_date, cursor_id = position
+            query = query.filter(
+                model.date <= cursor_date,
+                or_(model.date < cursor_date, model.id < cursor_id),
+            )
+        return query
+
+    if words:
+        #the archive has a full-text index of its own, searched when the dates can reach it
+        models = (Transaction, TransactionArchive) if reaches_archive(db, current_user.id, start_date) else (Transaction,)
+        rows = search_page(db, listing, models, current_user.id, words, (page - 1) * page_size, page_size)
+        return ORJSONResponse([transaction_out(*row) for row in rows])
+
+    offset = 0 if position else (page - 1) * page_size
+    rows = listing(Transaction).offset(offset).limit(page_size).all()
+
+    #Archive fall-through: archived rows are dated boundary or earlier, so a full page of newer
+    #hot rows is the answer as is. Otherwise both tables are read, each through its own index
+    #and cut at offset + page_size rows before they are merged.
+    boundary = reaches_archive(db, current_user.id, start_date)
+    if boundary and not (len(rows) == page_size and rows[-1].date > boundary):
+        parts = [listing(model).limit(offset + page_size).subquery() for model in (Transaction, TransactionArchive)]
+        merged = union_all(*[select(part) for part in parts]).subquery()
+        rows = (
+            db.query(merged.c.amount, merged.c.date, merged.c.description, merged.c.category_id, merged.c.id)
+            .order_by(merged.c.date.desc(), merged.c.id.desc())
+            .offset(offset)
+            .limit(page_size)
+            .all()
+        )
+
+    response = ORJSONResponse([transaction_out(*row) for row in rows])
 
+    #a full page means there may be more: hand out a cursor for the next one
+    if len(rows) == page_size:
+        last = rows[-1]
+        response.headers["X-Next-Cursor"] = encode_cursor(last.date, last.id)
+
+    return response
+
+# Batch create / update / delete
+# -------------------------
+# A multi-select edit in one request: every referenced transaction and category is
+# checked in one IN query each, everything is written in one DB transaction and the
+# rollups are updated once. Operations that fail (unknown transaction, foreign
+# category) are reported per item and skipped, the rest are applied.
+
+@router.post("/batch", response_model=BatchResultOut)
+def batch_transactions(
+    batch: BatchRequest,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    #Base query: only current user's transactions
-    query = db.query(Transaction).filter(
-        Transaction.user_id == current_user.id
-    )
+    operations = batch.operations #at most BATCH_MAX_OPERATIONS (schemas.BatchRequest)
+
+    #ownership of every referenced id: one query per table
+    transaction_ids = {op.id for op in operations if op.op != "create"}
+    category_ids = {op.category_id for op in operations if op.op != "delete" and op.category_id is not None}
+
+    transactions = {}
+    if transaction_ids:
+        transactions = {
+            transaction.id: transaction
+            for transaction in db.query(Transaction).filter(
+                Transaction.user_id == current_user.id,
+                Transaction.id.in_(transaction_ids)
+            )
+        }
 
-    #Filter by date range
-    if start_date:
-        query = query.filter(Transaction.date >= start_date)
+    owned_category_ids = set()
+    if category_ids:
+        owned_category_ids = {
+            category_id
+            for (category_id,) in db.query(Category.id).filter(
+                Category.user_id == current_user.id,
+                Category.id.in_(category_ids)
+            )
+        }
 
-    if end_date:
-        query = query.filter(Transaction.date <= end_date)
+    deltas = defaultdict(lambda: [Decimal(0), 0])
+
+    def track(transaction, sign):
+        delta = deltas[rollups.month_key(transaction.date, transaction.category_id)]
+        delta[0] += sign * Decimal(transaction.amount)
+        delta[1] += sign
+
+    results = []
+    applied = [] # (result, transaction) pairs whose values are filled in after the flush
+    for index, op in enumerate(operations):
+        result = {"index": index, "op": op.op}
+        results.append(result)
+
+        if op.op != "create":
+            result["id"] = op.id
+            transaction = transactions.get(op.id)
+            if transaction is None:
+                result.update(status="error", error="Transaction not found")
+                continue
+
+        if op.op != "delete" and op.category_id is not None and op.category_id not in owned_category_ids:
+            result.update(status="error", error="Invalid category")
+            continue
+
+        if op.op == "create":
+            transaction = Transaction(
+                user_id=current_user.id,
+                amount=op.amount,
+                date=op.date,
+                description=op.description,
+                category_id=op.category_id
+            )
+            db.add(transaction)
+            track(transaction, +1)
+            result["status"] = "created"
+            applied.append((result, transaction))
+
+        elif op.op == "update":
+            track(transaction, -1)
+            #Update fields only if provided, like PUT /transaction/{id}
+            if op.category_id is not None:
+                transaction.category_id = op.category_id
+            if op.amount is not None:
+                transaction.amount = op.amount
+            if op.date is not None:
+                transaction.date = op.date
+            if op.description is not None:
+                transaction.description = op.description
+            track(transaction, +1)
+            result["status"] = "updated"
+            applied.append((result, transaction))
+
+        else:
+            track(transaction, -1)
+            db.delete(transaction)
+            del transactions[op.id] #later operations on the same id get "not found"
+            result["status"] = "deleted"
+
+    failed = sum(result["status"] == "error" for result in results)
+    if failed < len(results):
+        db.flush() #assigns ids to the new rows
+        for result, transaction in applied:
+            #read before the commit expires the objects (that would cost a SELECT each)
+            result["id"] = transaction.id
+            result["transaction"] = transaction_out(
+                transaction.amount, transaction.date, transaction.description, transaction.category_id, transaction.id
+            )
+        rollups.apply_deltas(db, current_user.id, {key: tuple(delta) for key, delta in deltas.items()})
+        db.commit()
+        bump_data_version(current_user.id)
 
-    #Filter by category
-    if category_id:
-        query = query.filter(Transaction.category_id == category_id)
+    return {"applied": len(results) - failed, "failed": failed, "results": results}
 
-    #Filter by category type
-    if type:
-        query = query.join(Category).filter(Category.type == type)
+# Export
+# -------------------------
+EXPORT_COLUMNS = ("id", "date", "amount", "description", "category_id")
+EXPORT_BATCH_SIZE = 1000 #rows fetched (and written out) per round trip
+EXPORT_MEDIA_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+    "columnar": "application/x-ndjson",
+}
+
+def export_rows(user_id: int, start_date, end_date, category_id, type):
+    """Yield batches of (id, date, amount, description, category_id) tuples, oldest first.
+
+    Uses its own session: the response body is produced after the route returns,
+    when the request's session may already be closed.
+    """
+    db = read_session(user_id) #replica when configured
+    try:
+        def exported(model):
+            query = db.query(*[getattr(model, column) for column in EXPORT_COLUMNS]).filter(
+                model.user_id == user_id
+            )
+            return filter_transactions(query, start_date, end_date, category_id, type, model)
+
+        if reaches_archive(db, user_id, start_date):
+            merged = union_all(*[select(query.subquery()) for query in archive.selects(exported)]).subquery()
+            query = db.query(*[merged.c[column] for column in EXPORT_COLUMNS]).order_by(merged.c.date, merged.c.id)
+        else:
+            query = exported(Transaction).order_by(Transaction.date, Transaction.id)
+        #yield_per -> server-side cursor where the driver supports it, never the full result in memory
+        rows = query.yield_per(EXPORT_BATCH_SIZE)
+
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) == EXPORT_BATCH_SIZE:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+    finally:
+        db.close()
 
-    offset = (page - 1) * page_size
+def render_csv(batches):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    for batch in batches:
+        for tx_id, tx_date, amount, description, tx_category_id in batch:
+            writer.writerow((tx_id, tx_date.isoformat(), f"{amount:.2f}", description or "", tx_category_id or ""))
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+def render_ndjson(batches):
+    for batch in batches:
+        yield "".join(
+            json.dumps({
+                "id": tx_id,
+                "date": tx_date.isoformat(),
+                "amount": f"{amount:.2f}",
+                "description": description,
+                "category_id": tx_category_id,
+            }) + "\n"
+            for tx_id, tx_date, amount, description, tx_category_id in batch
+        )
 
-    return (query.order_by(Transaction.date.desc()).offset(offset).limit(page_size).all()) 
+def render_columnar(batches):
+    #one JSON object of column arrays per batch: far fewer repeated keys for analytics tools
+    for batch in batches:
+        ids, dates, amounts, descriptions, category_ids = zip(*batch)
+        yield json.dumps({
+            "id": ids,
+            "date": [d.isoformat() for d in dates],
+            "amount": [f"{a:.2f}" for a in amounts],
+            "description": descriptions,
+            "category_id": category_ids,
+        }) + "\n"
+
+@router.get("/export")
+def export_transactions(
+    format: str = "csv", #csv, ndjson or columnar
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    category_id: Optional[int] = None,
+    type: Optional[str] = None,
+    current_user: User = Depends(get_current_user)
+):
+    renderers = {"csv": render_csv, "ndjson": render_ndjson, "columnar": render_columnar}
+    if format not in renderers:
+        raise HTTPException(status_code=400, detail="Unsupported export format")
+
+    batches = export_rows(current_user.id, start_date, end_date, category_id, type)
+    extension = "csv" if format == "csv" else "ndjson"
+    return StreamingResponse(
+        renderers[format](batches),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="transactions.{extension}"'},
+    )
 
 # Delete a transaction
 # -------------------------
@@ -118,8 +504,10 @@ def delete_transaction(
     if not transaction: #error control
         raise HTTPException(status_code=404, detail="Transaction not found")
     
+    rollups.remove_transaction(db, transaction)
     db.delete(transaction)
     db.commit()
+    bump_data_version(current_user.id)
 
 # Update transaction
 # -------------------------
@@ -141,6 +529,9 @@ def update_transaction(
 
     if not transaction:
         raise HTTPException(status_code=404, detail="Transaction not found")
+
+    #take the old values out of the rollup, the new ones are added back below
+    rollups.remove_transaction(db, transaction)
     
     # If category is provided, validate ownership
     if transaction_in.category_id is not None:
@@ -167,85 +558,233 @@ def update_transaction(
     if transaction_in.description is not None:
         transaction.description = transaction_in.description
 
+    rollups.add_transaction(db, transaction)
     db.commit()
+    bump_data_version(current_user.id)
     db.refresh(transaction)
 
     return transaction
 
+# Summary helpers
+# -------------------------
+def type_sum(column, category_type: str):
+    #conditional aggregation: SUM(CASE WHEN category.type = ... THEN column ELSE 0 END)
+    return func.coalesce(
+        func.sum(
+            case(
+                (Category.type == category_type, column),
+                else_=0
+            )
+        ),
+        0
+    )
+
+def week_start(db: Session, column):
+    #Monday of the week containing column, as a date
+    if db.get_bind().dialect.name == "sqlite":
+        return func.date(column, "weekday 0", "-6 days")
+    return cast(func.date_trunc("week", column), Date)
+
+def bucket_start(db: Session, column, bucket: str):
+    #first day of the day/week/month bucket containing column, as a date
+    if bucket == "week":
+        return week_start(db, column)
+    if bucket == "month":
+        if db.get_bind().dialect.name == "sqlite":
+            return func.date(column, "start of month", type_=Date)
+        return cast(func.date_trunc("month", column), Date)
+    return column
+
+def next_bucket(db: Session, column, bucket: str):
+    step = {"day": "1 day", "week": "7 days", "month": "1 month"}[bucket]
+    if db.get_bind().dialect.name == "sqlite":
+        return func.date(column, f"+{step}", type_=Date)
+    return cast(column + literal_column(f"INTERVAL '{step}'", Interval), Date)
+
+def python_bucket_start(day: date, bucket: str) -> date:
+    if bucket == "week":
+        return day - timedelta(days=day.weekday())
+    if bucket == "month":
+        return day.replace(day=1)
+    return day
+
+def summary_source(db: Session, user_id: int, start_date: Optional[date], end_date: Optional[date], by_week: bool = False):
+    """One subquery of (category_id, year, month[, week], amount) rows covering the date range.
+
+    Whole months come from the rollup table and only the partial months at the
+    edges from raw transactions (hot and archived), glued together with UNION ALL so callers can
+    aggregate everything in a single statement. Weeks don't line up with the
+    monthly rollups, so by_week reads raw rows for the whole range.
+    """
+    if by_week:
+        def weekly_rows(model):
+            query = select(
+                model.category_id, extract("year", model.date).label("year"), extract("month", model.date).label("month"),
+                week_start(db, model.date).label("week"), model.amount.label("amount"),
+            ).where(model.user_id == user_id)
+            if start_date:
+                query = query.where(model.date >= start_date)
+            if end_date:
+                query = query.where(model.date <= end_date)
+            return query
+        return union_all(*archive.selects(weekly_rows)).subquery()
+
+    first_month, last_month, edges = rollups.split_range(start_date, end_date)
+    parts = []
+
+    if not (first_month and last_month and first_month > last_month):
+        parts.append(
+            select(
+                MonthlyRollup.category_id, MonthlyRollup.year, MonthlyRollup.month,
+                MonthlyRollup.total.label("amount"),
+            ).where(
+                MonthlyRollup.user_id == user_id,
+                *rollups.month_range_filter(first_month, last_month)
+            )
+        )
+
+    if edges:
+        #edge days can be archived: raw rows from both tables
+        parts.extend(archive.selects(lambda model: (
+            select(
+                model.category_id, extract("year", model.date).label("year"), extract("month", model.date).label("month"),
+                model.amount.label("amount"),
+            )
+            .where(
+                model.user_id == user_id,
+                or_(*[model.date.between(edge_start, edge_end) for edge_start, edge_end in edges])
+            )
+        )))
+
+    if not parts: #empty range (start_date after end_date)
+        return None
+    return (union_all(*parts) if len(parts) > 1 else parts[0]).subquery()
+
 # Summary
 # -------------------------
-@router.get("/summary", response_model=TransactionSummary)
+@router.get("/summary", response_model=TransactionSummary, response_model_exclude_none=True)
 def transaction_summary(
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
-    db: Session = Depends(get_db),
+    group_by: Optional[str] = None, #"category", "month" or "week": adds a per-group breakdown
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
-    base_query = (
-        db.query(Transaction)
-        .outerjoin(Category)
-        .filter(Transaction.user_id == current_user.id)
-    )
-
-    if start_date:
-        base_query = base_query.filter(Transaction.date >= start_date)
-
-    if end_date:
-        base_query = base_query.filter(Transaction.date <= end_date)
-
-    total_income = (
-        base_query.filter(Category.type == "income")
-        .with_entities(func.coalesce(func.sum(Transaction.amount), 0))
-        .scalar()
+    if group_by not in (None, "category", "month", "week"):
+        raise HTTPException(status_code=400, detail="Invalid group_by")
+
+    source = summary_source(db, current_user.id, start_date, end_date, by_week=group_by == "week")
+    if source is None:
+        return {"total_income": 0, "total_expense": 0, "balance": 0, "groups": [] if group_by else None}
+
+    group_columns = []
+    if group_by == "category":
+        group_columns = [source.c.category_id, Category.name]
+    elif group_by == "month":
+        group_columns = [source.c.year, source.c.month]
+    elif group_by == "week":
+        group_columns = [source.c.week]
+
+    #income and expense in one pass over the source (SUM(CASE ...)), optionally per group
+    rows = (
+        db.query(
+            *group_columns,
+            type_sum(source.c.amount, "income").label("total_income"),
+            type_sum(source.c.amount, "expense").label("total_expense"),
+        )
+        .select_from(source)
+        .outerjoin(Category, source.c.category_id == Category.id)
+        .group_by(*group_columns)
+        .order_by(*group_columns)
+        .all()
     )
 
-    total_expense = (
-        base_query
-        .filter(Category.type == "expense")
-        .with_entities(func.coalesce(func.sum(Transaction.amount), 0)) #func.sum() --> SQL SUM(), coalesce() --> avoids NULL
-        .scalar()
-    )
+    total_income = sum(row.total_income for row in rows)
+    total_expense = sum(row.total_expense for row in rows)
 
-    return {
+    summary = {
         "total_income": total_income,
         "total_expense": total_expense,
         "balance": total_income - total_expense
     }
 
+    if group_by:
+        summary["groups"] = [
+            {
+                "key": group_key(group_by, row),
+                "category_id": row.category_id if group_by == "category" else None,
+                "total_income": row.total_income,
+                "total_expense": row.total_expense,
+                "balance": row.total_income - row.total_expense,
+            }
+            for row in rows
+        ]
+
+    return summary
+
+def group_key(group_by: str, row) -> str:
+    if group_by == "category":
+        return row.name or "Uncategorized"
+    if group_by == "month":
+        return f"{int(row.year)}-{int(row.month):02d}"
+    return str(row.week)[:10] #week start, YYYY-MM-DD
+
+# Category breakdown
+# -------------------------
+@router.get("/summary/categories", response_model=list[CategoryBreakdownOut])
+def category_breakdown(
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    type: Optional[str] = None, #income or expense; all categories (and "Uncategorized") if omitted
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    if type not in (None, "income", "expense"):
+        raise HTTPException(status_code=400, detail="Invalid type")
+
+    #same rollup + edge rows source as /summary, one GROUP BY and one join against categories
+    source = summary_source(db, current_user.id, start_date, end_date)
+    if source is None:
+        return []
+
+    total = func.sum(source.c.amount).label("total")
+    query = (
+        db.query(source.c.category_id, Category.name, total)
+        .select_from(source)
+        .outerjoin(Category, source.c.category_id == Category.id)
+    )
+    if type:
+        query = query.filter(Category.type == type)
+    rows = (
+        query.group_by(source.c.category_id, Category.name)
+        .order_by(total.desc(), source.c.category_id)
+        .all()
+    )
+
+    return [
+        {"category": row.name or "Uncategorized", "category_id": row.category_id, "total": float(row.total)}
+        for row in rows
+    ]
+
 # Monthly Summary
 # -------------------------
 @router.get("/summary/monthly", response_model=list[MonthlySummaryOut])
 def monthly_transaction_summary(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
+    #served from the rollup table: one row per month/category instead of every transaction
     results = (
         db.query(
-            extract("year", Transaction.date).label("year"),
-            extract("month", Transaction.date).label("month"),
-            func.coalesce(
-                func.sum(
-                    case(
-                        (Category.type == "income", Transaction.amount),
-                        else_=0
-                    )
-                ),
-                0
-            ).label("total_income"),
-            func.coalesce(
-                func.sum(
-                    case(
-                        (Category.type == "expense", Transaction.amount),
-                        else_=0
-                    )
-                ),
-                0
-            ).label("total_expense"),
+            MonthlyRollup.year,
+            MonthlyRollup.month,
+            type_sum(MonthlyRollup.total, "income").label("total_income"),
+            type_sum(MonthlyRollup.total, "expense").label("total_expense"),
         )
-        .outerjoin(Category)
-        .filter(Transaction.user_id == current_user.id)
-        .group_by("year", "month")
-        .order_by("year", "month")
+        .outerjoin(Category, MonthlyRollup.category_id == Category.id)
+        .filter(MonthlyRollup.user_id == current_user.id)
+        .group_by(MonthlyRollup.year, MonthlyRollup.month)
+        .order_by(MonthlyRollup.year, MonthlyRollup.month)
         .all()
     )
 
@@ -258,4 +797,113 @@ def monthly_transaction_summary(
             "balance": float(row.total_income - row.total_expense),
         }
         for row in results
-    ]
\ No newline at end of file
+    ]
+
+# Time series
+# -------------------------
+@router.get("/summary/timeseries", response_model=TimeSeriesOut)
+def timeseries_summary(
+    start_date: Optional[date] = None, #defaults to the first matching transaction
+    end_date: Optional[date] = None, #defaults to the last matching transaction
+    bucket: str = "day", #day, week or month
+    category_id: Optional[int] = None,
+    window: int = 7, #buckets in the moving average
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    if bucket not in ("day", "week", "month"):
+        raise HTTPException(status_code=400, detail="Invalid bucket")
+    if not 1 <= window <= 365:
+        raise HTTPException(status_code=400, detail="window must be between 1 and 365")
+
+    def scope(model):
+        conditions = [model.user_id == current_user.id]
+        if category_id is not None:
+            conditions.append(model.category_id == category_id)
+        return conditions
+
+    if start_date is None or end_date is None:
+        #one MIN and one MAX per table, each an index seek
+        bounds = [
+            select(aggregate(model.date)).where(*scope(model)).scalar_subquery()
+            for aggregate in (func.min, func.max) for model in (Transaction, TransactionArchive)
+        ]
+        hot_first, archived_first, hot_last, archived_last = db.query(*bounds).one()
+        start_date = start_date or min(filter(None, (hot_first, archived_first)), default=None)
+        end_date = end_date or max(filter(None, (hot_last, archived_last)), default=None)
+
+    series = {"bucket": bucket, "window": window, "opening_balance": 0.0,
+              "dates": [], "income": [], "expense": [], "net": [], "balance": [], "moving_average": []}
+    if start_date is None or end_date is None or start_date > end_date:
+        return ORJSONResponse(series)
+
+    first_bucket = python_bucket_start(start_date, bucket)
+    last_bucket = python_bucket_start(end_date, bucket)
+    if bucket == "month":
+        bucket_count = (last_bucket.year - first_bucket.year) * 12 + last_bucket.month - first_bucket.month + 1
+    else:
+        bucket_count = (last_bucket - first_bucket).days // (7 if bucket == "week" else 1) + 1
+    if bucket_count > TIMESERIES_MAX_BUCKETS:
+        raise HTTPException(status_code=400, detail=f"More than {TIMESERIES_MAX_BUCKETS} buckets, use a longer bucket or a shorter range")
+
+    #balance carried in from before the range, read through the rollups
+    before = summary_source(db, current_user.id, None, start_date - timedelta(days=1))
+    if before is not None:
+        opening = db.query(
+            type_sum(before.c.amount, "income") - type_sum(before.c.amount, "expense")
+        ).select_from(before).outerjoin(Category, before.c.category_id == Category.id)
+        if category_id is not None:
+            opening = opening.filter(before.c.category_id == category_id)
+        series["opening_balance"] = round(float(opening.scalar() or 0), 2)
+
+    #every bucket of the range, so empty days/weeks/months still get a point
+    anchor = literal(first_bucket, Date)
+    if db.get_bind().dialect.name != "sqlite":
+        anchor = cast(anchor, Date) #Postgres needs the recursive column's type up front
+    buckets = select(anchor.label("bucket")).cte("buckets", recursive=True)
+    buckets = buckets.union_all(
+        select(next_bucket(db, buckets.c.bucket, bucket)).where(buckets.c.bucket < last_bucket)
+    )
+
+    rows_in_range = union_all(*archive.selects(lambda model: (
+        select(model.date, model.amount, model.category_id)
+        .where(*scope(model), model.date.between(start_date, end_date))
+    ))).subquery()
+    tx_bucket = bucket_start(db, rows_in_range.c.date, bucket)
+    sums = (
+        select(
+            tx_bucket.label("bucket"),
+            type_sum(rows_in_range.c.amount, "income").label("income"),
+            type_sum(rows_in_range.c.amount, "expense").label("expense"),
+        )
+        .select_from(rows_in_range)
+        .outerjoin(Category, rows_in_range.c.category_id == Category.id)
+        .group_by(tx_bucket)
+        .cte("sums")
+    )
+
+    income = func.coalesce(sums.c.income, 0)
+    expense = func.coalesce(sums.c.expense, 0)
+    net = income - expense
+    rows = db.execute(
+        select(
+            buckets.c.bucket,
+            income.label("income"),
+            expense.label("expense"),
+            func.sum(net).over(order_by=buckets.c.bucket, rows=(None, 0)).label("balance"),
+            func.avg(net).over(order_by=buckets.c.bucket, rows=(-(window - 1), 0)).label("moving_average"),
+        )
+        .select_from(buckets.outerjoin(sums, sums.c.bucket == buckets.c.bucket))
+        .order_by(buckets.c.bucket)
+    )
+
+    opening_balance = series["opening_balance"]
+    for row in rows:
+        series["dates"].append(row.bucket)
+        series["income"].append(round(float(row.income), 2))
+        series["expense"].append(round(float(row.expense), 2))
+        series["net"].append(round(float(row.income) - float(row.expense), 2))
+        series["balance"].append(round(opening_balance + float(row.balance), 2))
+        series["moving_average"].append(round(float(row.moving_average), 2))
+
+    return ORJSONResponse(series)
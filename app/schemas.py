@@ -1,6 +1,7 @@
-from pydantic import BaseModel, EmailStr, constr, condecimal
-from typing import Optional, List
+from pydantic import BaseModel, EmailStr, Field, conlist, constr, condecimal
+from typing import Optional, List, Dict, Literal, Union, Annotated
 from datetime import date
+import datetime
 
 # USER SCHEMAS
 # =========================
@@ -21,7 +22,8 @@ class UserOut(BaseModel): #Schema returned to the client when we expose user dat
 
 
     class Config:
-        from_attributes = True # lets Pydantic read SQLAlchemy models
+        orm_mode = True # lets Pydantic read SQLAlchemy models (pydantic 1)
+        from_attributes = True # same, pydantic 2 spelling
     
 class Token(BaseModel): # Schema for JWT token response.
     access_token: str
@@ -41,6 +43,7 @@ class CategoryOut(CategoryBase): #Schema returned when reading category data. In
     id: int
 
     class Config:
+        orm_mode = True
         from_attributes = True
 
 
@@ -61,16 +64,61 @@ class TransactionCreate(TransactionBase):
 # -------------------------
 class TransactionUpdate(BaseModel):
     amount: Optional[condecimal(max_digits=12, decimal_places=2)] = None
-    date: Optional[date] = None
+    date: Optional[datetime.date] = None #not Optional[date]: the class body's `date = None` would shadow the type
     description: Optional[str] = None
     category_id: Optional[int] = None
 
+# Batch operations
+# -------------------------
+class BatchCreate(TransactionCreate):
+    op: Literal["create"]
+
+class BatchUpdate(TransactionUpdate):
+    op: Literal["update"]
+    id: int
+
+class BatchDelete(BaseModel):
+    op: Literal["delete"]
+    id: int
+
+BatchOperation = Annotated[Union[BatchCreate, BatchUpdate, BatchDelete], Field(discriminator="op")]
+
+BATCH_MAX_OPERATIONS = 1000 #per POST /transaction/batch
+
+#checked on the list's length before any operation is validated, so an oversized body fails fast (422)
+try:
+    BatchOperations = conlist(BatchOperation, max_length=BATCH_MAX_OPERATIONS) #pydantic 2
+except TypeError:
+    BatchOperations = conlist(BatchOperation, max_items=BATCH_MAX_OPERATIONS)
+
+class BatchRequest(BaseModel):
+    operations: BatchOperations
+
 # Transaction Summary
 # -------------------------
+class SummaryGroupOut(BaseModel): #One bucket of a grouped summary (?group_by=category|month|week)
+    key: str # category name, "YYYY-MM" or the week's Monday "YYYY-MM-DD"
+    category_id: Optional[int] = None
+    total_income: float
+    total_expense: float
+    balance: float
+
 class TransactionSummary(BaseModel):
     total_income: float
     total_expense: float
     balance: float
+    groups: Optional[List[SummaryGroupOut]] = None
+
+# Bulk import result
+# -------------------------
+class ImportRowError(BaseModel):
+    line: int #line number in the uploaded file
+    error: str
+
+class ImportResultOut(BaseModel):
+    imported: int
+    failed: int
+    errors: List[ImportRowError] # first IMPORT_MAX_ERRORS failures only
 
 # Transaction output
 # ---------------------------
@@ -78,8 +126,22 @@ class TransactionOut(TransactionBase):
     id:int
 
     class Config:
+        orm_mode = True
         from_attributes = True
 
+class BatchItemResult(BaseModel): #Outcome of one operation of POST /transaction/batch
+    index: int # position in the request's operations list
+    op: str
+    status: str # created, updated, deleted or error
+    id: Optional[int] = None
+    error: Optional[str] = None
+    transaction: Optional[TransactionOut] = None # created/updated values
+
+class BatchResultOut(BaseModel):
+    applied: int
+    failed: int
+    results: List[BatchItemResult]
+
 
 # Analytics / Summary Schemas
 # ----------------------------
@@ -93,4 +155,55 @@ class MonthlySummaryOut(BaseModel):
 
 class CategoryBreakdownOut(BaseModel):
     category: str
-    total: float
\ No newline at end of file
+    category_id: Optional[int] = None # None for "Uncategorized"
+    total: float
+
+class TimeSeriesOut(BaseModel): #Column arrays, one entry per bucket (empty buckets included)
+    bucket: str # day, week or month
+    window: int # buckets averaged by moving_average
+    opening_balance: float # balance before the first bucket
+    dates: List[date] # first day of each bucket
+    income: List[float]
+    expense: List[float]
+    net: List[float]
+    balance: List[float] # running balance at the end of each bucket
+    moving_average: List[float] # mean net of the last `window` buckets
+
+class CategoryPercentilesOut(BaseModel):
+    category: str
+    category_id: Optional[int] = None
+    count: int
+    percentiles: Dict[str, float] # "p50" -> amount
+
+class BudgetRequest(BaseModel):
+    start_date: Optional[date] = None # defaults to the first day of the current month
+    end_date: Optional[date] = None # defaults to today
+    budgets: Dict[int, condecimal(max_digits=12, decimal_places=2)] # category_id -> monthly budget
+
+class BudgetLineOut(BaseModel):
+    category: str
+    category_id: int
+    year: int
+    month: int
+    budget: float
+    actual: float
+    remaining: float
+
+# Recurring rules
+# -------------------------
+class RecurringRuleCreate(BaseModel):
+    amount: condecimal(max_digits=12, decimal_places=2)
+    description: Optional[str] = None
+    category_id: Optional[int] = None
+    frequency: Literal["daily", "weekly", "monthly", "yearly"]
+    interval: int = Field(1, ge=1, le=366) # every N days/weeks/months/years
+    start_date: date # first occurrence; fixes the weekday or day of month
+    end_date: Optional[date] = None # last possible occurrence
+
+class RecurringRuleOut(RecurringRuleCreate):
+    id: int
+    next_date: Optional[date] = None # next occurrence to be booked, None once the rule has ended
+
+    class Config:
+        orm_mode = True
+        from_attributes = True
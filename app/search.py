@@ -0,0 +1,143 @@
+import re
+from sqlalchemy import DDL, event, func, literal_column, select, table, column, union_all, Integer, Float
+from sqlalchemy.orm import Query, Session
+from app.models import Transaction, TransactionArchive
+
+# Full-text search over descriptions
+# -------------------------
+# SQLite: an FTS5 index over transactions.description kept in sync by triggers.
+# Postgres: a GIN index on the description's tsvector. Both match every search word
+# as a prefix ("amaz" finds "Amazon") and rank by relevance (bm25 / ts_rank).
+# transactions_archive has an index of its own (transactions_archive_fts / its own GIN
+# index), searched along with the hot one when the user has archived rows.
+#
+# The FTS5 index is shared by all users, so its rowids carry the owner:
+# (user_id << 32) + transaction id. One user's entries are then a single rowid range
+# FTS5 can seek to, and a search never walks other users' matches. The table is
+# contentless (content=''): descriptions stay in transactions only.
+#
+# Ranking is bounded: the SEARCH_RANK_WINDOW most recently added matches (after the
+# other filters) come first, best match first; the older matches follow, most recently
+# added first, so paging still reaches all of them. bm25 / ts_rank over every match of
+# a word found in nearly every description took ~600 ms on 300k rows.
+
+SEARCH_MAX_WORDS = 10
+SEARCH_RANK_WINDOW = 500 #matches ranked by relevance per search
+OWNER_SHIFT = 32 #transaction ids stay below 2**32
+INDEXED = (Transaction, TransactionArchive)
+
+
+def sqlite_ddl(source: str) -> list[str]:
+    """The FTS5 table {source}_fts and the triggers that keep it in sync with {source}.description."""
+    index = f"{source}_fts"
+    return [
+        #prefix indexes make 2- and 3-letter prefixes an index lookup instead of a term scan
+        f"""CREATE VIRTUAL TABLE IF NOT EXISTS {index} USING fts5(
+        description, content='', tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )""",
+        f"""CREATE TRIGGER IF NOT EXISTS {index}_insert AFTER INSERT ON {source} BEGIN
+        INSERT INTO {index}(rowid, description) VALUES ((new.user_id << 32) + new.id, new.description);
+    END""",
+        #contentless tables need the old text to drop its terms
+        f"""CREATE TRIGGER IF NOT EXISTS {index}_delete AFTER DELETE ON {source} BEGIN
+        INSERT INTO {index}({index}, rowid, description)
+        VALUES ('delete', (old.user_id << 32) + old.id, old.description);
+    END""",
+        f"""CREATE TRIGGER IF NOT EXISTS {index}_update AFTER UPDATE OF description, user_id ON {source} BEGIN
+        INSERT INTO {index}({index}, rowid, description)
+        VALUES ('delete', (old.user_id << 32) + old.id, old.description);
+        INSERT INTO {index}(rowid, description) VALUES ((new.user_id << 32) + new.id, new.description);
+    END""",
+    ]
+
+
+def postgres_vector(source: str) -> str:
+    #must match the index expression exactly for Postgres to use the index
+    return f"to_tsvector('simple', coalesce({source}.description, ''))"
+
+
+def postgres_ddl(source: str) -> list[str]:
+    return [
+        f"CREATE INDEX IF NOT EXISTS ix_{source}_description_fts ON {source} USING gin ({postgres_vector(source)})",
+    ]
+
+
+SQLITE_DDL = sqlite_ddl("transactions")
+POSTGRES_VECTOR = postgres_vector("transactions")
+POSTGRES_DDL = postgres_ddl("transactions")
+
+fts_tables = {
+    model: table(f"{model.__tablename__}_fts", column("rowid", Integer), column("rank", Float))
+    for model in INDEXED
+}
+fts = fts_tables[Transaction]
+
+# Tables built by create_all (fresh databases, tests, benchmarks) get the index right away;
+# existing databases get it from the 0004 (transactions) and 0010 (archive) migrations.
+for model in INDEXED:
+    for statement in sqlite_ddl(model.__tablename__):
+        event.listen(model.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+    for statement in postgres_ddl(model.__tablename__):
+        event.listen(model.__table__, "after_create", DDL(statement).execute_if(dialect="postgresql"))
+
+
+def search_words(q: str) -> list[str]:
+    #letters/digits only: quotes, operators and column filters can't reach the query syntax
+    return re.findall(r"[^\W_]+", q.lower())[:SEARCH_MAX_WORDS]
+
+
+def apply_search(db: Session, query: Query, user_id: int, words: list[str], model=Transaction):
+    """Restrict a user's list query over `model` (amount, date, description, category_id, id) to rows matching every word.
+
+    Returns the filtered query, its rank expression (lower is better) and its
+    most-recently-added-first order.
+    """
+    if db.get_bind().dialect.name == "sqlite":
+        index = fts_tables[model]
+        match = " ".join(f'"{word}"*' for word in words)
+        owner = user_id << OWNER_SHIFT
+        query = query.join(index, model.id == index.c.rowid - owner).filter(
+            literal_column(index.name).match(match),
+            index.c.rowid.between(owner, owner + (1 << OWNER_SHIFT) - 1), #the user's rowid window
+        )
+        #bm25: lower is better. Ordering by the FTS rowid lets FTS5 walk its index backwards
+        return query, index.c.rank, index.c.rowid.desc()
+
+    vector = literal_column(postgres_vector(model.__tablename__))
+    tsquery = func.to_tsquery("simple", " & ".join(f"{word}:*" for word in words))
+    query = query.filter(vector.op("@@")(tsquery))
+    return query, -func.ts_rank(vector, tsquery), model.id.desc() #ts_rank: higher is better
+
+
+def search_page(db: Session, listing, models, user_id: int, words: list[str], offset: int, limit: int) -> list:
+    """One page of the matches of listing(model) for each of `models`: the ranked window first, then the older matches.
+
+    With several tables (hot + archive) each is cut at the rows the page can need and
+    the parts are merged on id, which is unique across them.
+    """
+    searches = [apply_search(db, listing(model), user_id, words, model) for model in models]
+    matches = [query.order_by(None).order_by(newest_first) for query, _, newest_first in searches]
+
+    def newest(parts, count, skip=0):
+        if len(parts) == 1:
+            return parts[0].offset(skip).limit(count).subquery()
+        merged = union_all(*[select(part.limit(skip + count).subquery()) for part in parts]).subquery()
+        return select(merged).order_by(merged.c.id.desc()).offset(skip).limit(count).subquery()
+
+    #bm25 values of the two FTS tables are compared as they are: close enough to interleave
+    window = newest([match.add_columns(rank.label("rank")) for match, (_, rank, _) in zip(matches, searches)], SEARCH_RANK_WINDOW)
+    rows = (
+        db.query(window.c.amount, window.c.date, window.c.description, window.c.category_id, window.c.id)
+        .order_by(window.c.rank, window.c.date.desc(), window.c.id.desc())
+        .offset(offset)
+        .limit(limit)
+        .all()
+    )
+    if len(rows) < limit and offset + limit > SEARCH_RANK_WINDOW:
+        rest = newest(matches, limit - len(rows), max(offset, SEARCH_RANK_WINDOW))
+        rows += (
+            db.query(rest.c.amount, rest.c.date, rest.c.description, rest.c.category_id, rest.c.id)
+            .order_by(rest.c.id.desc())
+            .all()
+        )
+    return rows
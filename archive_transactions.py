@@ -0,0 +1,45 @@
+"""Move old transactions into the archive table (see app/archive.py).
+
+    python archive_transactions.py                      # older than ARCHIVE_AFTER_DAYS (365)
+    python archive_transactions.py --days 730           # older than two years
+    python archive_transactions.py --before 2024-01-01  # a fixed date
+    python archive_transactions.py --user 7 --dry-run   # count only
+
+Safe to run while the app is serving requests (e.g. nightly from cron): rows are
+moved ARCHIVE_CHUNK_SIZE at a time, one short DB transaction each.
+"""
+import argparse
+import sys
+from datetime import date
+from app.db import SessionLocal
+from app import archive
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Move old transactions into the archive table.")
+    cutoff = parser.add_mutually_exclusive_group()
+    cutoff.add_argument("--days", type=int, default=archive.ARCHIVE_AFTER_DAYS, help="archive rows older than this")
+    cutoff.add_argument("--before", type=date.fromisoformat, default=None, help="archive rows dated before YYYY-MM-DD")
+    parser.add_argument("--user", type=int, default=None, help="only this user id")
+    parser.add_argument("--dry-run", action="store_true", help="count the rows without moving them")
+    args = parser.parse_args()
+
+    before = args.before or archive.horizon(args.days)
+
+    if args.dry_run:
+        db = SessionLocal()
+        try:
+            count = archive.count_archivable(db, before, args.user)
+        finally:
+            db.close()
+        print(f"{count} transactions dated before {before} would be archived.")
+        return 0
+
+    print(f"Archiving transactions dated before {before}...")
+    moved = archive.archive_all(before, args.user)
+    print(f"Done. {moved} transactions archived.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
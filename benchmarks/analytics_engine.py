@@ -0,0 +1,148 @@
+"""In-memory NumPy analytics vs. the SQL summary routes on a large history.
+
+    python benchmarks/analytics_engine.py --rows 1000000
+
+Seeds one user with --rows transactions over ten years in a throwaway SQLite
+database, builds the monthly rollups, then times the SQL routes and the
+/analytics equivalents (called directly, no HTTP) and checks they agree.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+import numpy as np
+
+from common import ROOT
+
+DB_FILE = os.path.join(tempfile.mkdtemp(), "analytics_engine.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_FILE}" #before app.db is imported
+sys.path.insert(0, str(ROOT))
+
+from sqlalchemy import insert
+from app import analytics, rollups
+from app.db import Base, SessionLocal, engine
+from app.models import Category, Transaction, User
+from app.routes import transactions
+
+CHUNK = 50000
+
+
+def seed(rows):
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    user = User(username="analytics", email="analytics@example.com", password_hash="x")
+    db.add(user)
+    db.flush()
+    categories = [Category(name="salary", type="income", user_id=user.id)] + [
+        Category(name=f"expense {i}", type="expense", user_id=user.id) for i in range(9)
+    ]
+    db.add_all(categories)
+    db.flush()
+    category_ids = [category.id for category in categories] + [None]
+
+    start = date(2015, 1, 1)
+    for offset in range(0, rows, CHUNK):
+        db.execute(insert(Transaction), [
+            {
+                "user_id": user.id,
+                "amount": round(random.uniform(1, 2000), 2),
+                "date": start + timedelta(days=random.randrange(3650)),
+                "description": None,
+                "category_id": random.choice(category_ids),
+            }
+            for _ in range(offset, min(rows, offset + CHUNK))
+        ])
+    rollups.rebuild(db, user.id)
+    db.commit()
+    db.refresh(user)
+    db.expunge(user)
+    db.close()
+    return user
+
+
+def timed(fn, repeat):
+    timings, result = [], None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - started)
+    return result, statistics.median(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    user = seed(args.rows)
+    print(f"seeded {args.rows} rows in {time.perf_counter() - started:.1f}s")
+
+    db = SessionLocal()
+    start, end = date(2017, 3, 15), date(2022, 8, 20) #partial months at both edges
+
+    started = time.perf_counter()
+    store = analytics.get_store(db, user.id)
+    load_ms = (time.perf_counter() - started) * 1000
+    print(f"column store load: {load_ms:.0f} ms, {store.nbytes / 1e6:.1f} MB")
+
+    def sql_breakdown(start_date=None, end_date=None):
+        groups = transactions.transaction_summary(start_date, end_date, "category", db=db, current_user=user)["groups"]
+        #SQL totals only count income/expense categories, so uncategorized comes back as 0
+        return {g["key"]: round(float(g["total_income"] + g["total_expense"]), 2) for g in groups if g["category_id"] is not None}
+
+    cases = [
+        ("summary (all)",
+         lambda: transactions.transaction_summary(None, None, None, db=db, current_user=user),
+         lambda: analytics.summary(analytics.get_store(db, user.id))),
+        ("summary (range)",
+         lambda: transactions.transaction_summary(start, end, None, db=db, current_user=user),
+         lambda: analytics.summary(analytics.get_store(db, user.id), start, end)),
+        ("monthly",
+         lambda: transactions.monthly_transaction_summary(db=db, current_user=user),
+         lambda: analytics.monthly(analytics.get_store(db, user.id))),
+        ("breakdown (all)",
+         sql_breakdown,
+         lambda: {line["category"]: line["total"] for line in analytics.breakdown(analytics.get_store(db, user.id))
+                  if line["category"] != "Uncategorized"}),
+        ("breakdown (range)",
+         lambda: sql_breakdown(start, end),
+         lambda: {line["category"]: line["total"] for line in analytics.breakdown(analytics.get_store(db, user.id), start, end)
+                  if line["category"] != "Uncategorized"}),
+    ]
+
+    print(f"{'query':<24} {'sql ms':>9} {'numpy ms':>9} {'speedup':>8}")
+    for label, sql_fn, numpy_fn in cases:
+        sql_result, sql_ms = timed(sql_fn, args.repeat)
+        numpy_result, numpy_ms = timed(numpy_fn, args.repeat)
+        if label.startswith("summary"):
+            sql_result = {key: round(float(value), 2) for key, value in sql_result.items()}
+        if sql_result != numpy_result:
+            sys.exit(f"{label}: results differ\n  sql:   {sql_result}\n  numpy: {numpy_result}")
+        print(f"{label:<24} {sql_ms:>9.2f} {numpy_ms:>9.2f} {sql_ms / numpy_ms:>7.1f}x")
+
+    #no SQL counterpart on SQLite: compare with numpy.percentile per category instead
+    result, ms = timed(lambda: analytics.percentiles(analytics.get_store(db, user.id), [50, 90, 99], start, end), args.repeat)
+    window = store.window(start, end)
+    for line in result:
+        position = store.category_position(line["category_id"])
+        values = store.cents[window][store.category_index[window] == position]
+        expected = np.percentile(values, [50, 90, 99]) / 100
+        if not np.allclose(list(line["percentiles"].values()), expected, atol=0.01):
+            sys.exit(f"percentiles differ for {line['category']}")
+    print(f"{'percentiles (range)':<24} {'-':>9} {ms:>9.2f}")
+
+    budgets = {category_id: 5000 for category_id in store.category_ids}
+    _, ms = timed(lambda: analytics.budget_vs_actual(analytics.get_store(db, user.id), budgets, date(2020, 1, 1), date(2020, 12, 31)), args.repeat)
+    print(f"{'budget (12 months)':<24} {'-':>9} {ms:>9.2f}")
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Load test: threadpool (sync) routes vs DB_ASYNC routes under concurrent requests.
+
+    pip install -r benchmarks/requirements.txt
+    python benchmarks/async_vs_sync.py --requests 3000 --concurrency 200
+
+Starts the app under uvicorn once per mode against the same database, drives it
+with concurrent list/summary/category reads, and prints throughput and latency
+percentiles. The default database is a throwaway SQLite file; pass
+--database-url to compare against Postgres, where DB round trips are long enough
+for the threadpool limit (40 workers by default) to matter.
+"""
+import argparse
+import asyncio
+import random
+import tempfile
+import time
+
+import httpx
+
+from common import latency_summary, login, start_server, stop_server
+
+
+def seed(base_url, rows):
+    client = httpx.Client(base_url=base_url, timeout=60)
+    headers = login(client, "bench", "bench-password")
+
+    existing = client.get("/categories", headers=headers).json()
+    if not existing:
+        for name, kind in [("salary", "income"), ("rent", "expense"), ("food", "expense"), ("fun", "expense")]:
+            client.post("/categories", json={"name": name, "type": kind}, headers=headers)
+
+        lines = ["date,amount,description,category"]
+        for i in range(rows):
+            lines.append(
+                f"{random.randint(2019, 2024)}-{random.randint(1, 12):02d}-{random.randint(1, 28):02d},"
+                f"{random.randint(100, 99999) / 100},row {i},{random.choice(['salary', 'rent', 'food', 'fun'])}"
+            )
+        client.post("/transaction/import", files={"file": ("seed.csv", "\n".join(lines))}, headers=headers)
+    return headers
+
+
+REQUESTS = [
+    ("/transaction", {"page_size": 50}),
+    ("/transaction/summary", {"start_date": "2021-03-15", "end_date": "2023-08-20"}),
+    ("/transaction/summary/monthly", {}),
+    ("/categories", {}),
+]
+
+
+async def run_load(base_url, headers, total, concurrency):
+    latencies, errors = [], 0
+    semaphore = asyncio.Semaphore(concurrency)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, headers=headers, limits=limits, timeout=60) as client:
+        async def one(i):
+            nonlocal errors
+            path, params = REQUESTS[i % len(REQUESTS)]
+            async with semaphore:
+                started = time.perf_counter()
+                response = await client.get(path, params=params)
+                latencies.append(time.perf_counter() - started)
+                errors += response.status_code != 200
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(total)))
+        elapsed = time.perf_counter() - started
+
+    return {**latency_summary(latencies, elapsed), "errors": errors}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", default=None)
+    parser.add_argument("--rows", type=int, default=20000, help="transactions to seed")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    args = parser.parse_args()
+
+    database_url = args.database_url or f"sqlite:///{tempfile.mkdtemp()}/bench.db"
+
+    results = {}
+    for mode in ("sync", "async"):
+        process, base_url = start_server({"DATABASE_URL": database_url, "DB_ASYNC": "true" if mode == "async" else "false"})
+        try:
+            headers = seed(base_url, args.rows)
+            asyncio.run(run_load(base_url, headers, min(200, args.requests), args.concurrency)) # warm-up
+            results[mode] = asyncio.run(run_load(base_url, headers, args.requests, args.concurrency))
+        finally:
+            stop_server(process)
+
+    print(f"{args.requests} requests, concurrency {args.concurrency}, {database_url}")
+    print(f"{'mode':<6} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for mode, r in results.items():
+        print(f"{mode:<6} {r['throughput_rps']:8.1f} {r['p50_ms']:8.1f} {r['p95_ms']:8.1f} {r['p99_ms']:8.1f} {r['errors']:7d}")
+    gain = results["async"]["throughput_rps"] / results["sync"]["throughput_rps"]
+    print(f"async/sync throughput: {gain:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
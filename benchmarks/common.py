@@ -0,0 +1,69 @@
+"""Helpers shared by the benchmark scripts: run the app under uvicorn, drive it, summarize latencies."""
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(env_overrides):
+    """Create the tables if needed, start `uvicorn app.main:app` with extra environment variables
+    and wait until /readyz answers; returns (process, base_url)."""
+    port = free_port()
+    env = {**os.environ, **env_overrides}
+    #the app doesn't create its schema on import: do it for the throwaway databases
+    subprocess.run([sys.executable, "create_tables.py"], cwd=ROOT, env=env, check=True, stdout=subprocess.DEVNULL)
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT, env=env,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    for _ in range(100):
+        try:
+            if httpx.get(base_url + "/readyz", timeout=1).status_code == 200:
+                return process, base_url
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.1)
+    process.kill()
+    raise RuntimeError("server did not start")
+
+
+def stop_server(process):
+    process.terminate()
+    process.wait()
+
+
+def login(client, username, password, email=None):
+    """Register (ignored if the user exists) and log in; returns the Authorization header."""
+    client.post("/auth/register", json={"username": username, "email": email or f"{username}@example.com", "password": password})
+    token = client.post("/auth/login", data={"username": username, "password": password}).json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+def latency_summary(latencies, elapsed):
+    """p50/p95/p99/mean in ms plus throughput for a list of per-request seconds."""
+    ordered = sorted(latencies)
+    if not ordered:
+        return {"count": 0}
+    pct = lambda p: ordered[min(len(ordered) - 1, int(len(ordered) * p))] * 1000
+    return {
+        "count": len(ordered),
+        "throughput_rps": len(ordered) / elapsed if elapsed else 0.0,
+        "p50_ms": pct(0.50),
+        "p95_ms": pct(0.95),
+        "p99_ms": pct(0.99),
+        "mean_ms": statistics.mean(ordered) * 1000,
+    }
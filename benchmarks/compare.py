@@ -0,0 +1,60 @@
+"""Compare two benchmark suite reports and flag regressions.
+
+    python benchmarks/compare.py benchmarks/results/main.json benchmarks/results/branch.json --threshold 0.10
+
+A request regressed when its p50, p95 or p99 grew, or its throughput dropped, by
+more than --threshold (relative) and the latency difference is above --min-ms
+(sub-millisecond jitter isn't a regression). Exit status 1 on any regression.
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+
+LATENCIES = ("p50_ms", "p95_ms", "p99_ms")
+
+
+def compare_reports(baseline, current, threshold, min_ms=0.5):
+    """One row per request present in both reports: the relative changes and whether it regressed."""
+    rows = []
+    for label, now in current["results"].items():
+        before = baseline["results"].get(label)
+        if not before or not before.get("count") or not now.get("count"):
+            continue
+        changes, regressed = {}, False
+        for key in LATENCIES:
+            changes[key] = now[key] / before[key] - 1 if before[key] else 0.0
+            regressed |= changes[key] > threshold and now[key] - before[key] > min_ms
+        before_rps = before["throughput_rps"]
+        changes["throughput_rps"] = now["throughput_rps"] / before_rps - 1 if before_rps else 0.0
+        regressed |= changes["throughput_rps"] < -threshold
+        rows.append({"label": label, "baseline": before, "current": now, "changes": changes, "regressed": regressed})
+    return rows
+
+
+def print_comparison(rows, threshold):
+    print(f"{'request':<24} {'p50 ms':>17} {'p95 ms':>17} {'p99 ms':>17} {'req/s':>8}  (threshold {threshold:.0%})")
+    for row in rows:
+        cells = [
+            f"{row['current'][key]:7.2f} ({row['changes'][key]:+6.1%})" for key in LATENCIES
+        ]
+        flag = "REGRESSED" if row["regressed"] else ""
+        print(f"{row['label']:<24} {' '.join(cells)} {row['changes']['throughput_rps']:+7.1%}  {flag}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("baseline", type=Path)
+    parser.add_argument("current", type=Path)
+    parser.add_argument("--threshold", type=float, default=0.10)
+    parser.add_argument("--min-ms", type=float, default=0.5)
+    args = parser.parse_args()
+
+    rows = compare_reports(json.loads(args.baseline.read_text()), json.loads(args.current.read_text()),
+                           args.threshold, args.min_ms)
+    print_comparison(rows, args.threshold)
+    sys.exit(1 if any(row["regressed"] for row in rows) else 0)
+
+
+if __name__ == "__main__":
+    main()
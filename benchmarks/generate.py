@@ -0,0 +1,125 @@
+"""Synthetic data for the benchmark suite: N users x M transactions across categories.
+
+    python benchmarks/generate.py --users 20 --transactions 10000
+    python benchmarks/generate.py --database-url postgresql://... --users 100 --transactions 50000
+
+Writes into DATABASE_URL (the app's database, dev.db by default) or --database-url.
+Users are named bench0, bench1, ... with the password `bench-password` (what
+benchmarks/suite.py logs in with); users that already exist are left alone, so
+running it again only adds the missing ones. Rollups are built for every new user.
+Same --seed, same data.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import date, timedelta
+
+from common import ROOT
+
+CATEGORIES = [
+    ("Salary", "income"), ("Freelance", "income"),
+    ("Rent", "expense"), ("Groceries", "expense"), ("Transport", "expense"),
+    ("Utilities", "expense"), ("Restaurants", "expense"), ("Shopping", "expense"),
+]
+MERCHANTS = {
+    "Salary": ["ACME payroll"], "Freelance": ["Client invoice", "Consulting"],
+    "Rent": ["Monthly rent"], "Groceries": ["Lidl", "Aldi", "Carrefour", "Farmers market"],
+    "Transport": ["Uber trip", "Metro card", "Shell fuel"], "Utilities": ["Electricity bill", "Water bill", "Internet"],
+    "Restaurants": ["Starbucks", "Pizza place", "Sushi bar"], "Shopping": ["Amazon", "IKEA", "Zara"],
+}
+USER_PREFIX = "bench"
+PASSWORD = "bench-password"
+CHUNK = 5000
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", default=None, help="defaults to DATABASE_URL / dev.db, like the app")
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--transactions", type=int, default=10000, help="per user")
+    parser.add_argument("--years", type=int, default=3, help="history length, ending today")
+    parser.add_argument("--uncategorized", type=float, default=0.05, help="share of transactions without a category")
+    parser.add_argument("--seed", type=int, default=42)
+    return parser.parse_args()
+
+
+def transaction_rows(rng, user_id, categories, count, years, uncategorized):
+    """count insert dicts for one user, oldest first."""
+    today = date.today()
+    first_day = today - timedelta(days=365 * years)
+    days = sorted(rng.randrange((today - first_day).days + 1) for _ in range(count))
+    for day in days:
+        if rng.random() < uncategorized:
+            category_id, name, kind = None, None, "expense"
+        else:
+            category_id, name, kind = rng.choice(categories)
+        amount = rng.uniform(500, 4000) if kind == "income" else rng.lognormvariate(3, 1)
+        description = f"{rng.choice(MERCHANTS[name])} {rng.randrange(10000)}" if name else None
+        yield {
+            "user_id": user_id,
+            "category_id": category_id,
+            "amount": round(min(amount, 99999), 2),
+            "date": first_day + timedelta(days=day),
+            "description": description,
+        }
+
+
+def generate(users, transactions, years, uncategorized, seed):
+    from sqlalchemy import insert
+    from app import rollups
+    import app.search #full-text index on fresh databases
+    from app.db import Base, SessionLocal, engine
+    from app.models import Category, Transaction, User
+    from app.security import hash_password
+
+    Base.metadata.create_all(bind=engine)
+    password_hash = hash_password(PASSWORD) #one bcrypt hash shared by every bench user
+    db = SessionLocal()
+    created = 0
+    try:
+        for i in range(users):
+            username = f"{USER_PREFIX}{i}"
+            if db.query(User.id).filter(User.username == username).first():
+                continue
+            rng = random.Random(f"{seed}-{i}")
+            started = time.perf_counter()
+
+            user = User(username=username, email=f"{username}@example.com", password_hash=password_hash)
+            db.add(user)
+            db.flush()
+            category_rows = [Category(name=name, type=kind, user_id=user.id) for name, kind in CATEGORIES]
+            db.add_all(category_rows)
+            db.flush()
+            categories = [(category.id, category.name, category.type) for category in category_rows]
+
+            chunk = []
+            for row in transaction_rows(rng, user.id, categories, transactions, years, uncategorized):
+                chunk.append(row)
+                if len(chunk) == CHUNK:
+                    db.execute(insert(Transaction), chunk)
+                    chunk = []
+            if chunk:
+                db.execute(insert(Transaction), chunk)
+            rollups.rebuild(db, user.id)
+            db.commit()
+            created += 1
+            print(f"{username}: {transactions} transactions in {time.perf_counter() - started:.1f}s")
+    finally:
+        db.close()
+    return created
+
+
+def main():
+    args = parse_args()
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url #before app.db is imported
+    sys.path.insert(0, str(ROOT))
+
+    created = generate(args.users, args.transactions, args.years, args.uncategorized, args.seed)
+    print(f"{created} new users, {args.users - created} already present")
+
+
+if __name__ == "__main__":
+    main()
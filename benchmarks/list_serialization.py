@@ -0,0 +1,116 @@
+"""GET /transaction: ORM objects + TransactionOut vs. column tuples + orjson.
+
+    python benchmarks/list_serialization.py
+
+Seeds a throwaway SQLite database, then requests pages of 20, 500 and 5000 rows
+in-process (TestClient, no network) from two routes: the current list route and
+a copy of the previous one that returned Transaction objects through
+response_model=list[TransactionOut].
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+from common import ROOT
+
+DB_FILE = os.path.join(tempfile.mkdtemp(), "list_serialization.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_FILE}" #before app.db is imported
+sys.path.insert(0, str(ROOT))
+
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+from app.db import Base, SessionLocal, engine
+from app.dependencies.auth import get_current_user
+from app.models import Category, Transaction, User
+from app.routes import transactions
+from app.schemas import TransactionOut
+
+PAGE_SIZES = (20, 500, 5000)
+
+
+def seed(rows):
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    user = User(username="bench", email="bench@example.com", password_hash="x")
+    db.add(user)
+    db.flush()
+    category = Category(name="bench", type="expense", user_id=user.id)
+    db.add(category)
+    db.flush()
+    start = date(2020, 1, 1)
+    db.execute(insert(Transaction), [
+        {
+            "user_id": user.id,
+            "amount": round(random.uniform(1, 500), 2),
+            "date": start + timedelta(days=i % 1500),
+            "description": f"transaction {i}",
+            "category_id": category.id if i % 4 else None,
+        }
+        for i in range(rows)
+    ])
+    db.commit()
+    db.refresh(user)
+    db.expunge(user)
+    db.close()
+    return user
+
+
+def build_app(user):
+    app = FastAPI()
+    app.include_router(transactions.router)
+
+    #the list route as it was: whole ORM objects, serialized through the response model
+    @app.get("/orm", response_model=list[TransactionOut])
+    def list_orm(page_size: int = 20, db: Session = Depends(transactions.get_db)):
+        return (
+            db.query(Transaction)
+            .filter(Transaction.user_id == user.id)
+            .order_by(Transaction.date.desc(), Transaction.id.desc())
+            .limit(page_size)
+            .all()
+        )
+
+    app.dependency_overrides[get_current_user] = lambda: user
+    return app
+
+
+def measure(client, path, page_size, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        response = client.get(path, params={"page_size": page_size})
+        timings.append(time.perf_counter() - started)
+        response.raise_for_status()
+    return response.json(), statistics.median(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=0, help="requests per page size (default: scaled to the page size)")
+    args = parser.parse_args()
+
+    user = seed(args.rows)
+    client = TestClient(build_app(user))
+
+    print(f"{'page_size':>9}  {'orm p50 ms':>10}  {'fast p50 ms':>11}  {'speedup':>7}")
+    for page_size in PAGE_SIZES:
+        repeat = args.repeat or max(10, 20000 // page_size)
+        measure(client, "/orm", page_size, 3) #warm up
+        measure(client, "/transaction", page_size, 3)
+        orm_body, orm_ms = measure(client, "/orm", page_size, repeat)
+        fast_body, fast_ms = measure(client, "/transaction", page_size, repeat)
+        if orm_body != fast_body:
+            sys.exit(f"page_size={page_size}: responses differ")
+        print(f"{page_size:>9}  {orm_ms:>10.2f}  {fast_ms:>11.2f}  {orm_ms / fast_ms:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
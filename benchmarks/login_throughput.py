@@ -0,0 +1,80 @@
+"""Login throughput vs bcrypt cost (BCRYPT_ROUNDS) and hashing pool size (PASSWORD_HASH_WORKERS).
+
+    pip install -r benchmarks/requirements.txt
+    python benchmarks/login_throughput.py --rounds 10 12 --workers 1 2 4
+
+For every combination the app is started under uvicorn and hit with a burst of
+concurrent logins while a second stream of GET /categories runs alongside. The
+second column shows whether a login burst still slows down everyone else.
+"""
+import argparse
+import asyncio
+import itertools
+import tempfile
+import time
+
+import httpx
+
+from common import latency_summary, login, start_server, stop_server
+
+
+async def burst(base_url, headers, logins, concurrency, reads):
+    login_latencies, read_latencies, failures = [], [], 0
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=120) as client:
+        async def one_login():
+            nonlocal failures
+            async with semaphore:
+                started = time.perf_counter()
+                response = await client.post("/auth/login", data={"username": "bench", "password": "bench-password"})
+                login_latencies.append(time.perf_counter() - started)
+                failures += response.status_code != 200
+
+        async def one_read():
+            started = time.perf_counter()
+            await client.get("/categories", headers=headers)
+            read_latencies.append(time.perf_counter() - started)
+
+        async def reader():
+            for _ in range(reads):
+                await one_read()
+
+        started = time.perf_counter()
+        await asyncio.gather(reader(), *(one_login() for _ in range(logins)))
+        elapsed = time.perf_counter() - started
+
+    return latency_summary(login_latencies, elapsed), latency_summary(read_latencies, elapsed), failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, nargs="+", default=[10, 12])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--logins", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--reads", type=int, default=100, help="GET /categories issued during the burst")
+    args = parser.parse_args()
+
+    print(f"{'rounds':>6} {'workers':>7} {'logins/s':>9} {'login p95 ms':>12} {'read p50 ms':>11} {'read p95 ms':>11}")
+    for rounds, workers in itertools.product(args.rounds, args.workers):
+        database_url = f"sqlite:///{tempfile.mkdtemp()}/bench.db"
+        process, base_url = start_server({
+            "DATABASE_URL": database_url,
+            "BCRYPT_ROUNDS": str(rounds),
+            "PASSWORD_HASH_WORKERS": str(workers),
+        })
+        try:
+            headers = login(httpx.Client(base_url=base_url, timeout=60), "bench", "bench-password")
+            logins, reads, failures = asyncio.run(burst(base_url, headers, args.logins, args.concurrency, args.reads))
+        finally:
+            stop_server(process)
+
+        print(
+            f"{rounds:>6} {workers:>7} {logins['throughput_rps']:>9.1f} {logins['p95_ms']:>12.1f} "
+            f"{reads['p50_ms']:>11.1f} {reads['p95_ms']:>11.1f}" + (f"  ({failures} failed)" if failures else "")
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""Full-text search latency on a large account.
+
+    python benchmarks/search.py --rows 300000
+
+Seeds two users with --rows transactions each (so the shared full-text index holds
+twice that) in a throwaway SQLite database created the way the app creates it,
+then times list_transactions(q=...) called directly (no HTTP) for a mix of
+searches, alone and combined with the other list filters.
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+from common import ROOT
+
+DB_FILE = os.path.join(tempfile.mkdtemp(), "search.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_FILE}" #before app.db is imported
+sys.path.insert(0, str(ROOT))
+
+from sqlalchemy import insert
+from app.db import Base, SessionLocal, engine
+from app.models import Category, Transaction, User
+from app.routes import transactions
+
+CHUNK = 50000
+MERCHANTS = ["Amazon", "Rent", "Lidl groceries", "Netflix", "Uber trip", "Shell fuel", "Starbucks", "Salary",
+             "Electricity bill", "Pharmacy"] + [f"Shop {i}" for i in range(200)]
+
+SEARCHES = [
+    ("one word", {"q": "netflix"}),
+    ("prefix", {"q": "amaz"}),
+    ("two words", {"q": "uber trip"}),
+    ("no match", {"q": "zzzz"}),
+    ("word + date range", {"q": "rent", "start_date": date(2019, 1, 1), "end_date": date(2020, 12, 31)}),
+    ("word + category", {"q": "starbucks", "category_id": "first"}),
+    ("word in every row", {"q": "payment"}),
+]
+
+
+def seed(rows):
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    users = []
+    for name in ("search", "other"):
+        user = User(username=name, email=f"{name}@example.com", password_hash="x")
+        db.add(user)
+        db.flush()
+        category_ids = []
+        for i in range(5):
+            category = Category(name=f"category {i}", type="expense", user_id=user.id)
+            db.add(category)
+            db.flush()
+            category_ids.append(category.id)
+
+        start = date(2015, 1, 1)
+        for offset in range(0, rows, CHUNK):
+            db.execute(insert(Transaction), [
+                {
+                    "user_id": user.id,
+                    "amount": round(random.uniform(1, 500), 2),
+                    "date": start + timedelta(days=random.randrange(3650)),
+                    "description": f"{random.choice(MERCHANTS)} payment {random.randrange(100000)}",
+                    "category_id": random.choice(category_ids),
+                }
+                for _ in range(offset, min(rows, offset + CHUNK))
+            ])
+        users.append((user, category_ids[0]))
+    db.commit()
+    for user, _ in users:
+        db.refresh(user)
+        db.expunge(user)
+    db.close()
+    return users[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=300000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    user, category_id = seed(args.rows)
+    print(f"seeded 2 x {args.rows} rows in {time.perf_counter() - started:.1f}s")
+
+    defaults = dict(start_date=None, end_date=None, category_id=None, type=None, page=1, page_size=20, cursor=None)
+    db = SessionLocal()
+    print(f"{'search':<20} {'rows':>5} {'p50 ms':>8} {'p95 ms':>8}")
+    for label, params in SEARCHES:
+        params = {**defaults, **params}
+        if params["category_id"] == "first":
+            params["category_id"] = category_id
+        timings = []
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            response = transactions.list_transactions(**params, db=db, current_user=user)
+            timings.append((time.perf_counter() - started) * 1000)
+        found = len(json.loads(response.body))
+        timings.sort()
+        p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+        print(f"{label:<20} {found:>5} {statistics.median(timings):>8.2f} {p95:>8.2f}")
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Two workers sharing the response cache through the in-process fake Redis server.
+
+    python benchmarks/shared_cache.py --database-url sqlite:////tmp/shared_cache.db
+
+Starts app.fake_redis plus two uvicorn processes with CACHE_BACKEND=redis, then
+writes through one worker and reads through the other to check that the write
+invalidates the other worker's cached summary. Also reports read latency for
+cache misses, first hits on the other worker (served from the shared backend)
+and repeat hits (served from the worker's local cache). Exits 1 on a stale read.
+"""
+import argparse
+import json
+import sys
+import time
+
+import httpx
+
+from common import ROOT, latency_summary, login, start_server, stop_server
+
+sys.path.insert(0, str(ROOT))
+from app.fake_redis import FakeRedisServer
+
+
+def timed_get(client, path, headers, params):
+    started = time.perf_counter()
+    response = client.get(path, headers=headers, params=params)
+    response.raise_for_status()
+    return time.perf_counter() - started, response
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", default="sqlite:////tmp/shared_cache.db")
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    fake = FakeRedisServer().start()
+    env = {"DATABASE_URL": args.database_url, "CACHE_BACKEND": "redis", "CACHE_URL": fake.url}
+    first, first_url = start_server(env)
+    second, second_url = start_server(env)
+    stale_reads = 0
+    latencies = {"miss": [], "shared_hit": [], "local_hit": []}
+    try:
+        with httpx.Client(base_url=first_url) as writer, httpx.Client(base_url=second_url) as reader:
+            headers = login(writer, "cache-bench", "cache-bench-password")
+            category = writer.post("/categories", json={"name": "bench", "type": "expense"}, headers=headers).json()
+
+            for i in range(args.requests):
+                params = {"start_date": f"2024-01-{i % 28 + 1:02d}"}
+                elapsed, _ = timed_get(writer, "/transaction/summary", headers, params)
+                latencies["miss"].append(elapsed)
+                elapsed, _ = timed_get(reader, "/transaction/summary", headers, params)
+                latencies["shared_hit"].append(elapsed)
+                elapsed, before = timed_get(reader, "/transaction/summary", headers, params)
+                latencies["local_hit"].append(elapsed)
+
+                writer.post("/transaction", headers=headers, json={
+                    "amount": "1.00", "date": "2024-02-01", "category_id": category["id"], "description": "bench",
+                }).raise_for_status()
+                _, after = timed_get(reader, "/transaction/summary", headers, params)
+                if after.json()["total_expense"] != before.json()["total_expense"] + 1:
+                    stale_reads += 1
+
+            stats = reader.get("/cache/stats").json()
+    finally:
+        stop_server(first)
+        stop_server(second)
+        fake.stop()
+
+    report = {name: latency_summary(values, sum(values)) for name, values in latencies.items()}
+    report["stale_reads"] = stale_reads
+    report["reader_cache_stats"] = stats
+    print(json.dumps(report, indent=2))
+    sys.exit(1 if stale_reads else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""Startup benchmark: `import app.main` time, time until /readyz, first requests after a cold start.
+
+    python benchmarks/startup.py --output benchmarks/results/startup-main.json
+    python benchmarks/startup.py --baseline benchmarks/results/startup-main.json --threshold 0.10
+
+Every run is a fresh interpreter, as for a new uvicorn worker:
+  startup.import            python -c "import app.main" (in-process timer around the import)
+  startup.ready             uvicorn started -> first 200 from /readyz
+  startup.ready_prewarm     same with STARTUP_PREWARM=true
+  first.list                first GET /transaction of the worker
+  first.analytics           first GET /analytics/summary of the worker (loads NumPy and the store)
+  first_prewarm.*           same with STARTUP_PREWARM=true
+The slowest imports of one run (python -X importtime) are printed as well. The
+report has the format of benchmarks/suite.py, so --baseline and compare.py work on it.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from pathlib import Path
+
+import httpx
+
+from common import ROOT, free_port, latency_summary, login
+from compare import compare_reports, print_comparison
+from suite import database_kind, git_commit
+
+IMPORT_SNIPPET = "import time; started = time.perf_counter(); import app.main; print(time.perf_counter() - started)"
+
+
+def time_import(env):
+    output = subprocess.run([sys.executable, "-c", IMPORT_SNIPPET], cwd=ROOT, env=env, check=True,
+                            capture_output=True, text=True).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+def slowest_imports(env, count):
+    """Top-level imports of app.main by cumulative time (python -X importtime)."""
+    stderr = subprocess.run([sys.executable, "-X", "importtime", "-c", "import app.main"], cwd=ROOT, env=env,
+                            check=True, capture_output=True, text=True).stderr
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        #nesting is shown by indentation: the direct children of app.main are indented by 2
+        if name.startswith("   ") and not name.startswith("    ") and cumulative.strip().isdigit():
+            rows.append((int(cumulative) / 1000, name.strip()))
+    return sorted(rows, reverse=True)[:count]
+
+
+def cold_start(env, headers_cache):
+    """Start uvicorn, wait for /readyz, time the first list and analytics requests; returns seconds."""
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT, env=env,
+    )
+    try:
+        with httpx.Client(base_url=base_url, timeout=60) as client:
+            while True:
+                try:
+                    if client.get("/readyz").status_code == 200:
+                        break
+                except httpx.HTTPError:
+                    pass
+                if process.poll() is not None or time.perf_counter() - started > 60:
+                    raise RuntimeError("server did not become ready")
+                time.sleep(0.005)
+            ready = time.perf_counter() - started
+
+            if "headers" not in headers_cache: #the token outlives the worker, log in once
+                headers_cache["headers"] = login(client, "startup-bench", "startup-bench-password")
+            headers = headers_cache["headers"]
+            timings = {}
+            for label, path in (("list", "/transaction"), ("analytics", "/analytics/summary")):
+                request_started = time.perf_counter()
+                client.get(path, headers=headers).raise_for_status()
+                timings[label] = time.perf_counter() - request_started
+            return ready, timings
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10, help="fresh interpreters per measurement")
+    parser.add_argument("--database-url", default=None, help="default: a throwaway SQLite file")
+    parser.add_argument("--top", type=int, default=15, help="slowest imports to print")
+    parser.add_argument("--output", type=Path, default=None,
+                        help="report path (default benchmarks/results/startup-<timestamp>.json)")
+    parser.add_argument("--baseline", type=Path, help="earlier report to compare with")
+    parser.add_argument("--threshold", type=float, default=0.10, help="allowed relative slowdown (0.10 = 10%%)")
+    args = parser.parse_args()
+
+    database_url = args.database_url or f"sqlite:///{tempfile.mkdtemp()}/startup.db"
+    #the tables are created once, outside the timings
+    env = {**os.environ, "DATABASE_URL": database_url, "BCRYPT_ROUNDS": "4", "RECURRING_SCHEDULER": "false"}
+    subprocess.run([sys.executable, "create_tables.py"], cwd=ROOT, env=env, check=True, stdout=subprocess.DEVNULL)
+
+    latencies = defaultdict(list)
+    headers_cache = {}
+    for run in range(args.runs):
+        latencies["startup.import"].append(time_import(env))
+        for suffix, prewarm in (("", "false"), ("_prewarm", "true")):
+            ready, first = cold_start({**env, "STARTUP_PREWARM": prewarm}, headers_cache)
+            latencies[f"startup.ready{suffix}"].append(ready)
+            for label, seconds in first.items():
+                latencies[f"first{suffix}.{label}"].append(seconds)
+        print(f"run {run + 1}/{args.runs}: done", file=sys.stderr)
+
+    results = {
+        label: {**latency_summary(values, sum(values)), "errors": 0}
+        for label, values in sorted(latencies.items())
+    }
+    report = {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "mode": "startup",
+            "database": database_kind(database_url),
+            "runs": args.runs,
+        },
+        "results": results,
+    }
+
+    output = args.output or ROOT / "benchmarks" / "results" / f"startup-{datetime.now():%Y%m%d-%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+
+    print(f"{'measurement':<24} {'p50 ms':>8} {'p95 ms':>8} {'mean ms':>8}")
+    for label, r in results.items():
+        print(f"{label:<24} {r['p50_ms']:>8.1f} {r['p95_ms']:>8.1f} {r['mean_ms']:>8.1f}")
+    print("\nslowest imports under app.main (one run, cumulative):")
+    for milliseconds, name in slowest_imports(env, args.top):
+        print(f"  {milliseconds:>8.1f} ms  {name}")
+    print(f"report: {output}")
+
+    if args.baseline:
+        rows = compare_reports(json.loads(args.baseline.read_text()), report, args.threshold)
+        print_comparison(rows, args.threshold)
+        sys.exit(1 if any(row["regressed"] for row in rows) else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,272 @@
+"""Benchmark suite: scripted API scenarios with latency percentiles, saved as JSON.
+
+    python benchmarks/generate.py --users 10 --transactions 10000
+    python benchmarks/suite.py --output benchmarks/results/main.json
+    python benchmarks/suite.py --baseline benchmarks/results/main.json --threshold 0.10
+
+Drives the app in-process (httpx ASGI transport, no network, the default) or
+through uvicorn (--server starts one on --database-url / DATABASE_URL, --url
+targets a running instance). Uses the bench users written by generate.py.
+
+Scenarios (--scenarios to pick some):
+  auth_only   GET /auth/me
+  login       POST /auth/login (bcrypt dominates: see BCRYPT_ROUNDS)
+  list        GET /transaction, random offset pages and 3-page cursor walks
+  summaries   /transaction/summary (random ranges), /monthly, /categories, /timeseries
+  crud        POST /transaction, PUT it, DELETE it
+Each request is reported under "<scenario>.<request>" with count, errors,
+throughput and p50/p95/p99/mean. With --baseline the run is compared to an
+earlier report (benchmarks/compare.py) and the exit status is 1 on a regression.
+Read scenarios vary their parameters, so most requests miss the response cache
+(except /summary/monthly, which has none); --no-response-cache takes it out completely.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+
+import httpx
+
+from common import ROOT, latency_summary, start_server, stop_server
+from compare import compare_reports, print_comparison
+from generate import PASSWORD, USER_PREFIX
+
+SCENARIOS = ("auth_only", "login", "list", "summaries", "crud")
+
+
+class Recorder:
+    """Per-request latencies and errors, keyed by "<scenario>.<request>"."""
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    async def request(self, client, label, method, url, expected=200, **kwargs):
+        started = time.perf_counter()
+        response = await client.request(method, url, **kwargs)
+        self.latencies[label].append(time.perf_counter() - started)
+        if response.status_code != expected:
+            self.errors[label] += 1
+        return response
+
+
+def random_range(rng):
+    end = date.today() - timedelta(days=rng.randrange(365))
+    return end - timedelta(days=rng.randrange(7, 730)), end
+
+
+# Scenarios
+# -------------------------
+# One iteration each; `user` holds the username and Authorization header.
+
+async def auth_only(client, recorder, user, rng):
+    await recorder.request(client, "auth_only.me", "GET", "/auth/me", headers=user["headers"])
+
+
+async def login(client, recorder, user, rng):
+    await recorder.request(client, "login.login", "POST", "/auth/login",
+                           data={"username": user["username"], "password": PASSWORD})
+
+
+async def list_pages(client, recorder, user, rng):
+    headers = user["headers"]
+    await recorder.request(client, "list.page", "GET", "/transaction", headers=headers,
+                           params={"page": rng.randrange(1, 50), "page_size": 50})
+    #walk 3 pages back from a random day
+    end_date = (date.today() - timedelta(days=rng.randrange(365))).isoformat()
+    cursor = None
+    for _ in range(3):
+        params = {"page_size": 50, "end_date": end_date, **({"cursor": cursor} if cursor else {})}
+        response = await recorder.request(client, "list.cursor", "GET", "/transaction", headers=headers, params=params)
+        cursor = response.headers.get("x-next-cursor")
+        if not cursor:
+            break
+
+
+async def summaries(client, recorder, user, rng):
+    headers = user["headers"]
+    start, end = random_range(rng)
+    params = {"start_date": start.isoformat(), "end_date": end.isoformat()}
+    await recorder.request(client, "summaries.summary", "GET", "/transaction/summary", headers=headers, params=params)
+    await recorder.request(client, "summaries.monthly", "GET", "/transaction/summary/monthly", headers=headers)
+    await recorder.request(client, "summaries.categories", "GET", "/transaction/summary/categories",
+                           headers=headers, params=params)
+    await recorder.request(client, "summaries.timeseries", "GET", "/transaction/summary/timeseries",
+                           headers=headers, params={**params, "bucket": "week"})
+
+
+async def crud(client, recorder, user, rng):
+    headers = user["headers"]
+    day = (date.today() - timedelta(days=rng.randrange(365))).isoformat()
+    response = await recorder.request(client, "crud.create", "POST", "/transaction", expected=201, headers=headers, json={
+        "amount": f"{rng.uniform(1, 200):.2f}", "date": day, "description": "benchmark", "category_id": None,
+    })
+    if response.status_code != 201:
+        return
+    transaction_id = response.json()["id"]
+    await recorder.request(client, "crud.update", "PUT", f"/transaction/{transaction_id}", headers=headers,
+                           json={"amount": f"{rng.uniform(1, 200):.2f}", "description": "benchmark (edited)"})
+    await recorder.request(client, "crud.delete", "DELETE", f"/transaction/{transaction_id}", expected=204, headers=headers)
+
+
+SCENARIO_FUNCTIONS = {
+    "auth_only": auth_only, "login": login, "list": list_pages, "summaries": summaries, "crud": crud,
+}
+
+
+# Runner
+# -------------------------
+async def log_in_users(client, count):
+    users = []
+    for i in range(count):
+        username = f"{USER_PREFIX}{i}"
+        response = await client.post("/auth/login", data={"username": username, "password": PASSWORD})
+        if response.status_code != 200:
+            break
+        users.append({"username": username, "headers": {"Authorization": f"Bearer {response.json()['access_token']}"}})
+    if not users:
+        sys.exit("no bench users: run benchmarks/generate.py against the same database first")
+    return users
+
+
+async def run_scenario(client, name, users, iterations, concurrency, seed):
+    recorder = Recorder()
+    scenario = SCENARIO_FUNCTIONS[name]
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i):
+        rng = random.Random(f"{seed}-{name}-{i}")
+        async with semaphore:
+            await scenario(client, recorder, rng.choice(users), rng)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(iterations)))
+    elapsed = time.perf_counter() - started
+    return {
+        label: {**latency_summary(latencies, elapsed), "errors": recorder.errors[label]}
+        for label, latencies in sorted(recorder.latencies.items())
+    }
+
+
+async def run_suite(client, args):
+    users = await log_in_users(client, args.users)
+    results = {}
+    for name in args.scenarios:
+        iterations = args.login_iterations if name == "login" else args.iterations
+        if args.warmup:
+            await run_scenario(client, name, users, args.warmup, args.concurrency, f"{args.seed}-warmup")
+        results.update(await run_scenario(client, name, users, iterations, args.concurrency, args.seed))
+        print(f"{name}: done", file=sys.stderr)
+    return results, len(users)
+
+
+def in_process_client(timeout):
+    sys.path.insert(0, str(ROOT))
+    from app.main import app
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=timeout)
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def database_kind(url):
+    return url.split(":", 1)[0] if url else "sqlite (dev.db)" #no credentials in the report
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--server", action="store_true", help="start uvicorn and benchmark over HTTP")
+    target.add_argument("--url", help="benchmark an already running instance")
+    parser.add_argument("--database-url", default=None, help="for in-process and --server (default: DATABASE_URL)")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--users", type=int, default=10, help="bench users to spread requests over")
+    parser.add_argument("--iterations", type=int, default=500, help="iterations per scenario")
+    parser.add_argument("--login-iterations", type=int, default=50)
+    parser.add_argument("--warmup", type=int, default=20, help="unrecorded iterations before each scenario")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--no-response-cache", action="store_true", help="HTTP_CACHE_TTL_SECONDS=0 (in-process/--server)")
+    parser.add_argument("--output", type=Path, default=None,
+                        help="report path (default benchmarks/results/<timestamp>.json)")
+    parser.add_argument("--baseline", type=Path, help="earlier report to compare with")
+    parser.add_argument("--threshold", type=float, default=0.10, help="allowed relative slowdown (0.10 = 10%%)")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    env = {}
+    if args.database_url:
+        env["DATABASE_URL"] = args.database_url
+    if args.no_response_cache:
+        env["HTTP_CACHE_TTL_SECONDS"] = "0"
+
+    if args.url:
+        mode, client, process = "url", httpx.AsyncClient(base_url=args.url, timeout=60), None
+    elif args.server:
+        process, base_url = start_server(env)
+        mode, client = "uvicorn", httpx.AsyncClient(base_url=base_url, timeout=60)
+    else:
+        os.environ.update(env) #before app.db is imported
+        mode, client, process = "in-process", in_process_client(60), None
+
+    async def run():
+        async with client:
+            return await run_suite(client, args)
+
+    try:
+        results, user_count = asyncio.run(run())
+    finally:
+        if process:
+            stop_server(process)
+
+    report = {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "mode": mode,
+            "database": "remote" if args.url else database_kind(args.database_url or os.getenv("DATABASE_URL")),
+            "users": user_count,
+            "iterations": args.iterations,
+            "concurrency": args.concurrency,
+            "response_cache": not args.no_response_cache,
+        },
+        "results": results,
+    }
+
+    output = args.output or ROOT / "benchmarks" / "results" / f"{datetime.now():%Y%m%d-%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+
+    print(f"{'request':<24} {'count':>6} {'err':>4} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for label, r in results.items():
+        print(f"{label:<24} {r['count']:>6} {r['errors']:>4} {r['throughput_rps']:>8.1f} "
+              f"{r['p50_ms']:>8.2f} {r['p95_ms']:>8.2f} {r['p99_ms']:>8.2f}")
+    print(f"report: {output}")
+
+    failed = any(r["errors"] for r in results.values())
+    if args.baseline:
+        rows = compare_reports(json.loads(args.baseline.read_text()), report, args.threshold)
+        print_comparison(rows, args.threshold)
+        failed = failed or any(row["regressed"] for row in rows)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
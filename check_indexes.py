@@ -0,0 +1,115 @@
+"""Run each transaction route's queries (and the recurring scheduler's scan) through EXPLAIN and fail on full table scans.
+
+    python check_indexes.py
+
+Uses DATABASE_URL like the app. Run it after `alembic upgrade head` so the
+indexes from the migrations are present.
+"""
+import sys
+from datetime import date
+from sqlalchemy import event, text
+from app.db import engine, SessionLocal
+from app.models import User, Category
+from app import recurring
+from app.routes import transactions
+
+WATCHED_TABLES = ("transactions", "transactions_archive", "categories", "monthly_rollups", "recurring_rules")
+
+
+def route_calls(user, category_id):
+    # (label, callable) pairs covering the query shapes each route can produce
+    list_defaults = dict(start_date=None, end_date=None, category_id=None, type=None, page=1, page_size=20, cursor=None)
+    return [
+        ("list_transactions", lambda db: transactions.list_transactions(**list_defaults, db=db, current_user=user)),
+        ("list_transactions (date range)", lambda db: transactions.list_transactions(
+            **{**list_defaults, "start_date": date(2024, 1, 1), "end_date": date(2024, 12, 31)}, db=db, current_user=user)),
+        ("list_transactions (category)", lambda db: transactions.list_transactions(
+            **{**list_defaults, "category_id": category_id}, db=db, current_user=user)),
+        ("list_transactions (cursor)", lambda db: transactions.list_transactions(
+            **{**list_defaults, "cursor": transactions.encode_cursor(date(2024, 6, 1), 1000)}, db=db, current_user=user)),
+        ("list_transactions (type)", lambda db: transactions.list_transactions(
+            **{**list_defaults, "type": "expense"}, db=db, current_user=user)),
+        ("list_transactions (search)", lambda db: transactions.list_transactions(
+            **list_defaults, q="amaz", db=db, current_user=user)),
+        ("list_transactions (search + date range)", lambda db: transactions.list_transactions(
+            **{**list_defaults, "start_date": date(2024, 1, 1), "end_date": date(2024, 6, 30)}, q="rent", db=db, current_user=user)),
+        ("transaction_summary", lambda db: transactions.transaction_summary(
+            start_date=date(2024, 1, 10), end_date=date(2024, 12, 20), group_by=None, db=db, current_user=user)),
+        ("transaction_summary (by week)", lambda db: transactions.transaction_summary(
+            start_date=date(2024, 1, 10), end_date=date(2024, 12, 20), group_by="week", db=db, current_user=user)),
+        ("category_breakdown", lambda db: transactions.category_breakdown(
+            start_date=date(2024, 1, 10), end_date=date(2024, 12, 20), type="expense", db=db, current_user=user)),
+        ("monthly_transaction_summary", lambda db: transactions.monthly_transaction_summary(db=db, current_user=user)),
+        ("timeseries_summary", lambda db: transactions.timeseries_summary(
+            start_date=date(2024, 1, 10), end_date=date(2024, 12, 20), bucket="week", category_id=None, window=7,
+            db=db, current_user=user)),
+        ("timeseries_summary (category)", lambda db: transactions.timeseries_summary(
+            start_date=None, end_date=None, bucket="day", category_id=category_id, window=7, db=db, current_user=user)),
+        ("recurring scheduler (due rules)", lambda db: recurring.due_rules(db, date(2024, 6, 1), recurring.RECURRING_BATCH_SIZE)),
+    ]
+
+
+def capture_statements(fn, db):
+    captured = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            captured.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        fn(db)
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+    return captured
+
+
+def explain(db, statement, parameters):
+    raw = db.connection().connection.cursor()
+    if engine.dialect.name == "sqlite":
+        raw.execute("EXPLAIN QUERY PLAN " + statement, parameters)
+        plan = [row[-1] for row in raw.fetchall()]
+        full_scans = [
+            line for line in plan
+            if line.startswith("SCAN ") and line.split()[1] in WATCHED_TABLES
+            and "COVERING INDEX" not in line
+        ]
+    else:
+        raw.execute("EXPLAIN " + statement, parameters)
+        plan = [row[0] for row in raw.fetchall()]
+        full_scans = [line for line in plan if "Seq Scan" in line and any(t in line for t in WATCHED_TABLES)]
+    return plan, full_scans
+
+
+def check():
+    db = SessionLocal()
+    try:
+        if engine.dialect.name != "sqlite":
+            # tiny test tables make seq scans "cheaper"; we only care whether an index CAN be used
+            db.execute(text("SET enable_seqscan = off"))
+
+        user = db.query(User).first() or User(id=0)
+        category = db.query(Category).filter(Category.user_id == user.id).first()
+        category_id = category.id if category else 0
+
+        failures = 0
+        for label, call in route_calls(user, category_id):
+            for statement, parameters in capture_statements(call, db):
+                plan, full_scans = explain(db, statement, parameters)
+                status = "FULL SCAN" if full_scans else "ok"
+                print(f"[{status}] {label}")
+                for line in plan:
+                    print(f"    {line}")
+                failures += bool(full_scans)
+    finally:
+        db.close()
+
+    return failures
+
+
+if __name__ == "__main__":
+    failures = check()
+    if failures:
+        print(f"{failures} queries fall back to a full table scan.")
+        sys.exit(1)
+    print("All route queries use an index.")
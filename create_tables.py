@@ -1,10 +1,40 @@
+from pathlib import Path
+from sqlalchemy import inspect
 from app.db import engine, Base
 import app.models #registers model metadata with Base
+import app.search #adds the full-text index (FTS5 table + triggers / GIN index) to new transaction tables
+
+ROOT = Path(__file__).resolve().parent
+
+def stamp(revision: str):
+    from alembic import command
+    from alembic.config import Config
+
+    config = Config(str(ROOT / "alembic.ini"))
+    config.set_main_option("script_location", str(ROOT / "alembic"))
+    command.stamp(config, revision)
+
+def current_revision():
+    from alembic.runtime.migration import MigrationContext
+
+    with engine.connect() as connection:
+        return MigrationContext.configure(connection).get_current_revision()
 
 def create_all():
     print("Creating database tables...")
-    Base.metadata.create_all(bind=engine)
-    print("Done. Tables created (if they didn't exist).")
+    if not inspect(engine).get_table_names():
+        Base.metadata.create_all(bind=engine)
+        #an empty database now matches the newest migration: stamp it so `alembic upgrade head` continues from there
+        stamp("head")
+        print("Done. Tables created.")
+    elif current_revision() is None:
+        #created by create_all before migrations existed (e.g. dev.db): that is the 0001 schema,
+        #so `alembic upgrade head` starts after it instead of creating the tables again
+        stamp("0001")
+        print("Existing database stamped with 0001, run `alembic upgrade head` to update it.")
+    else:
+        #tables come from the migrations from here on, create_all would add new ones ahead of them
+        print("Existing database, run `alembic upgrade head` to update it.")
 
 if __name__ == "__main__":
-    create_all()
\ No newline at end of file
+    create_all()
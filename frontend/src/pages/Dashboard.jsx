@@ -10,6 +10,7 @@ function Dashboard() {
   const [categories, setCategories] = useState([]);
   const [transactions, setTransactions] = useState([]);
   const [summary, setSummary] = useState({ total_income: 0, total_expense: 0, balance: 0 });
+  const [spending, setSpending] = useState([]);
   const [error, setError] = useState("");
 
   const [newCategoryName, setNewCategoryName] = useState("");
@@ -22,17 +23,19 @@ function Dashboard() {
   useEffect(() => {
     const fetchData = async () => {
       try {
-        const [userRes, categoriesRes, transactionsRes, summaryRes] = await Promise.all([
+        const [userRes, categoriesRes, transactionsRes, summaryRes, spendingRes] = await Promise.all([
           api.get("/auth/me"),
           api.get("/categories"),
           api.get("/transaction", { params: { page: 1, page_size: 10 } }),
           api.get("/transaction/summary"),
+          api.get("/transaction/summary/categories", { params: { type: "expense" } }),
         ]);
 
         setUser(userRes.data);
         setCategories(categoriesRes.data || []);
         setTransactions(transactionsRes.data || []);
         setSummary(summaryRes.data || summary);
+        setSpending(spendingRes.data || []);
       } catch (err) {
         console.error("Failed to load dashboard data:", err);
         setError("Unable to load dashboard. Please sign in again.");
@@ -44,15 +47,17 @@ function Dashboard() {
 
   const refreshData = async () => {
     try {
-      const [categoriesRes, transactionsRes, summaryRes] = await Promise.all([
+      const [categoriesRes, transactionsRes, summaryRes, spendingRes] = await Promise.all([
         api.get("/categories"),
         api.get("/transaction", { params: { page: 1, page_size: 10 } }),
         api.get("/transaction/summary"),
+        api.get("/transaction/summary/categories", { params: { type: "expense" } }),
       ]);
 
       setCategories(categoriesRes.data || []);
       setTransactions(transactionsRes.data || []);
       setSummary(summaryRes.data || summary);
+      setSpending(spendingRes.data || []);
     } catch (err) {
       console.error("Failed to refresh dashboard data:", err);
     }
@@ -184,6 +189,20 @@ function Dashboard() {
               ))}
             </ul>
           )}
+
+          <h2 className="panel-title">Spending by category</h2>
+          {spending.length === 0 ? (
+            <p>No expenses yet.</p>
+          ) : (
+            <ul className="card-list">
+              {spending.map((line) => (
+                <li key={line.category_id ?? "uncategorized"}>
+                  <span>{line.category}</span>
+                  <span>${Number(line.total).toFixed(2)}</span>
+                </li>
+              ))}
+            </ul>
+          )}
         </section>
 
         <section className="dashboard-panel">
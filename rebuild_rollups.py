@@ -0,0 +1,42 @@
+"""Recompute the monthly rollup table from raw transactions, or just report drift.
+
+    python rebuild_rollups.py            # rebuild every user's rollups
+    python rebuild_rollups.py --user 7   # rebuild one user
+    python rebuild_rollups.py --verify   # compare only, exit 1 on drift
+"""
+import argparse
+import sys
+from app.db import SessionLocal
+from app import rollups
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild or verify monthly rollups.")
+    parser.add_argument("--user", type=int, default=None, help="only this user id")
+    parser.add_argument("--verify", action="store_true", help="report drift without changing anything")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        if args.verify:
+            drift = rollups.verify(db, args.user)
+            for row in drift:
+                print(
+                    f"user={row['user_id']} {row['year']}-{row['month']:02d} category={row['category_id']}: "
+                    f"stored {row['stored_total']} ({row['stored_count']} rows), "
+                    f"expected {row['expected_total']} ({row['expected_count']} rows)"
+                )
+            print(f"{len(drift)} rollup rows drifted." if drift else "Rollups match raw transactions.")
+            return 1 if drift else 0
+
+        print("Rebuilding monthly rollups...")
+        count = rollups.rebuild(db, args.user)
+        db.commit()
+        print(f"Done. {count} rollup rows written.")
+        return 0
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,82 @@
+import itertools
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+# Test setup
+# -------------------------
+# app.db reads its settings at import time, so the environment points at a throwaway
+# SQLite file before anything from app is imported. One database serves the whole
+# session; every test registers its own user, so tests don't see each other's rows.
+
+DB_DIR = tempfile.mkdtemp(prefix="finance-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_DIR}/test.db"
+os.environ["BCRYPT_ROUNDS"] = "4" #the minimum, hashing dominates otherwise
+os.environ["RECURRING_SCHEDULER"] = "false" #tests run passes explicitly
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fastapi.testclient import TestClient
+
+from create_tables import create_all
+
+create_all()
+
+from app.main import app
+
+_user_numbers = itertools.count(1)
+
+
+@pytest.fixture
+def client():
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+def register(client, username=None, password="secret1"):
+    """Register and log in a fresh user; returns (user id, auth headers)."""
+    username = username or f"user{next(_user_numbers)}"
+    response = client.post("/auth/register", json={"username": username, "email": f"{username}@example.com", "password": password})
+    assert response.status_code == 201, response.text
+    token = client.post("/auth/login", data={"username": username, "password": password}).json()["access_token"]
+    return response.json()["id"], {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+def user(client):
+    return register(client)
+
+
+@pytest.fixture
+def headers(user):
+    return user[1]
+
+
+def create_category(client, headers, name="Food", type="expense"):
+    response = client.post("/categories", json={"name": name, "type": type}, headers=headers)
+    assert response.status_code == 201, response.text
+    return response.json()["id"]
+
+
+def create_transaction(client, headers, amount, day, description=None, category_id=None):
+    response = client.post(
+        "/transaction",
+        json={"amount": str(amount), "date": str(day), "description": description, "category_id": category_id},
+        headers=headers,
+    )
+    assert response.status_code == 201, response.text
+    return response.json()
+
+
+def create_ledger(client, headers):
+    """A small history over three months; returns the category ids by name."""
+    categories = {name: create_category(client, headers, name, type) for name, type in
+                  (("Salary", "income"), ("Food", "expense"), ("Rent", "expense"))}
+    for amount, day, name in (
+        ("1000", "2024-01-05", "Salary"), ("50", "2024-01-10", "Food"), ("500", "2024-01-31", "Rent"),
+        ("25.50", "2024-02-03", "Food"), ("10", "2024-02-15", None), ("1000", "2024-03-01", "Salary"),
+    ):
+        create_transaction(client, headers, amount, day, description=name, category_id=categories.get(name))
+    return categories
@@ -0,0 +1,33 @@
+import pytest
+
+from conftest import create_ledger, create_transaction
+
+RANGES = [{}, {"start_date": "2024-01-10"}, {"end_date": "2024-01-31"}, {"start_date": "2024-01-06", "end_date": "2024-02-14"}]
+
+
+@pytest.mark.parametrize("params", RANGES)
+def test_same_numbers_as_the_sql_summaries(client, headers, params):
+    create_ledger(client, headers)
+    pairs = [("/analytics/summary", "/transaction/summary"), ("/analytics/breakdown", "/transaction/summary/categories")]
+    for fast, sql in pairs:
+        assert client.get(fast, params=params, headers=headers).json() == client.get(sql, params=params, headers=headers).json()
+
+
+def test_a_write_reloads_the_history(client, headers):
+    create_ledger(client, headers)
+    assert client.get("/analytics/summary", headers=headers).json()["total_income"] == 2000.0
+    create_transaction(client, headers, "5", "2024-04-01")
+    assert len(client.get("/analytics/monthly", headers=headers).json()) == 4
+
+
+def test_percentiles_and_budget(client, headers):
+    categories = create_ledger(client, headers)
+    food = next(row for row in client.get("/analytics/percentiles", params={"q": [50]}, headers=headers).json()
+                if row["category"] == "Food")
+    assert food == {"category": "Food", "category_id": categories["Food"], "count": 2, "percentiles": {"p50": 37.75}}
+
+    response = client.post("/analytics/budget", headers=headers, json={
+        "start_date": "2024-01-01", "end_date": "2024-02-29", "budgets": {str(categories["Food"]): "40"},
+    })
+    assert [(line["month"], line["actual"], line["remaining"]) for line in response.json()] == [(1, 50.0, -10.0), (2, 25.5, 14.5)]
+    assert client.post("/analytics/budget", headers=headers, json={"budgets": {"999999": "1"}}).status_code == 400
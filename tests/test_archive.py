@@ -0,0 +1,48 @@
+from datetime import date
+
+from app import archive, search
+from app.http_cache import data_version
+from conftest import create_category, create_transaction
+
+
+def test_archived_rows_read_through(client, user):
+    user_id, headers = user
+    category_id = create_category(client, headers)
+    old = create_transaction(client, headers, 10, date(2020, 5, 1), "old invoice", category_id)
+    new = create_transaction(client, headers, 20, date(2024, 5, 1), "new invoice", category_id)
+    listed = client.get("/transaction", headers=headers).json()
+    summary = client.get("/transaction/summary", headers=headers).json()
+    version = data_version(user_id)
+
+    assert archive.archive_all(date(2021, 1, 1), user_id) == 1
+    assert data_version(user_id) != version #cached responses are invalidated
+
+    assert client.get("/transaction", headers=headers).json() == listed
+    assert client.get("/transaction/summary", headers=headers).json() == summary
+    assert [tx["id"] for tx in client.get("/transaction", params={"q": "invoice"}, headers=headers).json()] == [new["id"], old["id"]]
+    assert [tx["id"] for tx in client.get("/transaction", params={"q": "old"}, headers=headers).json()] == [old["id"]]
+    #read-only through the API
+    assert client.put(f"/transaction/{old['id']}", json={"amount": "1"}, headers=headers).status_code == 404
+    assert client.delete(f"/transaction/{old['id']}", headers=headers).status_code == 404
+
+
+def test_archived_rows_leave_search_with_their_category(client, user):
+    user_id, headers = user
+    category_id = create_category(client, headers)
+    create_transaction(client, headers, 10, date(2020, 5, 1), "gym membership", category_id)
+    archive.archive_all(date(2021, 1, 1), user_id)
+    assert client.delete(f"/categories/{category_id}", headers=headers).status_code == 204
+    assert client.get("/transaction", params={"q": "gym"}, headers=headers).json() == []
+
+
+def test_search_pages_through_hot_and_archived_matches(client, user, monkeypatch):
+    monkeypatch.setattr(search, "SEARCH_RANK_WINDOW", 3)
+    user_id, headers = user
+    ids = {create_transaction(client, headers, 1, date(2020 + i % 2 * 4, 1, 1 + i), f"parking {i}")["id"] for i in range(8)}
+    archive.archive_all(date(2021, 1, 1), user_id)
+
+    found = []
+    for page in range(1, 5):
+        found += [tx["id"] for tx in client.get("/transaction", params={"q": "parking", "page": page, "page_size": 3}, headers=headers).json()]
+    assert sorted(found) == sorted(ids)
+    assert found[3:] == sorted(ids, reverse=True)[3:]
@@ -0,0 +1,31 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from app.db import DB_ASYNC
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# DB_ASYNC is read when app.main is imported: the async routes get the same behaviour
+# tests as the sync ones in a second pytest process.
+ASYNC_COVERED = ["tests/test_pagination.py", "tests/test_batch.py", "tests/test_summary.py",
+                 "tests/test_timeseries.py", "tests/test_breakdown.py", "tests/test_deletes.py"]
+
+
+@pytest.mark.skipif(DB_ASYNC, reason="already running with DB_ASYNC=true")
+def test_async_routes_pass_the_route_tests():
+    pytest.importorskip("aiosqlite")
+    result = subprocess.run([sys.executable, "-m", "pytest", "-q", "-p", "no:cacheprovider", *ASYNC_COVERED],
+                            cwd=ROOT, env={**os.environ, "DB_ASYNC": "true"}, capture_output=True, text=True, timeout=300)
+    assert result.returncode == 0, result.stdout[-3000:]
+
+
+def test_async_routes_are_registered_in_async_mode(client):
+    from app.main import app
+
+    #the first route matching a path serves it
+    serving = next(route.endpoint for route in app.routes if route.path == "/transaction" and "GET" in route.methods)
+    assert (serving.__module__ == "app.routes.async_transactions") == DB_ASYNC
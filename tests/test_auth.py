@@ -0,0 +1,31 @@
+from app.db import SessionLocal
+from app.dependencies.auth import user_cache
+from app.http_cache import bump_data_version
+from app.models import User
+
+from conftest import register
+
+
+def delete_behind_the_cache(user_id):
+    #a bulk delete skips the mapper events, like a delete handled by another worker
+    with SessionLocal() as db:
+        db.query(User).filter(User.id == user_id).delete(synchronize_session=False)
+        db.commit()
+
+
+def test_cached_user_is_dropped_when_the_data_version_moves(client):
+    user_id, headers = register(client)
+    assert client.get("/auth/me", headers=headers).status_code == 200
+    assert user_cache.get(user_id) is not None
+
+    delete_behind_the_cache(user_id)
+    assert client.get("/auth/me", headers=headers).status_code == 200 #still served from the cache
+
+    bump_data_version(user_id)
+    assert client.get("/auth/me", headers=headers).status_code == 401
+
+
+def test_deleted_account_token_is_rejected(client):
+    _, headers = register(client)
+    assert client.delete("/auth/me", headers=headers).status_code == 204
+    assert client.get("/auth/me", headers=headers).status_code == 401
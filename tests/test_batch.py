@@ -0,0 +1,39 @@
+from datetime import date
+
+from app.schemas import BATCH_MAX_OPERATIONS
+
+from conftest import create_category, create_transaction
+
+
+def test_batch_applies_valid_operations_and_reports_the_rest(client, headers):
+    category_id = create_category(client, headers)
+    updated = create_transaction(client, headers, "10", date(2024, 1, 1), "Old")
+    deleted = create_transaction(client, headers, "20", date(2024, 1, 2))
+
+    response = client.post("/transaction/batch", headers=headers, json={"operations": [
+        {"op": "create", "amount": "5", "date": "2024-02-01", "description": "New", "category_id": category_id},
+        {"op": "update", "id": updated["id"], "date": "2024-03-01", "description": "Edited"},
+        {"op": "delete", "id": deleted["id"]},
+        {"op": "delete", "id": deleted["id"]},
+        {"op": "create", "amount": "1", "date": "2024-02-02", "category_id": 10**9},
+    ]})
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert (body["applied"], body["failed"]) == (3, 2)
+    assert [result["status"] for result in body["results"]] == ["created", "updated", "deleted", "error", "error"]
+    assert body["results"][1]["transaction"]["date"] == "2024-03-01"
+
+    rows = client.get("/transaction", headers=headers).json()
+    assert sorted((row["date"], row["description"]) for row in rows) == [("2024-02-01", "New"), ("2024-03-01", "Edited")]
+
+
+def test_put_changes_the_date(client, headers):
+    transaction = create_transaction(client, headers, "10", date(2024, 1, 1))
+    response = client.put(f"/transaction/{transaction['id']}", json={"date": "2024-05-06"}, headers=headers)
+    assert response.status_code == 200, response.text
+    assert response.json()["date"] == "2024-05-06"
+
+
+def test_oversized_batch_is_rejected(client, headers):
+    operations = [{"op": "delete", "id": 1}] * (BATCH_MAX_OPERATIONS + 1)
+    assert client.post("/transaction/batch", headers=headers, json={"operations": operations}).status_code == 422
@@ -0,0 +1,33 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+BENCHMARKS = ROOT / "benchmarks"
+
+
+def run(script, *args):
+    #the scripts set up their own database and environment, like from the command line
+    result = subprocess.run([sys.executable, str(BENCHMARKS / script), *args], cwd=ROOT,
+                            capture_output=True, text=True, timeout=300)
+    assert result.returncode == 0, result.stdout + result.stderr
+    return result.stdout
+
+
+def test_suite_runs_every_scenario_once(tmp_path):
+    database_url = f"sqlite:///{tmp_path}/bench.db"
+    run("generate.py", "--database-url", database_url, "--users", "1", "--transactions", "200")
+    output = tmp_path / "report.json"
+    run("suite.py", "--database-url", database_url, "--users", "1", "--iterations", "1", "--login-iterations", "1",
+        "--warmup", "0", "--concurrency", "1", "--output", str(output))
+
+    results = json.loads(output.read_text())["results"]
+    assert {label.split(".")[0] for label in results} == {"auth_only", "login", "list", "summaries", "crud"}
+    assert all(result["errors"] == 0 for result in results.values())
+
+
+def test_shared_cache_invalidates_the_other_worker(tmp_path):
+    report = json.loads(run("shared_cache.py", "--database-url", f"sqlite:///{tmp_path}/shared.db", "--requests", "2"))
+    assert report["stale_reads"] == 0
+    assert report["reader_cache_stats"]["remote"]["hits"] == 2
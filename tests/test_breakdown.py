@@ -0,0 +1,22 @@
+from conftest import create_ledger
+
+
+def breakdown(client, headers, **params):
+    response = client.get("/transaction/summary/categories", params=params, headers=headers)
+    assert response.status_code == 200, response.text
+    return [(row["category"], row["total"]) for row in response.json()]
+
+
+def test_totals_per_category_largest_first(client, headers):
+    create_ledger(client, headers)
+    assert breakdown(client, headers) == [("Salary", 2000.0), ("Rent", 500.0), ("Food", 75.5), ("Uncategorized", 10.0)]
+
+
+def test_type_and_date_filters(client, headers):
+    create_ledger(client, headers)
+    assert breakdown(client, headers, type="expense") == [("Rent", 500.0), ("Food", 75.5)]
+    assert breakdown(client, headers, type="expense", start_date="2024-01-10", end_date="2024-02-10") == [
+        ("Rent", 500.0), ("Food", 75.5),
+    ]
+    assert breakdown(client, headers, start_date="2024-02-01") == [("Salary", 1000.0), ("Food", 25.5), ("Uncategorized", 10.0)]
+    assert client.get("/transaction/summary/categories", params={"type": "other"}, headers=headers).status_code == 400
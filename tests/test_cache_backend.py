@@ -0,0 +1,59 @@
+import time
+
+import pytest
+
+from app.cache import RedisCache
+from app.fake_redis import FakeRedisServer
+
+
+@pytest.fixture
+def server():
+    fake = FakeRedisServer().start()
+    yield fake
+    fake.stop()
+
+
+def make_worker(server, **options):
+    #each worker process builds its own cache against the same server
+    return RedisCache(server.url, retry_interval=0.05, **options)
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_entries_are_shared_between_workers(server):
+    one, two = make_worker(server), make_worker(server)
+    one.set("key", b"body")
+    assert two.get_local("key") is None
+    assert two.get_remote("key") == b"body"
+    assert two.get_local("key") == b"body" #kept in front for the next lookup
+    assert two.stats()["remote"]["hits"] == 1
+
+
+def test_a_bump_in_one_worker_moves_the_version_in_the_other(server):
+    one, two = make_worker(server), make_worker(server)
+    two.warm()
+    wait_for(lambda: two.stats()["remote"]["subscribed"])
+    before = two.version(7)
+
+    one.bump(7)
+    wait_for(lambda: two.known_version(7) not in (None, before)) #pushed over the channel
+    assert two.version(7) == one.version(7)
+    one.close()
+    two.close()
+
+
+def test_falls_back_to_the_local_cache_when_the_server_goes_away(server):
+    worker = make_worker(server)
+    before = worker.version(7)
+    server.stop()
+
+    worker.set("key", b"body") #no exception
+    assert worker.get_local("key") == b"body"
+    worker.bump(7)
+    assert worker.version(7) != before #own writes are still seen
+    assert worker.stats()["remote"]["pending_invalidations"] == 1
@@ -0,0 +1,34 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.exc import TimeoutError as PoolTimeout
+
+from app import db as app_db
+from app.db import SQLITE_BUSY_TIMEOUT_MS, TimedQueuePool, engine, pool_stats
+
+
+def pragma(name):
+    with engine.connect() as connection:
+        return connection.exec_driver_sql(f"PRAGMA {name}").scalar()
+
+
+def test_sqlite_connections_are_tuned():
+    assert pragma("journal_mode") == "wal"
+    assert pragma("synchronous") == 1 #NORMAL
+    assert pragma("busy_timeout") == SQLITE_BUSY_TIMEOUT_MS
+    assert pragma("foreign_keys") == 1
+
+
+def test_pool_stats_endpoint(client):
+    stats = client.get("/db/pool-stats").json()
+    assert stats["pool_size"] == app_db.POOL_SIZE
+    assert stats["checkouts"] > 0
+
+
+def test_exhausted_pool_times_out_and_is_counted(tmp_path):
+    small = create_engine(f"sqlite:///{tmp_path}/pool.db", poolclass=TimedQueuePool, pool_size=1, max_overflow=0, pool_timeout=0.05)
+    timeouts = pool_stats.timeouts
+    with small.connect():
+        with pytest.raises(PoolTimeout):
+            small.connect()
+    assert pool_stats.timeouts == timeouts + 1
+    small.dispose()
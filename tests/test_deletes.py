@@ -0,0 +1,57 @@
+from datetime import date
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+from app.db import SessionLocal
+from app.models import Category, MonthlyRollup, Transaction
+
+from conftest import create_category, create_transaction
+
+
+def count(model, **filters):
+    with SessionLocal() as db:
+        return db.query(model).filter_by(**filters).count()
+
+
+def test_foreign_keys_are_enforced_on_sqlite(user):
+    user_id, _ = user
+    with SessionLocal() as db:
+        db.add(Transaction(user_id=user_id, category_id=10**9, amount=1, date=date(2024, 1, 1)))
+        with pytest.raises(IntegrityError):
+            db.commit()
+
+
+def test_database_cascades_category_deletes(client, user):
+    user_id, headers = user
+    category_id = create_category(client, headers)
+    create_transaction(client, headers, "5", date(2024, 1, 1), category_id=category_id)
+
+    #a DELETE the routes didn't prepare: the ON DELETE CASCADE constraints remove the children
+    with SessionLocal() as db:
+        db.query(Category).filter(Category.id == category_id).delete(synchronize_session=False)
+        db.commit()
+    assert count(Transaction, category_id=category_id) == 0
+    assert count(MonthlyRollup, category_id=category_id) == 0
+
+
+def test_category_delete_and_reassign(client, headers):
+    kept = create_category(client, headers, "Kept")
+    dropped = create_category(client, headers, "Dropped")
+    create_transaction(client, headers, "5", date(2024, 1, 1), category_id=kept)
+    create_transaction(client, headers, "7", date(2024, 1, 2), category_id=dropped)
+
+    assert client.delete(f"/categories/{kept}?reassign=true", headers=headers).status_code == 204
+    assert client.delete(f"/categories/{dropped}", headers=headers).status_code == 204
+    rows = client.get("/transaction", headers=headers).json()
+    assert [(row["amount"], row["category_id"]) for row in rows] == [(5.0, None)]
+
+
+def test_account_delete_removes_everything(client, user):
+    user_id, headers = user
+    category_id = create_category(client, headers)
+    create_transaction(client, headers, "5", date(2024, 1, 1), category_id=category_id)
+
+    assert client.delete("/auth/me", headers=headers).status_code == 204
+    for model in (Transaction, Category, MonthlyRollup):
+        assert count(model, user_id=user_id) == 0
@@ -0,0 +1,46 @@
+import csv
+import io
+import json
+
+from app.routes import transactions
+
+from conftest import create_ledger
+
+
+def export(client, headers, **params):
+    response = client.get("/transaction/export", params=params, headers=headers)
+    assert response.status_code == 200, response.text
+    return response
+
+
+def test_formats_agree_across_batches(client, headers, monkeypatch):
+    monkeypatch.setattr(transactions, "EXPORT_BATCH_SIZE", 4) #6 rows: two batches
+    create_ledger(client, headers)
+
+    csv_rows = list(csv.DictReader(io.StringIO(export(client, headers).text)))
+    ndjson_rows = [json.loads(line) for line in export(client, headers, format="ndjson").text.splitlines()]
+    columns = [json.loads(line) for line in export(client, headers, format="columnar").text.splitlines()]
+
+    assert len(columns) == 2
+    columnar_rows = [dict(zip(batch, values)) for batch in columns for values in zip(*batch.values())]
+    assert [row["date"] for row in csv_rows] == sorted(row["date"] for row in csv_rows) #oldest first
+    for rows in (ndjson_rows, columnar_rows):
+        assert [(str(row["id"]), row["date"], row["amount"]) for row in rows] == [
+            (row["id"], row["date"], row["amount"]) for row in csv_rows
+        ]
+    assert csv_rows[0]["amount"] == "1000.00"
+
+
+def test_filters_and_csv_round_trip(client, headers):
+    categories = create_ledger(client, headers)
+    exported = export(client, headers, category_id=categories["Food"]).text
+    assert [row["amount"] for row in csv.DictReader(io.StringIO(exported))] == ["50.00", "25.50"]
+
+    response = client.post("/transaction/import", headers=headers, files={"file": ("food.csv", exported.encode())})
+    assert response.json()["imported"] == 2
+    totals = client.get("/transaction/summary/categories", params={"type": "expense"}, headers=headers).json()
+    assert {row["category"]: row["total"] for row in totals}["Food"] == 151.0
+
+
+def test_unknown_format(client, headers):
+    assert client.get("/transaction/export", params={"format": "xlsx"}, headers=headers).status_code == 400
@@ -0,0 +1,47 @@
+from datetime import date
+
+from app import http_cache
+from app.db import SessionLocal
+from app.dependencies.auth import user_cache
+from app.models import User
+
+from conftest import create_transaction
+
+
+def test_etag_revalidates_until_a_write(client, headers):
+    create_transaction(client, headers, "-12.50", date(2024, 3, 1), "Lunch")
+    first = client.get("/transaction", headers=headers)
+    etag = first.headers["etag"]
+    assert first.headers["cache-control"] == "private, no-cache"
+
+    again = client.get("/transaction", headers={**headers, "If-None-Match": etag})
+    assert again.status_code == 304
+    assert client.get("/transaction", headers=headers).content == first.content #cached body
+
+    create_transaction(client, headers, "-3", date(2024, 3, 2), "Coffee")
+    changed = client.get("/transaction", headers={**headers, "If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+    assert len(changed.json()) == 2
+
+
+def test_cached_response_is_not_served_to_a_deleted_user(client, user):
+    user_id, headers = user
+    create_transaction(client, headers, "-12.50", date(2024, 3, 1), "Lunch")
+    etag = client.get("/transaction", headers=headers).headers["etag"]
+
+    #removed behind the caches' back (no mapper events, no version bump), then the user entry expires
+    with SessionLocal() as db:
+        db.query(User).filter(User.id == user_id).delete(synchronize_session=False)
+        db.commit()
+    user_cache.invalidate(user_id)
+
+    assert client.get("/transaction", headers=headers).status_code == 401
+    assert client.get("/transaction", headers={**headers, "If-None-Match": etag}).status_code == 401
+
+
+def test_response_cache_steps_aside_for_unshared_workers(client, headers, monkeypatch):
+    monkeypatch.setattr(http_cache, "RESPONSE_CACHE_ENABLED", False)
+    response = client.get("/transaction", headers=headers)
+    assert response.status_code == 200
+    assert "etag" not in response.headers
@@ -0,0 +1,42 @@
+from app.importers import RowError, RowValidator, parse, parse_amount
+
+import pytest
+
+from conftest import create_category
+
+CSV = "date,amount,description\n2024-03-01,-42.50,Groceries\n2024-03-02,1200,Salary\n"
+OFX = """<OFX><BANKTRANLIST>
+<STMTTRN><TRNTYPE>DEBIT<DTPOSTED>20240301<TRNAMT>-42.50<NAME>Groceries</STMTTRN>
+<STMTTRN><TRNTYPE>CREDIT<DTPOSTED>20240302<TRNAMT>1200.00<NAME>Salary</STMTTRN>
+</BANKTRANLIST></OFX>
+"""
+QIF = "!Type:Bank\nD03/01/2024\nT-42.50\nPGroceries\n^\nD03/02/2024\nT1,200.00\nPSalary\n^\n"
+
+
+@pytest.mark.parametrize("fmt,content", [("csv", CSV), ("ofx", OFX), ("qif", QIF)])
+def test_every_format_imports_magnitudes(client, headers, fmt, content):
+    category_id = create_category(client, headers)
+    response = client.post(f"/transaction/import?category_id={category_id}", headers=headers,
+                           files={"file": (f"statement.{fmt}", content.encode())})
+    assert response.status_code == 200, response.text
+    assert response.json() == {"imported": 2, "failed": 0, "errors": []}
+
+    rows = client.get("/transaction", headers=headers).json()
+    assert sorted((row["date"], row["amount"], row["description"]) for row in rows) == [
+        ("2024-03-01", 42.5, "Groceries"), ("2024-03-02", 1200.0, "Salary"),
+    ]
+
+
+def test_invalid_rows_are_reported_by_line():
+    records = parse("csv", "date,amount\n2024-01-01,5\n2024-01-02,abc\n,3\n2024-01-04,1.234\n".splitlines(True))
+    results = list(RowValidator(user_id=1, categories=[]).validate(records))
+    assert [(line, error) for line, _, error in results] == [
+        (2, None), (3, "Invalid amount 'abc'"), (4, "Missing date"), (5, "Amount has more than 2 decimal places"),
+    ]
+
+
+def test_parse_amount_limits():
+    assert str(parse_amount("-1,234.5")) == "-1234.50"
+    for value in ("1e400", "NaN", "10000000000"):
+        with pytest.raises(RowError):
+            parse_amount(value)
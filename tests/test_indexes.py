@@ -0,0 +1,11 @@
+from datetime import date
+
+from check_indexes import check
+
+from conftest import create_category, create_transaction
+
+
+def test_route_queries_use_an_index(client, headers):
+    category_id = create_category(client, headers)
+    create_transaction(client, headers, "5", date(2024, 6, 1), "Rent", category_id)
+    assert check() == 0
@@ -0,0 +1,25 @@
+from datetime import date
+
+from conftest import create_category, create_transaction
+
+
+def test_list_matches_transaction_out(client, headers):
+    #the list fast path (orjson over column tuples) must encode rows exactly like TransactionOut
+    category_id = create_category(client, headers)
+    created = [
+        create_transaction(client, headers, "12.50", date(2024, 3, 1), "lunch", category_id),
+        create_transaction(client, headers, "0.10", date(2024, 3, 2)),
+        create_transaction(client, headers, "9999999999.99", date(2024, 3, 3), "big"),
+    ]
+    updated = client.put(f"/transaction/{created[1]['id']}", json={"description": "edited"}, headers=headers)
+    assert updated.status_code == 200
+    created[1] = updated.json()
+    batch = client.post(
+        "/transaction/batch", json={"operations": [{"op": "create", "amount": "3.00", "date": "2024-03-04"}]}, headers=headers,
+    )
+    assert batch.status_code == 200
+    created.append(batch.json()["results"][0]["transaction"])
+
+    listed = client.get("/transaction", params={"page_size": 10}, headers=headers).json()
+    assert listed == sorted(created, key=lambda tx: (tx["date"], tx["id"]), reverse=True)
+    assert listed[-1]["amount"] == 12.5 #a JSON number, not "12.50"
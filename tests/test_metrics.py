@@ -0,0 +1,37 @@
+import re
+from datetime import date
+
+from app import metrics
+
+from conftest import create_transaction
+
+
+def test_server_timing_reports_app_and_db_time(client, headers):
+    timing = client.get("/transaction", headers=headers).headers["server-timing"]
+    match = re.fullmatch(r'app;dur=([\d.]+), db;dur=([\d.]+);desc="(\d+) statements?"', timing)
+    assert match
+    assert int(match.group(3)) >= 1
+
+
+def test_metrics_are_labelled_by_route_template(client, headers):
+    created = create_transaction(client, headers, "-12.50", date(2024, 3, 1), "Lunch")
+    assert client.put(f"/transaction/{created['id']}", json={"description": "Dinner"}, headers=headers).status_code == 200
+
+    response = client.get("/metrics")
+    assert response.headers["content-type"] == metrics.CONTENT_TYPE
+    text = response.text
+    assert "# TYPE http_request_duration_seconds histogram" in text
+    assert 'http_requests_total{method="PUT",route="/transaction/{transaction_id}",status="200"}' in text
+    assert f"/transaction/{created['id']}\"" not in text #raw paths don't make series
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = metrics.Histogram("h", "help", ("route",), (1, 5))
+    for value in (0.5, 3, 3, 10):
+        histogram.observe(("/a",), value)
+    lines = histogram.render()
+    assert 'h_bucket{route="/a",le="1"} 1' in lines
+    assert 'h_bucket{route="/a",le="5"} 3' in lines
+    assert 'h_bucket{route="/a",le="+Inf"} 4' in lines
+    assert 'h_count{route="/a"} 4' in lines
+    assert 'h_sum{route="/a"} 16.500000' in lines
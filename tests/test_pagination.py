@@ -0,0 +1,34 @@
+from datetime import date
+
+from conftest import create_transaction
+
+
+def test_cursor_walk_matches_the_offset_pages(client, headers):
+    for day in (1, 1, 1, 2, 3, 3, 5):
+        create_transaction(client, headers, "1", date(2024, 1, day))
+    everything = client.get("/transaction", headers=headers, params={"page_size": 100}).json()
+    assert [(row["date"], row["id"]) for row in everything] == sorted(
+        ((row["date"], row["id"]) for row in everything), reverse=True
+    )
+
+    walked, cursor = [], None
+    while True:
+        response = client.get("/transaction", headers=headers, params={"page_size": 3, **({"cursor": cursor} if cursor else {})})
+        walked += response.json()
+        cursor = response.headers.get("x-next-cursor")
+        if not cursor:
+            break
+    assert walked == everything
+
+
+def test_rows_added_meanwhile_do_not_shift_the_next_page(client, headers):
+    for day in range(1, 5):
+        create_transaction(client, headers, "1", date(2024, 1, day))
+    first = client.get("/transaction", headers=headers, params={"page_size": 2})
+    create_transaction(client, headers, "1", date(2024, 2, 1)) #newer than every listed row
+    second = client.get("/transaction", headers=headers, params={"page_size": 2, "cursor": first.headers["x-next-cursor"]})
+    assert [row["date"] for row in second.json()] == ["2024-01-02", "2024-01-01"]
+
+
+def test_invalid_cursor(client, headers):
+    assert client.get("/transaction", headers=headers, params={"cursor": "not-a-cursor"}).status_code == 400
@@ -0,0 +1,53 @@
+import threading
+
+from passlib.context import CryptContext
+
+from app.db import SessionLocal
+from app.models import User
+from app.security import BCRYPT_ROUNDS
+
+from conftest import register
+
+OLD_COST = CryptContext(schemes=["bcrypt"], bcrypt__default_rounds=BCRYPT_ROUNDS + 1)
+
+
+def stored_hash(user_id):
+    with SessionLocal() as db:
+        return db.get(User, user_id).password_hash
+
+
+def login(client, username, password):
+    return client.post("/auth/login", data={"username": username, "password": password})
+
+
+def test_hash_with_an_old_cost_is_replaced_on_login(client):
+    user_id, _ = register(client, "rehash-me")
+    assert stored_hash(user_id).startswith(f"$2b${BCRYPT_ROUNDS:02d}$")
+    with SessionLocal() as db:
+        db.get(User, user_id).password_hash = OLD_COST.hash("secret1")
+        db.commit()
+
+    assert login(client, "rehash-me", "secret1").status_code == 200
+    assert stored_hash(user_id).startswith(f"$2b${BCRYPT_ROUNDS:02d}$")
+    assert login(client, "rehash-me", "secret1").status_code == 200
+
+
+def test_wrong_password(client):
+    register(client, "wrong-password")
+    assert login(client, "wrong-password", "not-it").status_code == 401
+    assert login(client, "nobody-by-that-name", "secret1").status_code == 401
+
+
+def test_hashing_runs_on_its_own_threads(client, monkeypatch):
+    from app import security
+
+    threads = []
+    original = security.hash_password
+
+    def recording_hash(password):
+        threads.append(threading.current_thread().name)
+        return original(password)
+
+    monkeypatch.setattr(security, "hash_password", recording_hash)
+    register(client)
+    assert threads and threads[0].startswith("password-hash")
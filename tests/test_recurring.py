@@ -0,0 +1,60 @@
+from datetime import date, timedelta
+
+from app import recurring
+from app.db import SessionLocal
+from app.models import RecurringRule, SchedulerLease, Transaction
+
+from conftest import create_category
+
+
+def create_rule(client, headers, start_date, **fields):
+    body = {"amount": "9.99", "description": "Streaming", "frequency": "daily", "start_date": str(start_date), **fields}
+    return client.post("/recurring", json=body, headers=headers)
+
+
+def booked(rule_id):
+    with SessionLocal() as db:
+        return db.query(Transaction).filter(Transaction.recurring_rule_id == rule_id).count()
+
+
+def test_start_date_window(client, headers):
+    too_old = date.today() - timedelta(days=recurring.RECURRING_MAX_PAST_DAYS + 1)
+    assert create_rule(client, headers, too_old).status_code == 400
+    oldest = date.today() - timedelta(days=recurring.RECURRING_MAX_PAST_DAYS)
+    assert create_rule(client, headers, oldest).status_code == 201
+
+
+def test_occurrences_per_rule_per_pass_are_capped(client, headers, monkeypatch):
+    monkeypatch.setattr(recurring, "RECURRING_MAX_CATCH_UP", 10)
+    category_id = create_category(client, headers, "Subscriptions")
+    rule_id = create_rule(client, headers, date.today() - timedelta(days=24), category_id=category_id).json()["id"]
+
+    recurring.materialize_due(batch_size=2)
+    assert booked(rule_id) == 10
+    recurring.materialize_due(batch_size=2)
+    assert booked(rule_id) == 20
+    recurring.materialize_due(batch_size=2)
+    recurring.materialize_due(batch_size=2) #nothing due: booked once only
+    assert booked(rule_id) == 25
+
+    with SessionLocal() as db:
+        assert db.get(RecurringRule, rule_id).next_date == date.today() + timedelta(days=1)
+    assert client.get("/transaction/summary", headers=headers).json()["total_expense"] == round(25 * 9.99, 2)
+
+
+def test_one_lease_holder_at_a_time():
+    with SessionLocal() as db:
+        db.query(SchedulerLease).delete()
+        db.commit()
+    assert recurring.acquire_lease("worker-a", 60)
+    assert not recurring.acquire_lease("worker-b", 60)
+    assert recurring.acquire_lease("worker-a", 60) #renewal
+    recurring.release_lease("worker-a")
+    assert recurring.acquire_lease("worker-b", 60)
+    assert not recurring.acquire_lease("worker-a", 60)
+
+
+def test_woken_rule_is_booked_without_the_lease(client, headers):
+    rule_id = create_rule(client, headers, date.today() - timedelta(days=2)).json()["id"]
+    recurring.materialize_due(only={rule_id})
+    assert booked(rule_id) == 3
@@ -0,0 +1,46 @@
+from datetime import date
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import db, http_cache
+from app.db import Base
+
+from conftest import DB_DIR, create_transaction
+
+
+@pytest.fixture
+def lagging_replica(monkeypatch):
+    #a replica that never caught up: same schema, no rows
+    url = f"sqlite:///{DB_DIR}/replica.db"
+    replica_engine = create_engine(url, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=replica_engine)
+    monkeypatch.setattr(db, "REPLICA_URLS", [url])
+    monkeypatch.setattr(db, "ReplicaSessions", [
+        sessionmaker(autocommit=False, autoflush=False, bind=replica_engine, info={"replica": True})
+    ])
+    monkeypatch.setattr(db, "_async_replica_sessionmakers", None)
+    monkeypatch.setattr(http_cache, "RESPONSE_CACHE_ENABLED", False) #every GET reaches the database
+    yield
+    db.recent_writers.clear()
+    replica_engine.dispose()
+
+
+def test_reads_follow_the_users_own_writes(client, user, lagging_replica):
+    user_id, headers = user
+    assert db.reads_from_primary(user_id) is False
+
+    create_transaction(client, headers, "-12.50", date(2024, 3, 1), "Lunch")
+    assert db.wrote_recently(user_id)
+    assert len(client.get("/transaction", headers=headers).json()) == 1 #primary
+
+    db.recent_writers.clear() #the read-your-writes window ran out
+    assert client.get("/transaction", headers=headers).json() == [] #the replica, still behind
+
+
+def test_without_replicas_everything_reads_the_primary(user):
+    user_id, _ = user
+    db.note_write(user_id) #nothing to mark
+    assert not db.wrote_recently(user_id)
+    assert db.reads_from_primary(user_id)
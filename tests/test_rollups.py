@@ -0,0 +1,52 @@
+from datetime import date
+
+from app import rollups
+from app.db import SessionLocal
+from app.models import MonthlyRollup
+
+from conftest import create_category, create_transaction
+
+
+def drift(user_id):
+    with SessionLocal() as db:
+        return rollups.verify(db, user_id)
+
+
+def test_rollups_follow_every_kind_of_write(client, user):
+    user_id, headers = user
+    food = create_category(client, headers, "Food")
+    rent = create_category(client, headers, "Rent")
+    moved = create_transaction(client, headers, "10", date(2024, 1, 31), category_id=food)
+    deleted = create_transaction(client, headers, "20", date(2024, 2, 1), category_id=food)
+    create_transaction(client, headers, "30", date(2024, 2, 15))
+
+    client.put(f"/transaction/{moved['id']}", json={"date": "2024-03-01", "category_id": rent, "amount": "11"}, headers=headers)
+    client.delete(f"/transaction/{deleted['id']}", headers=headers)
+    client.post("/transaction/batch", headers=headers, json={"operations": [
+        {"op": "create", "amount": "5", "date": "2024-03-02", "category_id": food},
+        {"op": "update", "id": moved["id"], "amount": "12"},
+    ]})
+    client.post("/transaction/import", headers=headers,
+                files={"file": ("rows.csv", b"date,amount,category\n2024-04-01,7,Food\n")})
+    assert drift(user_id) == []
+
+    with SessionLocal() as db:
+        stored = {(row.year, row.month, row.category_id): (float(row.total), row.tx_count)
+                  for row in db.query(MonthlyRollup).filter(MonthlyRollup.user_id == user_id)}
+    assert stored == {
+        (2024, 2, None): (30.0, 1), (2024, 3, rent): (12.0, 1), (2024, 3, food): (5.0, 1), (2024, 4, food): (7.0, 1),
+    }
+
+
+def test_rebuild_repairs_drift(client, user):
+    user_id, headers = user
+    create_transaction(client, headers, "10", date(2024, 1, 5))
+    with SessionLocal() as db:
+        db.query(MonthlyRollup).filter(MonthlyRollup.user_id == user_id).update({"total": 99})
+        db.commit()
+    assert len(drift(user_id)) == 1
+
+    with SessionLocal() as db:
+        assert rollups.rebuild(db, user_id) == 1
+        db.commit()
+    assert drift(user_id) == []
@@ -0,0 +1,49 @@
+from datetime import date, timedelta
+
+from app import search
+from conftest import create_transaction, register
+
+
+def search_ids(client, headers, q, **params):
+    response = client.get("/transaction", params={"q": q, **params}, headers=headers)
+    assert response.status_code == 200, response.text
+    return [tx["id"] for tx in response.json()]
+
+
+def test_prefix_match_best_first(client, headers):
+    long = create_transaction(client, headers, 5, date(2024, 1, 2), "paid the amazon marketplace seller for several household items")
+    short = create_transaction(client, headers, 5, date(2024, 1, 1), "Amazon")
+    create_transaction(client, headers, 5, date(2024, 1, 3), "rent")
+
+    assert search_ids(client, headers, "amaz") == [short["id"], long["id"]]
+    assert search_ids(client, headers, "amazon household") == [long["id"]]
+    assert client.get("/transaction", params={"q": "!!"}, headers=headers).status_code == 400
+
+
+def test_index_follows_edits_and_deletes(client, headers):
+    tx = create_transaction(client, headers, 5, date(2024, 1, 1), "coffee")
+    client.put(f"/transaction/{tx['id']}", json={"description": "tea"}, headers=headers)
+    assert search_ids(client, headers, "coffee") == []
+    assert search_ids(client, headers, "tea") == [tx["id"]]
+    client.delete(f"/transaction/{tx['id']}", headers=headers)
+    assert search_ids(client, headers, "tea") == []
+
+
+def test_other_users_matches_are_invisible(client, headers):
+    create_transaction(client, headers, 5, date(2024, 1, 1), "netflix")
+    _, other = register(client)
+    assert search_ids(client, other, "netflix") == []
+
+
+def test_paging_reaches_every_match_past_the_rank_window(client, headers, monkeypatch):
+    monkeypatch.setattr(search, "SEARCH_RANK_WINDOW", 5)
+    ids = {
+        create_transaction(client, headers, 1, date(2024, 1, 1) + timedelta(days=i), f"grocery store {'visit ' * (i % 3)}")["id"]
+        for i in range(12)
+    }
+    pages = [search_ids(client, headers, "grocery", page=page, page_size=4) for page in range(1, 5)]
+    found = [tx_id for page in pages for tx_id in page]
+    assert sorted(found) == sorted(ids) and pages[-1] == []
+    #the window holds the most recently added matches, the older ones follow newest first
+    assert set(found[:5]) == set(sorted(ids)[-5:])
+    assert found[5:] == sorted(ids, reverse=True)[5:]
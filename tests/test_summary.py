@@ -0,0 +1,34 @@
+from conftest import create_ledger
+
+
+def summary(client, headers, **params):
+    response = client.get("/transaction/summary", params=params, headers=headers)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_totals_and_groups(client, headers):
+    categories = create_ledger(client, headers)
+    assert summary(client, headers) == {"total_income": 2000.0, "total_expense": 575.5, "balance": 1424.5}
+
+    by_category = {group["key"]: group for group in summary(client, headers, group_by="category")["groups"]}
+    assert by_category["Food"] == {"key": "Food", "category_id": categories["Food"],
+                                   "total_income": 0.0, "total_expense": 75.5, "balance": -75.5}
+    assert by_category["Salary"]["total_income"] == 2000.0
+
+    #a range starting and ending mid-month: partial months come from the raw rows
+    by_month = summary(client, headers, group_by="month", start_date="2024-01-10", end_date="2024-02-10")
+    assert (by_month["total_income"], by_month["total_expense"]) == (0.0, 575.5)
+    assert [(group["key"], group["total_expense"]) for group in by_month["groups"]] == [("2024-01", 550.0), ("2024-02", 25.5)]
+
+
+def test_week_groups_start_on_monday(client, headers):
+    create_ledger(client, headers)
+    by_week = summary(client, headers, group_by="week", end_date="2024-01-31")
+    assert [(group["key"], group["balance"]) for group in by_week["groups"]] == [
+        ("2024-01-01", 1000.0), ("2024-01-08", -50.0), ("2024-01-29", -500.0),
+    ]
+
+
+def test_invalid_group_by(client, headers):
+    assert client.get("/transaction/summary", params={"group_by": "year"}, headers=headers).status_code == 400
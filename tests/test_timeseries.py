@@ -0,0 +1,31 @@
+from conftest import create_ledger
+
+
+def test_monthly_running_balance_and_moving_average(client, headers):
+    create_ledger(client, headers)
+    response = client.get("/transaction/summary/timeseries", params={"bucket": "month", "window": 2}, headers=headers)
+    assert response.status_code == 200, response.text
+    assert response.json() == {
+        "bucket": "month", "window": 2, "opening_balance": 0.0,
+        "dates": ["2024-01-01", "2024-02-01", "2024-03-01"],
+        "income": [1000.0, 0.0, 1000.0],
+        "expense": [550.0, 25.5, 0.0],
+        "net": [450.0, -25.5, 1000.0],
+        "balance": [450.0, 424.5, 1424.5],
+        "moving_average": [450.0, 212.25, 487.25],
+    }
+
+
+def test_daily_buckets_include_empty_days_and_the_opening_balance(client, headers):
+    create_ledger(client, headers)
+    series = client.get("/transaction/summary/timeseries", headers=headers,
+                        params={"bucket": "day", "start_date": "2024-01-30", "end_date": "2024-02-03"}).json()
+    assert series["opening_balance"] == 950.0
+    assert series["dates"] == ["2024-01-30", "2024-01-31", "2024-02-01", "2024-02-02", "2024-02-03"]
+    assert series["net"] == [0.0, -500.0, 0.0, 0.0, -25.5]
+    assert series["balance"][-1] == 424.5
+
+
+def test_invalid_parameters(client, headers):
+    assert client.get("/transaction/summary/timeseries", params={"bucket": "year"}, headers=headers).status_code == 400
+    assert client.get("/transaction/summary/timeseries", params={"window": 0}, headers=headers).status_code == 400